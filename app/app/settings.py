@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import copy
 from pathlib import Path
 
 import environ.environ as environ
@@ -37,8 +38,13 @@ ALLOWED_HOSTS = []
 
 # Application definition
 
+# Production boot mode: defer modules only needed by the admin and the API docs until
+# their first request (see app/urls.py and core.lazy). The admin registry is then filled
+# by autodiscover() when the admin URLs are first resolved, not at startup.
+LAZY_IMPORTS = env.bool("LAZY_IMPORTS", default=False)
+
 INSTALLED_APPS = [
-    "django.contrib.admin",
+    "django.contrib.admin.apps.SimpleAdminConfig" if LAZY_IMPORTS else "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -53,11 +59,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -86,30 +94,67 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-# Debug: Print env vars
-print("=== ENV DEBUG START ===")
-print("POSTGRES_DATABASE_HOST:", env("POSTGRES_DATABASE_HOST", default="NOT SET"))
-print("POSTGRES_DB_NAME:", env("POSTGRES_DB_NAME", default="NOT SET"))
-print("POSTGRES_USER:", env("POSTGRES_USER", default="NOT SET"))
-print("POSTGRES_PASSWORD:", env("POSTGRES_PASSWORD", default="NOT SET"))
-print("POSTGRES_DATABASE_PORT:", env("POSTGRES_DATABASE_PORT", default="NOT SET"))
-print("=== ENV DEBUG END ===")
-
+# Debug: Print env vars (opt in with SETTINGS_DEBUG_ENV=True; never prints the password)
+if env.bool("SETTINGS_DEBUG_ENV", default=False):
+    print("=== ENV DEBUG START ===")
+    print("POSTGRES_DATABASE_HOST:", env("POSTGRES_DATABASE_HOST", default="NOT SET"))
+    print("POSTGRES_DB_NAME:", env("POSTGRES_DB_NAME", default="NOT SET"))
+    print("POSTGRES_USER:", env("POSTGRES_USER", default="NOT SET"))
+    print("POSTGRES_PASSWORD:", "SET" if env("POSTGRES_PASSWORD", default="") else "NOT SET")
+    print("POSTGRES_DATABASE_PORT:", env("POSTGRES_DATABASE_PORT", default="NOT SET"))
+    print("=== ENV DEBUG END ===")
+
+
+# Connection management (see core.backends.postgresql):
+# - DB_CONN_MAX_AGE keeps a connection open across requests for that many seconds.
+# - DB_CONN_HEALTH_CHECKS pings a kept-alive connection before a request reuses it.
+# - DB_POOL_MAX_SIZE > 0 enables the in-process pool instead of per-thread connections;
+#   DB_POOL_TIMEOUT bounds the wait for a free one, DB_POOL_MAX_LIFETIME recycles them.
+# - DB_TRANSACTION_POOLING=True is for running behind PgBouncer in transaction mode: it
+#   disables the in-process pool and server-side cursors. Set the role's TimeZone to UTC.
+DB_TRANSACTION_POOLING = env.bool("DB_TRANSACTION_POOLING", default=False)
+DB_POOL_MAX_SIZE = 0 if DB_TRANSACTION_POOLING else env.int("DB_POOL_MAX_SIZE", default=0)
 
 try:
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.postgresql",
+            "ENGINE": "core.backends.postgresql",
             "HOST": env("POSTGRES_DATABASE_HOST"),
             "NAME": env("POSTGRES_DB_NAME"),
             "USER": env("POSTGRES_USER"),
             "PASSWORD": env("POSTGRES_PASSWORD"),
             "PORT": env("POSTGRES_DATABASE_PORT", default="5432"),
+            # Pooled connections go back to the pool at the end of every request.
+            "CONN_MAX_AGE": 0 if DB_POOL_MAX_SIZE else env.int("DB_CONN_MAX_AGE", default=60),
+            "CONN_HEALTH_CHECKS": env.bool("DB_CONN_HEALTH_CHECKS", default=True),
+            "DISABLE_SERVER_SIDE_CURSORS": DB_TRANSACTION_POOLING,
+            "POOL": {
+                "MAX_SIZE": DB_POOL_MAX_SIZE,
+                "TIMEOUT": env.float("DB_POOL_TIMEOUT", default=10.0),
+                "MAX_LIFETIME": env.float("DB_POOL_MAX_LIFETIME", default=1800.0),
+            },
         }
     }
 except environ.ImproperlyConfigured as e:
     raise RuntimeError(f"Database configuration error: {e}")
 
+# Read replicas (core.routers): DB_REPLICA_HOSTS is a comma separated list of host[:port]
+# sharing the primary's name and credentials. Safe-method reads of recipes and users go to
+# them unless the user wrote within the last DB_REPLICA_PIN_SECONDS. For a local two-alias
+# setup point DB_REPLICA_HOSTS at the primary itself, e.g. DB_REPLICA_HOSTS=localhost.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(env.list("DB_REPLICA_HOSTS", default=[])):
+    host, _, port = replica.partition(":")
+    alias = f"replica_{index}"
+    DATABASES[alias] = copy.deepcopy(DATABASES["default"])
+    DATABASES[alias].update(
+        {"HOST": host, "PORT": port or DATABASES["default"]["PORT"], "TEST": {"MIRROR": "default"}}
+    )
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+DB_REPLICA_PIN_SECONDS = env.int("DB_REPLICA_PIN_SECONDS", default=10)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -147,6 +192,8 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = "/static/"
+MEDIA_URL = "/media/"
+MEDIA_ROOT = env("MEDIA_ROOT", default=str(BASE_DIR / "media"))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -159,4 +206,95 @@ AUTH_USER_MODEL = "core.User"
 # Django REST framework settings
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Reverse proxies in front of the app whose X-Forwarded-For entries are
+    # trusted to identify clients for throttling; 0 uses the peer address.
+    "NUM_PROXIES": env.int("NUM_PROXIES", default=0),
+}
+
+# Per-worker token -> user cache used by user.authentication.CachedTokenAuthentication
+TOKEN_AUTH_CACHE_MAX_SIZE = env.int("TOKEN_AUTH_CACHE_MAX_SIZE", default=10000)
+TOKEN_AUTH_CACHE_TTL = env.int("TOKEN_AUTH_CACHE_TTL", default=60)
+
+# Bounded pool that runs password hashing for the token endpoints (user.hashing).
+# A pool size of 0 means one thread per CPU core. At most LOGIN_HASH_MAX_BLOCKING
+# request threads wait for it in the sync view; 0 means one less than SERVE_THREADS.
+LOGIN_HASH_POOL_SIZE = env.int("LOGIN_HASH_POOL_SIZE", default=0)
+LOGIN_HASH_QUEUE_DEPTH = env.int("LOGIN_HASH_QUEUE_DEPTH", default=32)
+LOGIN_HASH_MAX_BLOCKING = env.int("LOGIN_HASH_MAX_BLOCKING", default=0)
+
+# Upper bound on create + update + delete items in one POST to recipes/bulk/
+RECIPE_BULK_MAX_ITEMS = env.int("RECIPE_BULK_MAX_ITEMS", default=5000)
+
+# Rows fetched per round trip by the streaming recipes/export/ endpoint
+RECIPE_EXPORT_CHUNK_SIZE = env.int("RECIPE_EXPORT_CHUNK_SIZE", default=2000)
+
+# Cache backends. CACHE_URL picks the backend, e.g. locmemcache:// (default),
+# filecache:///var/tmp/django_cache or a shared backend such as redis://host:6379/1.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+
+# Per-user response cache for the recipe list and detail (core.response_cache)
+RESPONSE_CACHE_ALIAS = env("RESPONSE_CACHE_ALIAS", default="default")
+RESPONSE_CACHE_TTL = env.int("RESPONSE_CACHE_TTL", default=300)
+
+# Threads (and so database connections) per process serving the async views
+# (core.async_views). 0 means min(32, CPU count + 4).
+ASYNC_DB_THREADS = env.int("ASYNC_DB_THREADS", default=0)
+
+# Defaults for `manage.py serve` (core.management.commands.serve); 0 workers means one per CPU.
+SERVE_WORKERS = env.int("SERVE_WORKERS", default=0)
+SERVE_THREADS = env.int("SERVE_THREADS", default=4)
+SERVE_MAX_REQUESTS = env.int("SERVE_MAX_REQUESTS", default=0)
+SERVE_MAX_REQUESTS_JITTER = env.int("SERVE_MAX_REQUESTS_JITTER", default=0)
+SERVE_GRACEFUL_TIMEOUT = env.int("SERVE_GRACEFUL_TIMEOUT", default=30)
+
+# Precomputed OpenAPI schema (core.schema, `manage.py build_schema`). APP_VERSION should
+# change with every release; when empty the schema is keyed on a source tree fingerprint.
+APP_VERSION = env("APP_VERSION", default="")
+SCHEMA_DIR = env("SCHEMA_DIR", default=str(BASE_DIR / "openapi"))
+
+# Per-request instrumentation (core.metrics): Server-Timing headers and the
+# Prometheus endpoint at api/core/metrics/.
+REQUEST_METRICS = env.bool("REQUEST_METRICS", default=True)
+SERVER_TIMING_HEADER = env.bool("SERVER_TIMING_HEADER", default=True)
+
+# Recipe image uploads (recipe.images): uploads are streamed to disk and resized on a
+# bounded process pool (0 = one process per CPU core) into RECIPE_IMAGE_FORMAT variants.
+RECIPE_IMAGE_MAX_BYTES = env.int("RECIPE_IMAGE_MAX_BYTES", default=10 * 2**20)
+RECIPE_IMAGE_MAX_PIXELS = env.int("RECIPE_IMAGE_MAX_PIXELS", default=40_000_000)
+RECIPE_IMAGE_FORMAT = env("RECIPE_IMAGE_FORMAT", default="JPEG")
+RECIPE_IMAGE_QUALITY = env.int("RECIPE_IMAGE_QUALITY", default=85)
+RECIPE_IMAGE_POOL_SIZE = env.int("RECIPE_IMAGE_POOL_SIZE", default=0)
+RECIPE_IMAGE_QUEUE_DEPTH = env.int("RECIPE_IMAGE_QUEUE_DEPTH", default=16)
+
+# Background jobs (core.jobs, `manage.py run_worker`). A running job's lease lasts
+# JOB_VISIBILITY_TIMEOUT seconds before other workers may take it over; failed attempts
+# are retried after JOB_RETRY_BACKOFF * 2**(attempt - 1) seconds, up to JOB_RETRY_BACKOFF_MAX.
+JOB_MAX_ATTEMPTS = env.int("JOB_MAX_ATTEMPTS", default=5)
+JOB_VISIBILITY_TIMEOUT = env.int("JOB_VISIBILITY_TIMEOUT", default=300)
+JOB_RETRY_BACKOFF = env.int("JOB_RETRY_BACKOFF", default=10)
+JOB_RETRY_BACKOFF_MAX = env.int("JOB_RETRY_BACKOFF_MAX", default=3600)
+JOB_WORKER_CONCURRENCY = env.int("JOB_WORKER_CONCURRENCY", default=0)
+JOB_CLAIM_BATCH_SIZE = env.int("JOB_CLAIM_BATCH_SIZE", default=10)
+JOB_POLL_INTERVAL = env.float("JOB_POLL_INTERVAL", default=1.0)
+
+# Admin changelists show the planner's row estimate instead of an exact COUNT(*)
+# when it is above this many rows (PostgreSQL only; see core.admin).
+ADMIN_ESTIMATED_COUNT_THRESHOLD = env.int("ADMIN_ESTIMATED_COUNT_THRESHOLD", default=10000)
+
+# Bulk user provisioning (user.provisioning): the most users per POST to user/bulk/, and
+# threads hashing their passwords (0 = one per CPU core).
+USER_BULK_MAX_ITEMS = env.int("USER_BULK_MAX_ITEMS", default=5000)
+USER_PROVISION_POOL_SIZE = env.int("USER_PROVISION_POOL_SIZE", default=0)
+
+# Host-wide throttling of the auth endpoints (core.ratelimit): "<count>/<sec|min|hour|day>"
+# per client address, shared by every worker through a memory-mapped table. An empty rate
+# disables the scope. THROTTLE_TABLE_PATH defaults to /dev/shm/recipe-api-throttle; the
+# table's layout is appended to the file name. Set NUM_PROXIES behind a reverse proxy.
+SHARED_THROTTLE_RATES = {
+    "login": env("THROTTLE_LOGIN_RATE", default="30/min") or None,
+    "signup": env("THROTTLE_SIGNUP_RATE", default="20/hour") or None,
 }
+THROTTLE_TABLE_PATH = env("THROTTLE_TABLE_PATH", default="")
+THROTTLE_TABLE_SLOTS = env.int("THROTTLE_TABLE_SLOTS", default=65536)
@@ -14,17 +14,30 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.contrib import admin
+from core.lazy import lazy_include, lazy_view
+from core.schema import schema_view
+from django.conf import settings
+from django.conf.urls.static import static
 from django.urls import include, path
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+if settings.LAZY_IMPORTS:
+    admin_urls = lazy_include("admin/", "core.admin_urls", namespace="admin")
+    docs_view = lazy_view("drf_spectacular.views.SpectacularSwaggerView", url_name="api-schema")
+else:
+    from django.contrib import admin
+    from drf_spectacular.views import SpectacularSwaggerView
+
+    admin_urls = path("admin/", admin.site.urls)
+    docs_view = SpectacularSwaggerView.as_view(url_name="api-schema")
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="api-schema"),
-        name="api-docs",
-    ),
+    admin_urls,
+    path("api/schema/", schema_view, name="api-schema"),
+    path("api/docs/", docs_view, name="api-docs"),
     path("api/user/", include("user.urls")),
+    path("api/recipe/", include("recipe.urls")),
+    path("api/core/", include("core.urls")),
 ]
+
+if settings.DEBUG:
+    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
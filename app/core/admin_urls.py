@@ -0,0 +1,13 @@
+"""
+Admin URLs for lazy boot (LAZY_IMPORTS).
+
+Importing this module registers every app's admin.py and builds the admin
+URL patterns, both deferred from startup to the first admin request.
+"""
+
+from django.contrib import admin
+
+admin.autodiscover()
+
+app_name = "admin"
+urlpatterns = admin.site.get_urls()
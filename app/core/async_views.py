@@ -0,0 +1,84 @@
+"""
+Async (ASGI) variants of the synchronous API views.
+
+Under ASGI, Django runs a sync view through ``sync_to_async`` with a fresh
+thread per request, plus another hop to render the response. ``async_view``
+wraps a sync view so that authentication, queries, serialization and
+rendering all happen in a single hop onto a bounded thread pool, and the
+event loop only awaits that one future. The pool size
+(``ASYNC_DB_THREADS``) caps both the threads and the database connections
+used by async requests.
+"""
+
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide thread pool used for database work."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # 0 means ThreadPoolExecutor's own default for I/O bound work.
+                workers = getattr(settings, "ASYNC_DB_THREADS", 0) or min(
+                    32, (os.cpu_count() or 1) + 4
+                )
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="async-db")
+    return _executor
+
+
+def _call(func, args, kwargs):
+    # Pool threads outlive requests, so apply Django's per-request
+    # connection cleanup (CONN_MAX_AGE, broken connections) around each call.
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_db_thread(func, *args, **kwargs):
+    """Run func(*args, **kwargs) on the database thread pool and await the result."""
+    return await sync_to_async(_call, thread_sensitive=False, executor=get_executor())(
+        func, args, kwargs
+    )
+
+
+def _render(view, request, args, kwargs):
+    response = view(request, *args, **kwargs)
+    if not hasattr(response, "render"):
+        return response
+    response.render()
+    # A plain HttpResponse keeps Django's async handler from hopping to a
+    # thread again just to call render().
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        rendered[header] = value
+    rendered.cookies = response.cookies
+    return rendered
+
+
+def async_view(view):
+    """Return an async view running the sync view in one database thread hop."""
+
+    # Keeps the name, docstring and markers such as csrf_exempt of the view.
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await run_in_db_thread(_render, view, request, args, kwargs)
+
+    # But not DRF's view class: the schema generator would document the
+    # wrapper as a second copy of the view, with methods it does not serve.
+    for attribute in ("cls", "initkwargs", "actions", "view_class", "view_initkwargs"):
+        wrapper.__dict__.pop(attribute, None)
+    return wrapper
@@ -0,0 +1,90 @@
+"""
+PostgreSQL backend with health-checked persistent connections and pooling.
+
+Set ``ENGINE`` to ``core.backends.postgresql``. On top of Django's backend:
+
+* ``CONN_HEALTH_CHECKS``: a persistent connection (``CONN_MAX_AGE`` > 0) is
+  checked with ``SELECT 1`` the first time it is used in each request, and
+  replaced if the server went away, instead of failing the request. Django
+  4.0 has no such setting (it arrived in 4.1 with the same name).
+* ``POOL``: with ``{"MAX_SIZE": n}`` (n > 0), raw connections come from an
+  in-process pool shared by the worker's threads and are returned to it
+  when Django closes them at the end of each request, so keep
+  ``CONN_MAX_AGE`` at 0. ``TIMEOUT`` bounds the wait for a free connection
+  and ``MAX_LIFETIME`` recycles old ones. See core.backends.postgresql.pool.
+
+Behind a transaction-pooling pooler such as PgBouncer, disable ``POOL``,
+set ``DISABLE_SERVER_SIDE_CURSORS`` (named cursors do not survive the
+backend switch between transactions) and set the database role's TimeZone
+to match ``TIME_ZONE`` so Django never issues a session-level
+``SET TIME ZONE``. ``DB_TRANSACTION_POOLING`` in app/settings.py does the
+Django side of this.
+"""
+
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+
+from .pool import get_pool
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL connection wrapper adding health checks and pooling."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get("CONN_HEALTH_CHECKS", False)
+
+    @property
+    def pool(self):
+        """Return the shared connection pool, or None when pooling is off."""
+        if not self.settings_dict.get("POOL", {}).get("MAX_SIZE"):
+            return None
+        return get_pool(self.alias, self.settings_dict)
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection = pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        # A reused connection skipped super(), which records the isolation level.
+        self.isolation_level = self.settings_dict["OPTIONS"].get(
+            "isolation_level", connection.isolation_level
+        )
+        return connection
+
+    @async_unsafe
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    @async_unsafe
+    def ensure_connection(self):
+        if (
+            self.connection is not None
+            and self.health_check_enabled
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Check a kept-alive connection again before its next request uses it.
+        self.health_check_done = False
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.release(self.connection)
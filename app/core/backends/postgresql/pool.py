@@ -0,0 +1,192 @@
+"""
+In-process pool of raw database connections.
+
+One pool is shared by every thread of a worker process for a database
+alias. Connections are handed out most-recently-used first, so idle ones at
+the bottom of the stack age out through ``max_lifetime``. When all
+``max_size`` connections are checked out, callers wait up to ``timeout``
+seconds before ``PoolTimeout`` is raised.
+"""
+
+import threading
+import time
+
+from django.db.utils import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+class PoolTimeout(OperationalError):
+    """No connection was returned to the pool within the wait timeout."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections."""
+
+    def __init__(self, max_size, timeout=10.0, max_lifetime=1800.0, health_checks=True):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_checks = health_checks
+        self._cond = threading.Condition()
+        self._idle = []  # [(connection, created)], most recently released last
+        self._created_at = {}  # id(connection) -> monotonic creation time
+        self.size = 0
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, connect):
+        """Return an idle connection, or one made by connect() while below max_size."""
+        while True:
+            connection = self._checkout()
+            if connection is None:
+                return self._create(connect)
+            if self._is_healthy(connection):
+                return connection
+            self._discard(connection)
+
+    def release(self, connection):
+        """Give a connection back, resetting it or closing it if unusable or expired."""
+        if not connection.closed and connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                connection.close()
+        created = self._created_at.get(id(connection), 0)
+        if connection.closed or time.monotonic() - created > self.max_lifetime:
+            self._discard(connection)
+            return
+        with self._cond:
+            self.in_use -= 1
+            self._idle.append(connection)
+            self._cond.notify()
+
+    def close_idle(self):
+        """Close every idle connection, e.g. after a fork or on shutdown."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            with self._cond:
+                self.in_use += 1
+            self._discard(connection)
+
+    def stats(self):
+        """Return utilization counters as a dict."""
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self.size,
+                "in_use": self.in_use,
+                "idle": len(self._idle),
+                "utilization": round(self.in_use / self.max_size, 4) if self.max_size else 0.0,
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "wait_seconds": round(self.wait_seconds, 6),
+            }
+
+    def _checkout(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    self.in_use += 1
+                    self.reused += 1
+                    return self._idle.pop()
+                if self.size < self.max_size:
+                    self.size += 1
+                    self.in_use += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"({self.max_size} in use)."
+                    )
+                self.waits += 1
+                started = time.monotonic()
+                self._cond.wait(remaining)
+                self.wait_seconds += time.monotonic() - started
+
+    def _create(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self._cond:
+                self.size -= 1
+                self.in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.created += 1
+            self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def _is_healthy(self, connection):
+        if connection.closed:
+            return False
+        if time.monotonic() - self._created_at.get(id(connection), 0) > self.max_lifetime:
+            return False
+        if not self.health_checks:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._created_at.pop(id(connection), None)
+            self.size -= 1
+            self.in_use -= 1
+            self.discarded += 1
+            self._cond.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    """Return the pool for alias, creating it from the POOL settings on first use."""
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                options = settings_dict["POOL"]
+                pool = _pools[alias] = ConnectionPool(
+                    max_size=options["MAX_SIZE"],
+                    timeout=options.get("TIMEOUT", 10.0),
+                    max_lifetime=options.get("MAX_LIFETIME", 1800.0),
+                    health_checks=settings_dict.get("CONN_HEALTH_CHECKS", True),
+                )
+    return pool
+
+
+def pool_stats():
+    """Return the stats of every pool created in this process, by alias."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_idle_connections():
+    """Close the idle connections of every pool, e.g. before forking workers."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
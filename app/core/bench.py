@@ -0,0 +1,285 @@
+"""
+Helpers shared by the benchmark and data generation commands.
+
+``percentile()`` summarizes latency samples for the bench_* commands,
+``HttpTransport`` sends their requests to a running server and
+``running_server()`` starts one with ``manage.py serve``.
+Synthetic users and recipes are generated and written the same way for
+``seed_data`` and ``bench_api``: batched ``bulk_create`` for users, recipes
+with ``COPY`` on PostgreSQL, and deleted again with ``delete_users()``.
+Recipe cooking times and prices follow a log-normal distribution.
+"""
+
+import csv
+import http.client
+import io
+import json
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+from core.models import Recipe
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db import connection, connections, transaction
+
+BATCH_SIZE = 5000
+
+# Columns written by COPY into the recipe table. COPY skips model defaults,
+# so every NOT NULL column without a database default must be listed.
+COPY_COLUMNS = (
+    "user_id",
+    "title",
+    "description",
+    "time_minutes",
+    "price",
+    "link",
+    "image_variants",
+)
+# Values of the columns a row may leave out.
+COPY_DEFAULTS = {"description": "", "link": "", "image_variants": "{}"}
+
+ADJECTIVES = (
+    "Spicy",
+    "Smoky",
+    "Creamy",
+    "Crispy",
+    "Zesty",
+    "Hearty",
+    "Quick",
+    "Rustic",
+    "Garlic",
+    "Lemon",
+    "Honey",
+    "Herbed",
+    "Roasted",
+    "Grilled",
+    "Slow-cooked",
+    "Tangy",
+)
+DISHES = (
+    "Chicken Curry",
+    "Tomato Soup",
+    "Beef Stew",
+    "Pasta Bake",
+    "Veggie Stir Fry",
+    "Fish Tacos",
+    "Lentil Dahl",
+    "Mushroom Risotto",
+    "Pancakes",
+    "Banana Bread",
+    "Caesar Salad",
+    "Ramen",
+    "Chili",
+    "Shakshuka",
+    "Paella",
+    "Burrito Bowl",
+)
+
+
+def percentile(samples, pct):
+    """Return the nearest-rank percentile of samples (seconds)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def lognormal(rng, mean, sigma):
+    """Draw from a log-normal distribution with the given mean."""
+    return rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+
+
+def generate_recipe(rng, user_id):
+    """Return the field values of one synthetic recipe."""
+    title = f"{rng.choice(ADJECTIVES)} {rng.choice(DISHES)}"
+    return {
+        "user_id": user_id,
+        "title": title,
+        "description": f"A {title.lower()} for {rng.randint(1, 8)}." if rng.random() < 0.3 else "",
+        "time_minutes": max(1, min(600, round(lognormal(rng, 35, 0.7)))),
+        "price": Decimal(max(50, min(99999, round(lognormal(rng, 1200, 0.8))))) / 100,
+        "link": f"https://example.com/r/{rng.getrandbits(40):x}" if rng.random() < 0.2 else "",
+    }
+
+
+def create_users(users):
+    """Insert unsaved users in batches and return them with their ids set."""
+    User = get_user_model()
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    if users and users[0].pk is None:
+        # Backends that cannot return ids from a bulk insert.
+        ids = dict(
+            User.objects.filter(email__in=[user.email for user in users]).values_list("email", "id")
+        )
+        for user in users:
+            user.pk = ids[user.email]
+    return users
+
+
+def delete_users(users):
+    """Delete users and their data; return the number of rows deleted."""
+    recipes = Recipe.objects.filter(user__in=users)
+    with transaction.atomic():
+        deleted = 0
+        for through in (Recipe.tags.through, Recipe.ingredients.through):
+            deleted += through.objects.filter(recipe__in=recipes).delete()[0]
+        # Recipe has post_delete receivers, so delete() would load every row to
+        # send them (and collect cascades that the statements above already
+        # handled); nothing needs the per-row version bumps of throwaway users,
+        # so the recipes go in one DELETE.
+        sql, params = users.values("id").query.sql_with_params()
+        with connections[recipes.db].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {Recipe._meta.db_table} WHERE user_id IN ({sql})", params)
+            deleted += cursor.rowcount
+        deleted += users.delete()[0]
+    return deleted
+
+
+def insert_recipes(rows):
+    """Insert recipes from an iterable of generate_recipe() dicts."""
+    if connection.vendor == "postgresql":
+        _copy_recipes(rows)
+    else:
+        _bulk_create_recipes(rows)
+
+
+def _bulk_create_recipes(rows):
+    batch = []
+    for row in rows:
+        batch.append(Recipe(**row))
+        if len(batch) == BATCH_SIZE:
+            Recipe.objects.bulk_create(batch)
+            batch = []
+    Recipe.objects.bulk_create(batch)
+
+
+def copy_row(row):
+    """Return the COPY_COLUMNS values of a recipe row (dict), with defaults filled in."""
+    return [row[column] if column in row else COPY_DEFAULTS[column] for column in COPY_COLUMNS]
+
+
+def copy_sql():
+    """Return the COPY statement loading CSV rows of copy_row() into the recipe table."""
+    table = connection.ops.quote_name(Recipe._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(column) for column in COPY_COLUMNS)
+    return f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+
+def _copy_recipes(rows):
+    sql = copy_sql()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    with connection.cursor() as cursor:
+        for i, row in enumerate(rows, 1):
+            writer.writerow(copy_row(row))
+            if i % BATCH_SIZE == 0:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+
+
+def encode_body(body):
+    """Return (content type, payload) for a JSON body or a (content type, bytes) pair."""
+    if body is None or isinstance(body, tuple):
+        return body or (None, None)
+    return "application/json", json.dumps(body)
+
+
+class HttpTransport:
+    """Send requests over keep-alive HTTP connections, one per thread."""
+
+    name = "http"
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https"):
+            raise CommandError(f"Unsupported --base-url: {base_url}")
+        self.scheme, self.netloc = url.scheme, url.netloc
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            factory = (
+                http.client.HTTPSConnection
+                if self.scheme == "https"
+                else http.client.HTTPConnection
+            )
+            conn = self._local.conn = factory(self.netloc, timeout=30)
+        headers = {"Authorization": f"Token {token}"} if token else {}
+        content_type, payload = encode_body(body)
+        if content_type is not None:
+            headers["Content-Type"] = content_type
+        try:
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            return 0, ""
+        return response.status, response.getheader("Server-Timing", "")
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+
+
+@contextmanager
+def running_server(workers=1, threads=None, env=None, quiet=True, timeout=30):
+    """
+    Run ``manage.py serve`` on a free local port and yield its base URL.
+
+    env overrides environment variables of the server, e.g. to change
+    settings read from the environment; quiet discards the server's logs.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    command = [sys.executable, "-m", "django", "serve", "--bind", f"127.0.0.1:{port}"]
+    command += ["--workers", str(workers)]
+    if threads:
+        command += ["--threads", str(threads)]
+    process = subprocess.Popen(
+        command,
+        cwd=settings.BASE_DIR,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL if quiet else None,
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise CommandError(f"serve exited with status {process.returncode}.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise CommandError(f"serve did not listen on port {port} in {timeout}s.")
+                time.sleep(0.1)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=getattr(settings, "SERVE_GRACEFUL_TIMEOUT", 30) + 10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
@@ -0,0 +1,95 @@
+"""
+Conditional request support for per-user API views.
+
+ETags are derived from the user's data version (core.versioning), so an
+``If-None-Match`` revalidation costs one primary-key lookup and never loads
+or serializes the rows themselves (a retrieve still looks its row up, so
+a missing or foreign object is a 404, never a 304). ``If-Match`` on
+PUT/PATCH gives optimistic concurrency: the write only proceeds while the
+version is unchanged, checked under a row lock on the version counter.
+"""
+
+from core.models import UserVersion
+from core.versioning import DataVersionMixin
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(user_id, version):
+    """Return the strong ETag for a user's data at version."""
+    return f'"{user_id}.{version}"'
+
+
+def etag_matches(header, etag, weak=True):
+    """
+    Return True if an If-Match/If-None-Match header value matches etag.
+
+    If-None-Match uses weak comparison (any W/ prefix is ignored); If-Match
+    needs strong comparison (weak=False), which no weak tag satisfies.
+    """
+    if header.strip() == "*":
+        return True
+    tags = parse_etags(header)
+    if weak:
+        tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+    return etag in tags
+
+
+class VersionETagMixin(DataVersionMixin):
+    """
+    Add ETag, If-None-Match and If-Match handling to per-user views.
+
+    Mix in before the DRF generic view/viewset. Covers ``list``,
+    ``retrieve`` and ``update`` (PUT and PATCH).
+    """
+
+    def get_etag(self, refresh=False):
+        """Return the ETag for the current user's data."""
+        return make_etag(self.request.user.pk, self.get_data_version(refresh=refresh))
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_get(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_get(
+            super().retrieve, request, *args, check=self.get_object, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        if_match = request.headers.get("If-Match")
+        if if_match is None:
+            response = super().update(request, *args, **kwargs)
+        else:
+            with transaction.atomic():
+                # Lock the counter so no other write can slip in after the
+                # check; a missing counter is created (and so held) by the read.
+                list(
+                    UserVersion.objects.select_for_update()
+                    .filter(user_id=request.user.pk)
+                    .values_list("pk", flat=True)
+                )
+                current = self.get_etag(refresh=True)
+                if not etag_matches(if_match, current, weak=False):
+                    return Response(
+                        {"detail": "The resource has changed; fetch it again."},
+                        status=status.HTTP_412_PRECONDITION_FAILED,
+                        headers={"ETag": current},
+                    )
+                response = super().update(request, *args, **kwargs)
+        response["ETag"] = self.get_etag(refresh=True)
+        return response
+
+    def _conditional_get(self, handler, request, *args, check=None, **kwargs):
+        # The version is read before any row, so the rows are never older than the tag.
+        etag = self.get_etag()
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            if check is not None:
+                check()
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
@@ -0,0 +1,185 @@
+"""
+Database-backed background jobs.
+
+Work is registered with ``@task`` and queued with ``enqueue()``, which only
+inserts a ``Job`` row: enqueued inside a transaction, the job becomes
+visible to workers when (and only if) that transaction commits. Requests can
+answer 202 with ``accepted_response()`` and clients poll the job at
+api/core/jobs/<id>/.
+
+``manage.py run_worker`` claims due jobs in batches. On PostgreSQL the
+claim is a ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of workers
+take disjoint batches without waiting on each other; backends without
+``SKIP LOCKED`` (SQLite) fall back to polling and claiming each row with a
+conditional UPDATE. A claimed job is leased to its worker until
+``locked_until`` (JOB_VISIBILITY_TIMEOUT seconds, renewed while it runs);
+when a worker dies its jobs are claimed again once the lease expires.
+Failed attempts are retried with exponential backoff up to
+``max_attempts``.
+"""
+
+import random
+import time
+import traceback
+from datetime import timedelta
+
+from core import metrics
+from core.models import Job
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+# Task name -> function; filled by @task when the app's tasks modules are imported.
+TASKS = {}
+
+
+def task(fn=None, *, name=None):
+    """Register fn as a task, under its dotted path unless name is given."""
+
+    def register(fn):
+        fn.task_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        TASKS[fn.task_name] = fn
+        return fn
+
+    return register(fn) if fn is not None else register
+
+
+def enqueue(fn, payload=None, *, queue="default", delay=0, max_attempts=None, user=None):
+    """Queue fn(**payload) to run in a worker after delay seconds; return the Job."""
+    return Job.objects.create(
+        queue=queue,
+        task=fn if isinstance(fn, str) else fn.task_name,
+        payload=payload or {},
+        user=user,
+        max_attempts=max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 5),
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def accepted_response(job, request):
+    """Return a 202 response pointing the client at the job's status."""
+    url = request.build_absolute_uri(reverse("core:job-detail", args=[job.pk]))
+    return Response(
+        {"id": job.pk, "status": job.status, "url": url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": url},
+    )
+
+
+def _due(queue, now):
+    return Job.objects.filter(
+        Q(status=Job.QUEUED, run_at__lte=now) | Q(status=Job.RUNNING, locked_until__lt=now),
+        queue=queue,
+    ).order_by("run_at")
+
+
+def claim(worker, queue="default", limit=10, timeout=None):
+    """Lease up to limit due jobs of queue to worker and return them."""
+    timeout = timeout or getattr(settings, "JOB_VISIBILITY_TIMEOUT", 300)
+    now = timezone.now()
+    lease = {
+        "status": Job.RUNNING,
+        "locked_by": worker,
+        "locked_until": now + timedelta(seconds=timeout),
+        "started_at": now,
+        "attempts": F("attempts") + 1,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                _due(queue, now)
+                .select_for_update(skip_locked=True)
+                .values_list("pk", flat=True)[:limit]
+            )
+            Job.objects.filter(pk__in=ids).update(**lease)
+    else:
+        # No row locks to skip: claim each candidate with an UPDATE that only
+        # matches while it is still unclaimed, and drop the ones another worker won.
+        candidates = _due(queue, now).values_list("pk", "status", "locked_until")[:limit]
+        ids = [
+            pk
+            for pk, state, locked_until in candidates
+            if Job.objects.filter(pk=pk, status=state, locked_until=locked_until).update(**lease)
+        ]
+    return list(Job.objects.filter(pk__in=ids).order_by("run_at"))
+
+
+def extend(worker, ids, timeout=None):
+    """Renew the lease of worker's running jobs ids."""
+    timeout = timeout or getattr(settings, "JOB_VISIBILITY_TIMEOUT", 300)
+    return Job.objects.filter(pk__in=ids, locked_by=worker, status=Job.RUNNING).update(
+        locked_until=timezone.now() + timedelta(seconds=timeout)
+    )
+
+
+def backoff(attempts):
+    """Seconds to wait before retrying after the given number of failed attempts."""
+    base = getattr(settings, "JOB_RETRY_BACKOFF", 10)
+    cap = getattr(settings, "JOB_RETRY_BACKOFF_MAX", 3600)
+    delay = min(cap, base * 2 ** (attempts - 1))
+    # Full jitter in the upper half, so jobs that failed together spread out.
+    return delay / 2 + random.random() * delay / 2
+
+
+def execute(job):
+    """
+    Run a claimed job and record its outcome in the database.
+
+    Returns ``(outcome, duration)``: outcome is "done", "retried" or "failed",
+    or None if the job's lease expired and another worker has taken it over.
+    """
+    if job.attempts > job.max_attempts:
+        # The lease of the last attempt expired: its worker never reported back.
+        return _finish(job, Job.FAILED, last_error="Timed out."), 0.0
+    fn = TASKS.get(job.task)
+    if fn is None:
+        return _finish(job, Job.FAILED, last_error=f"Unknown task {job.task!r}."), 0.0
+
+    started = time.perf_counter()
+    try:
+        result = fn(**job.payload)
+    except Exception:
+        duration = time.perf_counter() - started
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            return _finish(job, Job.FAILED, last_error=error), duration
+        retry_at = timezone.now() + timedelta(seconds=backoff(job.attempts))
+        retried = _held(job).update(
+            status=Job.QUEUED, run_at=retry_at, locked_by="", locked_until=None, last_error=error
+        )
+        return ("retried" if retried else None), duration
+    return _finish(job, Job.DONE, result=result), time.perf_counter() - started
+
+
+def _held(job):
+    # Matches nothing once the lease expired and another worker took the job over.
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by, status=Job.RUNNING)
+
+
+def _finish(job, state, **fields):
+    fields.update(status=state, finished_at=timezone.now(), locked_until=None)
+    return state if _held(job).update(**fields) else None
+
+
+def record(job, outcome, duration):
+    """Add a finished attempt of job to the job metrics of this process."""
+    wait = (job.started_at - job.run_at).total_seconds()
+    metrics.job_wait.observe((job.task,), max(0.0, wait))
+    metrics.job_duration.observe((job.task,), duration)
+    if outcome is not None:
+        metrics.jobs_total.inc((job.task, outcome))
+
+
+def queue_stats():
+    """Return {(queue, status): (count, oldest run_at)} of unfinished jobs."""
+    rows = (
+        Job.objects.filter(status__in=[Job.QUEUED, Job.RUNNING])
+        .values_list("queue", "status")
+        .annotate(count=Count("pk"), oldest=Min("run_at"))
+        .order_by()
+    )
+    return {(queue, state): (count, oldest) for queue, state, count, oldest in rows}
@@ -0,0 +1,41 @@
+"""
+URLconf helpers that defer imports until a URL is first used.
+
+Used by app/urls.py when ``LAZY_IMPORTS`` is on, so booting a worker does
+not import the admin views or the API docs views. The first request to
+them (or the first ``reverse()`` into a lazy include) pays the import once.
+"""
+
+import threading
+
+from django.urls.resolvers import RoutePattern, URLResolver
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """Return a view that imports the class-based view at dotted_path on first call."""
+    view = None
+    lock = threading.Lock()
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            with lock:
+                if view is None:
+                    view = import_string(dotted_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    wrapper.__name__ = dotted_path.rsplit(".", 1)[-1]
+    return wrapper
+
+
+def lazy_include(route, urlconf_name, namespace=None):
+    """Like include(), but the urlconf module is imported when first resolved."""
+    # URLResolver imports a string urlconf_name on first access of url_patterns;
+    # include() would import it right away.
+    return URLResolver(
+        RoutePattern(route, is_endpoint=False),
+        urlconf_name,
+        app_name=namespace,
+        namespace=namespace,
+    )
@@ -0,0 +1,363 @@
+"""
+Django command to benchmark the user and recipe API at fixed data scales.
+
+Seeds deterministic data for a tier (1k, 100k or 1m recipes, spread over
+bench users with ``RECIPES_PER_USER`` recipes each), then drives the user
+create / token / me and recipe list / detail / create / image upload
+endpoints, either
+in-process through the test client or over HTTP against a running server
+(``--base-url``). Each scenario reports throughput, p50/p95/p99 latency and
+database queries per request (read from the ``Server-Timing`` header, see
+core.metrics).
+
+``--output`` saves the results as JSON; ``--baseline`` compares a run with
+saved results and fails when throughput drops or p95 latency grows by more
+than ``--threshold`` percent.
+"""
+
+import json
+import platform
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from io import BytesIO
+
+from core.bench import (
+    HttpTransport,
+    create_users,
+    delete_users,
+    encode_body,
+    generate_recipe,
+    insert_recipes,
+    percentile,
+)
+from core.models import Recipe
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from PIL import Image
+from recipe.images import delete_variants
+from rest_framework.authtoken.models import Token
+
+TIERS = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+RECIPES_PER_USER = 100
+
+BENCH_PREFIX = "bench-api-"
+BENCH_PASSWORD = "bench-api-password"
+CREATED_TITLE = "bench-api created recipe"
+
+SCENARIOS = (
+    "user-create",
+    "user-token",
+    "user-me",
+    "recipe-list",
+    "recipe-detail",
+    "recipe-create",
+    "recipe-image",
+)
+SUCCESS_STATUSES = {200, 201}
+
+QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+def bench_email(index):
+    return f"{BENCH_PREFIX}{index:07d}@example.com"
+
+
+def seed(recipes, seed=0):
+    """Create the bench users and recipes of a tier unless they already exist."""
+    users = max(1, recipes // RECIPES_PER_USER)
+    User = get_user_model()
+    bench_users = User.objects.filter(email__startswith=BENCH_PREFIX).exclude(
+        email__startswith=f"{BENCH_PREFIX}new-"
+    )
+    if (
+        bench_users.count() == users
+        and Recipe.objects.filter(user__in=bench_users).exclude(title=CREATED_TITLE).count()
+        == recipes
+    ):
+        return False
+
+    rng = random.Random(seed)
+    with transaction.atomic():
+        delete_users(User.objects.filter(email__startswith=BENCH_PREFIX))
+        # Hashing once keeps seeding a large tier from costing a PBKDF2 run per user.
+        password = make_password(BENCH_PASSWORD)
+        created = create_users(
+            [User(email=bench_email(i), name=f"Bench {i}", password=password) for i in range(users)]
+        )
+        insert_recipes(generate_recipe(rng, created[i % users].pk) for i in range(recipes))
+    return True
+
+
+def sample_image(seed=0, size=(1600, 1200)):
+    """Return a photo-sized JPEG as a multipart (content type, body) pair."""
+    rng = random.Random(seed)
+    small = (size[0] // 8, size[1] // 8)
+    image = Image.frombytes("RGB", small, rng.randbytes(small[0] * small[1] * 3))
+    upload = BytesIO()
+    image.resize(size, Image.Resampling.BILINEAR).save(upload, "JPEG", quality=90)
+    upload.seek(0)
+    upload.name = "bench.jpg"
+    return MULTIPART_CONTENT, encode_multipart(BOUNDARY, {"image": upload})
+
+
+def cleanup():
+    """Delete what the write scenarios created, keeping the seeded tier intact."""
+    get_user_model().objects.filter(email__startswith=f"{BENCH_PREFIX}new-").delete()
+    Recipe.objects.filter(title=CREATED_TITLE).delete()
+    uploaded = Recipe.objects.filter(user__email__startswith=BENCH_PREFIX).exclude(image=None)
+    for variants in uploaded.values_list("image_variants", flat=True):
+        delete_variants(variants)
+    uploaded.update(image=None, image_variants={})
+
+
+class InProcessTransport:
+    """Send requests through Django's test client, one client per thread."""
+
+    name = "in-process"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, token=None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = Client(SERVER_NAME="localhost")
+        headers = {"HTTP_AUTHORIZATION": f"Token {token}"} if token else {}
+        content_type, payload = encode_body(body)
+        if payload is None:
+            response = client.generic(method, path, **headers)
+        else:
+            response = client.generic(method, path, payload, content_type=content_type, **headers)
+        return response.status_code, response.headers.get("Server-Timing", "")
+
+    def close(self):
+        connection.close()
+
+
+class Command(BaseCommand):
+    """Django command to benchmark the API and compare runs against a baseline."""
+
+    help = "Benchmark the user and recipe endpoints at a data tier and compare with a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tier", choices=TIERS, default="1k", help="Recipes to seed.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed of the data.")
+        parser.add_argument(
+            "--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, metavar="SCENARIO"
+        )
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario.")
+        parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds first.")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--base-url", help="Benchmark a running server (e.g. http://127.0.0.1:8000)."
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--baseline", help="Compare with results saved by --output.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Allowed throughput drop or p95 growth against the baseline, in percent.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        recipes = TIERS[options["tier"]]
+        self.stdout.write(f"Seeding tier {options['tier']} ({recipes} recipes)...")
+        started = time.perf_counter()
+        if seed(recipes, options["seed"]):
+            self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f}s.")
+        else:
+            self.stdout.write("Tier already seeded.")
+
+        if options["base_url"]:
+            transport = HttpTransport(options["base_url"])
+            throttling = nullcontext()
+        else:
+            transport = InProcessTransport()
+            # Measure capacity, not the signup/login rate limits.
+            throttling = override_settings(SHARED_THROTTLE_RATES={})
+        context = self._context()
+
+        results = {}
+        self.stdout.write(
+            f"{'scenario':<15}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+            f"{'queries':>9}{'errors':>8}"
+        )
+        with throttling:
+            try:
+                for scenario in options["scenarios"]:
+                    if options["warmup"]:
+                        self._run(
+                            transport, scenario, context, options["warmup"], options["concurrency"]
+                        )
+                    result = self._run(
+                        transport, scenario, context, options["duration"], options["concurrency"]
+                    )
+                    results[scenario] = result
+                    queries = result["queries_per_request"]
+                    self.stdout.write(
+                        f"{scenario:<15}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                        f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                        f"{'-' if queries is None else f'{queries:.1f}':>9}{result['errors']:>8}"
+                    )
+            finally:
+                cleanup()
+
+        report = {"meta": self._meta(options, transport), "results": results}
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}.")
+        if options["baseline"]:
+            self._compare(report, options["baseline"], options["threshold"])
+
+    def _context(self):
+        user = get_user_model().objects.get(email=bench_email(0))
+        token, _created = Token.objects.get_or_create(user=user)
+        recipe_ids = list(
+            Recipe.objects.filter(user=user).order_by("id").values_list("id", flat=True)
+        )
+        return {
+            "email": user.email,
+            "token": token.key,
+            "recipe_ids": recipe_ids,
+            "image": sample_image(),
+            "urls": {
+                "create": reverse("user:create"),
+                "token": reverse("user:token"),
+                "me": reverse("user:me"),
+                "recipes": reverse("recipe:recipe-list"),
+            },
+        }
+
+    def _request(self, scenario, context, worker, i):
+        """Return (method, path, body, token) of the i-th request of a worker."""
+        urls, token = context["urls"], context["token"]
+        if scenario == "user-create":
+            email = f"{BENCH_PREFIX}new-{context['run']}-{worker}-{i}@example.com"
+            body = {"email": email, "password": BENCH_PASSWORD, "name": "Bench new"}
+            return "POST", urls["create"], body, None
+        if scenario == "user-token":
+            body = {"email": context["email"], "password": BENCH_PASSWORD}
+            return "POST", urls["token"], body, None
+        if scenario == "user-me":
+            return "GET", urls["me"], None, token
+        if scenario == "recipe-list":
+            return "GET", urls["recipes"], None, token
+        if scenario == "recipe-detail":
+            recipe_id = context["recipe_ids"][(worker + i) % len(context["recipe_ids"])]
+            return "GET", reverse("recipe:recipe-detail", args=[recipe_id]), None, token
+        if scenario == "recipe-image":
+            recipe_id = context["recipe_ids"][(worker + i) % len(context["recipe_ids"])]
+            path = reverse("recipe:recipe-upload-image", args=[recipe_id])
+            return "POST", path, context["image"], token
+        body = {"title": CREATED_TITLE, "time_minutes": 5, "price": "4.50"}
+        return "POST", urls["recipes"], body, token
+
+    def _run(self, transport, scenario, context, duration, concurrency):
+        samples, queries, errors = [], [], []
+        context = {**context, "run": uuid.uuid4().hex[:8]}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def worker(index):
+            local, local_queries, failed, i = [], [], 0, 0
+            while time.perf_counter() < deadline:
+                method, path, body, token = self._request(scenario, context, index, i)
+                start = time.perf_counter()
+                status, timing = transport.request(method, path, body, token)
+                local.append(time.perf_counter() - start)
+                failed += status not in SUCCESS_STATUSES
+                match = QUERIES_RE.search(timing)
+                if match:
+                    local_queries.append(int(match.group(1)))
+                i += 1
+            transport.close()
+            with lock:
+                samples.extend(local)
+                queries.extend(local_queries)
+                errors.append(failed)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "requests": len(samples),
+            "errors": sum(errors),
+            "rps": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(samples, 50) * 1000, 3),
+            "p95_ms": round(percentile(samples, 95) * 1000, 3),
+            "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+    def _meta(self, options, transport):
+        return {
+            "tier": options["tier"],
+            "seed": options["seed"],
+            "transport": transport.name,
+            "base_url": options["base_url"],
+            "concurrency": options["concurrency"],
+            "duration": options["duration"],
+            "app_version": getattr(settings, "APP_VERSION", ""),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+
+    def _compare(self, report, path, threshold):
+        try:
+            with open(path) as fh:
+                baseline = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cannot read baseline {path}: {exc}")
+
+        for key in ("tier", "transport", "concurrency"):
+            if baseline["meta"].get(key) != report["meta"][key]:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"Baseline {key} is {baseline['meta'].get(key)!r}, "
+                        f"this run used {report['meta'][key]!r}."
+                    )
+                )
+
+        self.stdout.write(f"\n{'scenario':<15}{'req/s':>16}{'p95 ms':>16}")
+        regressions = []
+        for scenario, result in report["results"].items():
+            base = baseline["results"].get(scenario)
+            if base is None:
+                continue
+            rps_change = _change(result["rps"], base["rps"])
+            p95_change = _change(result["p95_ms"], base["p95_ms"])
+            self.stdout.write(f"{scenario:<15}{rps_change:>+15.1f}%{p95_change:>+15.1f}%")
+            if rps_change < -threshold:
+                regressions.append(f"{scenario} throughput {rps_change:+.1f}%")
+            if p95_change > threshold:
+                regressions.append(f"{scenario} p95 latency {p95_change:+.1f}%")
+
+        if regressions:
+            raise CommandError(
+                f"Regressions over {threshold:g}% against {path}: " + "; ".join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS(f"No regressions over {threshold:g}%."))
+
+
+def _change(value, base):
+    return (value - base) / base * 100 if base else 0.0
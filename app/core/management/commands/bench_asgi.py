@@ -0,0 +1,123 @@
+"""
+Django command to compare WSGI and ASGI serving of the read endpoints.
+
+Drives the recipe list, recipe detail and /me endpoints in-process at the
+same concurrency through both handlers: WSGI with one thread per client,
+ASGI with one coroutine per client on a single event loop, calling both the
+sync views and their async variants (core.async_views). Reports throughput
+and p50/p99 latency per handler and endpoint.
+"""
+
+import asyncio
+import threading
+import time
+from decimal import Decimal
+
+from core.bench import percentile
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+BENCH_EMAIL = "bench-asgi@example.com"
+
+
+class Command(BaseCommand):
+    """Django command to benchmark WSGI against ASGI for the read endpoints."""
+
+    help = "Compare WSGI and ASGI throughput and tail latency of the read endpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per run.")
+        parser.add_argument("--concurrency", type=int, default=64)
+        parser.add_argument("--recipes", type=int, default=50, help="Recipes for the user.")
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        token, recipe_id = self._setup(options["recipes"])
+        endpoints = {
+            "recipe list": (reverse("recipe:recipe-list"), reverse("recipe:recipe-list-async")),
+            "recipe detail": (
+                reverse("recipe:recipe-detail", args=[recipe_id]),
+                reverse("recipe:recipe-detail-async", args=[recipe_id]),
+            ),
+            "me": (reverse("user:me"), reverse("user:me-async")),
+        }
+        duration, concurrency = options["duration"], options["concurrency"]
+
+        self.stdout.write(
+            f"{'endpoint':<15}{'handler':<14}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        )
+        for name, (sync_url, async_url) in endpoints.items():
+            runs = {
+                "wsgi": self._run_wsgi(sync_url, token, duration, concurrency),
+                "asgi": self._run_asgi(sync_url, token, duration, concurrency),
+                "asgi (async)": self._run_asgi(async_url, token, duration, concurrency),
+            }
+            for handler, (samples, errors) in runs.items():
+                self.stdout.write(
+                    f"{name:<15}{handler:<14}{len(samples) / duration:>10.1f}"
+                    f"{percentile(samples, 50) * 1000:>10.2f}"
+                    f"{percentile(samples, 99) * 1000:>10.2f}{errors:>8}"
+                )
+
+    def _setup(self, recipes):
+        user = get_user_model().objects.filter(email=BENCH_EMAIL).first()
+        if user is None:
+            user = get_user_model().objects.create_user(email=BENCH_EMAIL, password="bench-asgi")
+        missing = recipes - Recipe.objects.filter(user=user).count()
+        Recipe.objects.bulk_create(
+            Recipe(user=user, title=f"Bench recipe {i}", time_minutes=10, price=Decimal("5.00"))
+            for i in range(max(missing, 0))
+        )
+        token, _created = Token.objects.get_or_create(user=user)
+        return token.key, Recipe.objects.filter(user=user).values_list("id", flat=True).first()
+
+    def _run_wsgi(self, url, token, duration, concurrency):
+        samples, errors = [], []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def worker():
+            client = Client(SERVER_NAME="localhost", HTTP_AUTHORIZATION=f"Token {token}")
+            local, failed = [], 0
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = client.get(url)
+                local.append(time.perf_counter() - start)
+                failed += response.status_code != 200
+            connection.close()
+            with lock:
+                samples.extend(local)
+                errors.append(failed)
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return samples, sum(errors)
+
+    def _run_asgi(self, url, token, duration, concurrency):
+        async def worker(deadline):
+            client = AsyncClient()
+            local, failed = [], 0
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                # AsyncClient (Django 4.0) turns extra kwargs into raw ASGI headers.
+                response = await client.get(url, authorization=f"Token {token}")
+                local.append(time.perf_counter() - start)
+                failed += response.status_code != 200
+            return local, failed
+
+        async def run():
+            deadline = time.perf_counter() + duration
+            return await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+
+        # AsyncClient always sends Host: testserver.
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            results = asyncio.run(run())
+        return [sample for local, _ in results for sample in local], sum(f for _, f in results)
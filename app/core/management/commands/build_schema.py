@@ -0,0 +1,25 @@
+"""
+Django command to precompute the OpenAPI schema served at /api/schema/.
+
+Run at build or deploy time so no request has to introspect the API. See
+core.schema.
+"""
+
+from core import schema
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to write the OpenAPI schema files."""
+
+    help = "Generate the OpenAPI schema (YAML, JSON and gzipped copies) into SCHEMA_DIR."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="Output directory (defaults to SCHEMA_DIR).")
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        directory = options["dir"] or schema.get_schema_dir()
+        rendered = schema.build_schema(directory)
+        sizes = ", ".join(f"{name} {len(body)} bytes" for name, body in rendered.items())
+        self.stdout.write(self.style.SUCCESS(f"Wrote OpenAPI schema to {directory} ({sizes})."))
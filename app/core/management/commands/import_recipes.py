@@ -0,0 +1,183 @@
+"""
+Django command to bulk load recipes from JSONL or CSV files.
+
+Rows are read as a stream, validated in batches with the same rules as
+RecipeSerializer and written with PostgreSQL ``COPY FROM STDIN`` (or chunked
+``bulk_create`` on other databases). Progress is checkpointed in the
+transaction of every batch (``core.models.ImportCheckpoint``), so an
+interrupted import resumes after the last committed row, never loading a
+batch twice. Lines that are not valid JSON are rejected like invalid rows.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from core.bench import copy_row, copy_sql
+from core.models import ImportCheckpoint, Recipe
+from core.versioning import bump_version
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from recipe.serializers import RecipeSerializer
+
+
+class InvalidLine(str):
+    """Stands in for a row whose input line could not be parsed."""
+
+
+class Command(BaseCommand):
+    """Django command to import recipes from JSONL/CSV files."""
+
+    help = "Import recipes from a JSONL or CSV file using COPY where available."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSONL (.jsonl/.ndjson) or CSV (.csv) file to load.")
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "csv"],
+            help="Input format; inferred from the file extension when omitted.",
+        )
+        parser.add_argument(
+            "--user",
+            help="Email of the owner for rows that do not carry a user_id column.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--checkpoint",
+            help="Name of the import's checkpoint (default: the file's absolute path).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and start from the first row.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        path = options["path"]
+        input_format = options["format"] or self._infer_format(path)
+        source = options["checkpoint"] or os.path.abspath(path)
+        default_user_id = self._resolve_user(options["user"])
+
+        checkpoint, _created = ImportCheckpoint.objects.get_or_create(source=source)
+        if options["restart"]:
+            checkpoint.rows = 0
+        done = checkpoint.rows
+        if done:
+            self.stdout.write(f"Resuming after row {done} from the checkpoint of {source}")
+
+        loader = self._copy_rows if connection.vendor == "postgresql" else self._bulk_create_rows
+        validator = RecipeSerializer(many=True)
+        loaded = rejected = 0
+        started = time.perf_counter()
+
+        with open(path, newline="", encoding="utf-8") as handle:
+            rows = islice(self._read_rows(handle, input_format), done, None)
+            while True:
+                batch = list(islice(rows, options["batch_size"]))
+                if not batch:
+                    break
+
+                valid, errors = self._validate(validator, batch, default_user_id)
+                for index, detail in islice(errors.items(), 5):
+                    self.stderr.write(f"Row {done + index + 1}: {detail}")
+                with transaction.atomic():
+                    loader(valid)
+                    # COPY and bulk_create send no signals; bump versions here.
+                    bump_version(*{row["user_id"] for row in valid})
+                    # Committed with the rows, so a resume neither skips nor repeats them.
+                    checkpoint.rows = done + len(batch)
+                    checkpoint.save(update_fields=["rows", "updated_at"])
+                done += len(batch)
+                loaded += len(valid)
+                rejected += len(errors)
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{done} rows read, {loaded} loaded, {rejected} rejected "
+                    f"({loaded / elapsed:,.0f} rows/s)"
+                )
+
+        checkpoint.delete()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {loaded} recipes in {elapsed:.1f}s "
+                f"({loaded / elapsed if elapsed else 0:,.0f} rows/s), {rejected} rejected."
+            )
+        )
+
+    def _infer_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension in (".jsonl", ".ndjson"):
+            return "jsonl"
+        if extension == ".csv":
+            return "csv"
+        raise CommandError(f"Cannot infer format of {path}; pass --format.")
+
+    def _resolve_user(self, email):
+        if not email:
+            return None
+        user_id = (
+            get_user_model()
+            .objects.filter(email=email.lower())
+            .values_list("id", flat=True)
+            .first()
+        )
+        if user_id is None:
+            raise CommandError(f"No user with email {email}.")
+        return user_id
+
+    def _read_rows(self, handle, input_format):
+        if input_format == "csv":
+            yield from csv.DictReader(handle)
+            return
+        for number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield InvalidLine(f"Line {number} is not valid JSON: {exc}")
+
+    def _validate(self, validator, batch, default_user_id):
+        """Return (valid rows as dicts with user_id, {batch index: error})."""
+        valid, errors = validator.validate_items(batch)
+        for index, row in enumerate(batch):
+            if isinstance(row, InvalidLine):
+                errors[index] = {"non_field_errors": [str(row)]}
+
+        candidates = []
+        for index, attrs in valid:
+            try:
+                user_id = int(batch[index].get("user_id") or default_user_id)
+            except (TypeError, ValueError):
+                errors[index] = {"user_id": ["A valid user_id column or --user is required."]}
+                continue
+            candidates.append((index, {**attrs, "user_id": user_id}))
+
+        user_ids = {row["user_id"] for _index, row in candidates}
+        known = set(get_user_model().objects.filter(id__in=user_ids).values_list("id", flat=True))
+        rows = []
+        for index, row in candidates:
+            if row["user_id"] in known:
+                rows.append(row)
+            else:
+                errors[index] = {"user_id": [f"User {row['user_id']} does not exist."]}
+        return rows, errors
+
+    def _copy_rows(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for row in rows:
+            writer.writerow(copy_row(row))
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(copy_sql(), buffer)
+
+    def _bulk_create_rows(self, rows):
+        Recipe.objects.bulk_create([Recipe(**row) for row in rows], batch_size=1000)
@@ -0,0 +1,181 @@
+"""
+Django command to run background jobs (core.jobs).
+
+The worker claims due jobs of one queue in batches of up to ``--batch-size``
+(never more than it has free slots) and runs them on a pool of
+``--concurrency`` threads, or spawned processes with ``--pool process`` for
+CPU-bound tasks. While jobs run their leases are renewed, so only a worker
+that dies loses its jobs to others. When the queue is empty the worker polls
+every ``--poll-interval`` seconds, or exits with ``--burst``.
+
+SIGTERM / SIGINT stop claiming and wait for the running jobs to finish.
+Job metrics of the worker are served with ``--metrics-port``.
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core import jobs, metrics, worker_process
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules
+
+
+def _run_in_thread(job):
+    close_old_connections()
+    try:
+        return jobs.execute(job)
+    finally:
+        close_old_connections()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serve the worker's metrics in the Prometheus text format on any path."""
+
+    def do_GET(self):
+        try:
+            body = metrics.render_prometheus().encode()
+        finally:
+            close_old_connections()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    """Django command to run background jobs."""
+
+    help = "Claim and run jobs queued with core.jobs.enqueue()."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", default="default")
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=getattr(settings, "JOB_WORKER_CONCURRENCY", 0),
+            help="Jobs run at once; 0 means one per CPU core.",
+        )
+        parser.add_argument("--pool", choices=["thread", "process"], default="thread")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "JOB_CLAIM_BATCH_SIZE", 10),
+            help="Most jobs claimed per query.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=getattr(settings, "JOB_POLL_INTERVAL", 1.0),
+            help="Seconds between polls of an empty queue.",
+        )
+        parser.add_argument(
+            "--burst", action="store_true", help="Exit once no job is due instead of polling."
+        )
+        parser.add_argument(
+            "--metrics-port", type=int, default=0, help="Serve job metrics on this port."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        concurrency = options["concurrency"] or os.cpu_count() or 1
+        if concurrency < 1 or options["batch_size"] < 1:
+            raise CommandError("--concurrency and --batch-size must be positive.")
+        autodiscover_modules("tasks")
+        self.verbosity = options["verbosity"]
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.timeout = getattr(settings, "JOB_VISIBILITY_TIMEOUT", 300)
+        self.stopping = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda *_: self.stopping.set())
+
+        if options["pool"] == "process":
+            executor = ProcessPoolExecutor(
+                max_workers=concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=worker_process.initialize,
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job")
+        metrics_server = None
+        if options["metrics_port"]:
+            metrics_server = ThreadingHTTPServer(("", options["metrics_port"]), MetricsHandler)
+            threading.Thread(target=metrics_server.serve_forever, daemon=True).start()
+
+        self.stdout.write(
+            f"Worker {self.worker} running queue {options['queue']!r} "
+            f"on a pool of {concurrency} {options['pool']}(s)."
+        )
+        try:
+            processed = self._loop(executor, concurrency, options)
+        finally:
+            executor.shutdown(wait=True)
+            if metrics_server is not None:
+                metrics_server.shutdown()
+        self.stdout.write(
+            self.style.SUCCESS(f"Worker {self.worker} stopped after {processed} jobs.")
+        )
+
+    def _loop(self, executor, concurrency, options):
+        running = {}
+        processed = 0
+        renewed = time.monotonic()
+        while running or not self.stopping.is_set():
+            claimed, limit = [], 0
+            free = concurrency - len(running)
+            if free and not self.stopping.is_set():
+                limit = min(free, options["batch_size"])
+                claimed = jobs.claim(self.worker, options["queue"], limit, self.timeout)
+                for job in claimed:
+                    if options["pool"] == "process":
+                        running[executor.submit(worker_process.run_job, job.pk)] = job
+                    else:
+                        running[executor.submit(_run_in_thread, job)] = job
+                if not claimed and not running and options["burst"]:
+                    break
+
+            if running and time.monotonic() - renewed > self.timeout / 3:
+                jobs.extend(self.worker, [job.pk for job in running.values()], self.timeout)
+                renewed = time.monotonic()
+
+            if claimed and len(claimed) == limit and len(running) < concurrency:
+                # Full batch and free slots: more jobs may be due, claim again now.
+                timeout = 0
+            elif len(running) == concurrency:
+                # Every slot busy: wait for one, but wake up in time to renew the leases.
+                timeout = self.timeout / 3
+            else:
+                timeout = options["poll_interval"]
+            if running:
+                done, _pending = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    processed += self._reap(future, running.pop(future))
+            elif timeout:
+                self.stopping.wait(timeout)
+        return processed
+
+    def _reap(self, future, job):
+        try:
+            outcome, duration = future.result()
+        except Exception as exc:
+            # Could not reach the database to record the outcome; the lease
+            # expires and the job is retried.
+            self.stderr.write(f"Job {job.pk} ({job.task}) crashed: {exc!r}")
+            return 0
+        jobs.record(job, outcome, duration)
+        if self.verbosity >= 2:
+            self.stdout.write(f"Job {job.pk} ({job.task}): {outcome} in {duration * 1000:.1f} ms")
+        return 1
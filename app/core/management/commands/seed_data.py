@@ -0,0 +1,146 @@
+"""
+Django command to generate synthetic users and recipes for load testing.
+
+Users are created in chunks of ``CHUNK_USERS``. Every generated user shares
+one password hash computed up front, and rows are written with batched
+``bulk_create`` (recipes with ``COPY`` on PostgreSQL, see core.bench). Chunks are
+distributed over worker processes; each chunk draws from its own random
+generator derived from ``--seed`` and the chunk number, so the same seed
+yields the same data whatever the number of workers.
+
+Recipes per user follow a log-normal distribution (most users have a few,
+some have hundreds), as do cooking times and prices.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import time
+
+from core.backends.postgresql.pool import close_idle_connections
+from core.bench import create_users, delete_users, generate_recipe, insert_recipes, lognormal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+
+CHUNK_USERS = 2000
+
+
+def chunk_rng(seed, chunk):
+    """Return the random generator of one chunk."""
+    return random.Random(f"{seed}:{chunk}")
+
+
+def seed_chunk(job):
+    """Create the users of one chunk and their recipes; return (users, recipes)."""
+    chunk, options, password = job
+    rng = chunk_rng(options["seed"], chunk)
+    User = get_user_model()
+    first = chunk * CHUNK_USERS
+    last = min(first + CHUNK_USERS, options["users"])
+
+    users = [
+        User(
+            email=f"{options['prefix']}{i:08d}@example.com",
+            name=f"Seed User {i}",
+            password=password,
+        )
+        for i in range(first, last)
+    ]
+    counts = [
+        min(options["max_recipes"], int(lognormal(rng, options["mean_recipes"], 1.2)))
+        for _user in users
+    ]
+    with transaction.atomic():
+        create_users(users)
+        insert_recipes(
+            generate_recipe(rng, user.pk)
+            for user, count in zip(users, counts)
+            for _ in range(count)
+        )
+    return len(users), sum(counts)
+
+
+class Command(BaseCommand):
+    """Django command to generate synthetic users and recipes."""
+
+    help = "Generate users and recipes with realistic distributions, reproducibly from a seed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--mean-recipes", type=float, default=20.0, help="Mean recipes per user."
+        )
+        parser.add_argument("--max-recipes", type=int, default=2000, help="Cap per user.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Worker processes; 0 means one per CPU core.",
+        )
+        parser.add_argument("--prefix", default="seed-", help="Email prefix of generated users.")
+        parser.add_argument(
+            "--password", default="seed-password", help="Password of every generated user."
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Delete users with the prefix first."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        if options["users"] < 1 or options["mean_recipes"] <= 0:
+            raise CommandError("--users and --mean-recipes must be positive.")
+        self.verbosity = options["verbosity"]
+        User = get_user_model()
+        existing = User.objects.filter(email__startswith=options["prefix"])
+        if options["clear"]:
+            self.stdout.write(
+                f"Deleted {delete_users(existing)} rows of previously generated data."
+            )
+        elif existing.exists():
+            raise CommandError(
+                f"Users with the prefix {options['prefix']!r} exist; use --clear or --prefix."
+            )
+
+        # One PBKDF2 run for the whole data set instead of one per user.
+        password = make_password(options["password"])
+        chunks = math.ceil(options["users"] / CHUNK_USERS)
+        workers = min(options["workers"] or os.cpu_count() or 1, chunks)
+        if connection.vendor == "sqlite":
+            workers = 1  # SQLite allows one writer at a time.
+        chunk_options = {
+            key: options[key] for key in ("users", "mean_recipes", "max_recipes", "seed", "prefix")
+        }
+        jobs = [(chunk, chunk_options, password) for chunk in range(chunks)]
+
+        started = time.perf_counter()
+        totals = [0, 0]
+        if workers == 1:
+            results = map(seed_chunk, jobs)
+            self._collect(results, totals, chunks)
+        else:
+            # Forked workers must open their own database connections.
+            connections.close_all()
+            close_idle_connections()
+            context = multiprocessing.get_context("fork")
+            with context.Pool(workers) as pool:
+                self._collect(pool.imap_unordered(seed_chunk, jobs), totals, chunks)
+
+        elapsed = time.perf_counter() - started
+        users, recipes = totals
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {users} users and {recipes} recipes in {elapsed:.1f}s "
+                f"with {workers} workers ({(users + recipes) / elapsed:.0f} rows/s)."
+            )
+        )
+
+    def _collect(self, results, totals, chunks):
+        for done, (users, recipes) in enumerate(results, 1):
+            totals[0] += users
+            totals[1] += recipes
+            if self.verbosity >= 2 or done == chunks:
+                self.stdout.write(f"{done}/{chunks} chunks, {totals[0]} users, {totals[1]} recipes")
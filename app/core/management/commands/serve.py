@@ -0,0 +1,212 @@
+"""
+Django command to serve the app with a pre-forked pool of waitress workers.
+
+The master imports ``app.wsgi.application`` and the URLconf once, binds the
+listening socket and forks the workers, which share both. Signals to the
+master:
+
+* SIGTERM / SIGINT: stop accepting, drain in-flight requests, exit.
+* SIGHUP: reload. The master re-executes itself (new code and settings)
+  keeping the listening socket, while the old workers drain, so no
+  connection is refused.
+* SIGUSR1: print the per-worker request stats.
+
+Workers exiting after ``--max-requests`` (or crashing) are replaced.
+Per-worker stats are also served to staff at api/core/server-stats/.
+Workers write their Prometheus metrics to files in a directory kept across
+reloads, so api/core/metrics/ reports the sum over all workers.
+"""
+
+import json
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+import traceback
+
+from core import metrics, server
+from core.backends.postgresql.pool import close_idle_connections
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.urls import get_resolver
+
+LISTEN_FD_ENV = "SERVE_LISTEN_FD"
+METRICS_DIR_ENV = "SERVE_METRICS_DIR"
+
+
+class Command(BaseCommand):
+    """Django command to run the production WSGI server."""
+
+    help = "Serve app.wsgi.application with multiple waitress worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="0.0.0.0:8000", help="host:port to listen on.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "SERVE_WORKERS", 0),
+            help="Worker processes; 0 means one per CPU core.",
+        )
+        parser.add_argument("--threads", type=int, default=getattr(settings, "SERVE_THREADS", 4))
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=getattr(settings, "SERVE_MAX_REQUESTS", 0),
+            help="Recycle a worker after this many requests; 0 disables recycling.",
+        )
+        parser.add_argument(
+            "--max-requests-jitter",
+            type=int,
+            default=getattr(settings, "SERVE_MAX_REQUESTS_JITTER", 0),
+            help="Random extra requests per worker, so workers do not recycle together.",
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=float,
+            default=getattr(settings, "SERVE_GRACEFUL_TIMEOUT", 30),
+            help="Seconds to let in-flight requests finish on shutdown or reload.",
+        )
+        parser.add_argument("--backlog", type=int, default=2048)
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        if not hasattr(os, "fork"):
+            raise CommandError("serve needs os.fork(); use waitress-serve on this platform.")
+        self.options = options
+        self.workers = options["workers"] or os.cpu_count() or 1
+        self.sock = self._listen(options["bind"], options["backlog"])
+
+        from app.wsgi import application
+
+        # Import every view and serializer once, before forking.
+        get_resolver().url_patterns
+        self.application = application
+
+        server.stats = server.ServerStats(self.workers)
+        metrics.share_across_processes(self._metrics_dir())
+        self.children = {}  # pid -> slot
+        self.state = "running"
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        signal.signal(signal.SIGUSR1, self._on_stats)
+
+        self.stdout.write(
+            f"Serving on {options['bind']} (pid {os.getpid()}) with {self.workers} workers "
+            f"x {options['threads']} threads"
+        )
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+        while self.state == "running":
+            self._reap()
+            time.sleep(0.5)
+
+        if self.state == "reloading":
+            self._reload()
+        self._shutdown()
+
+    def _listen(self, bind, backlog):
+        fd = os.environ.pop(LISTEN_FD_ENV, None)
+        if fd is not None:
+            # Re-executed on SIGHUP: keep serving on the socket we already had.
+            return socket.socket(fileno=int(fd))
+        host, _, port = bind.rpartition(":")
+        sock = socket.create_server((host or "0.0.0.0", int(port)), backlog=backlog)
+        return sock
+
+    def _metrics_dir(self):
+        # Re-executed on SIGHUP: keep the files of the old workers so counters
+        # carry on.
+        path = os.environ.get(METRICS_DIR_ENV)
+        if path is None or not os.path.isdir(path):
+            shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+            path = os.environ[METRICS_DIR_ENV] = tempfile.mkdtemp(
+                prefix="recipe-api-metrics-", dir=shm
+            )
+        return path
+
+    def _spawn(self, slot):
+        # Children must not share the master's database sockets.
+        connections.close_all()
+        close_idle_connections()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid:
+            self.children[pid] = slot
+            return
+        code = 0
+        try:
+            server.stats.reset(slot, os.getpid())
+            jitter = self.options["max_requests_jitter"]
+            max_requests = self.options["max_requests"]
+            if max_requests and jitter:
+                max_requests += random.randint(0, jitter)
+            server.run_worker(
+                self.sock,
+                self.application,
+                slot,
+                threads=self.options["threads"],
+                max_requests=max_requests,
+                graceful_timeout=self.options["graceful_timeout"],
+            )
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # Never fall back into the master's code path in the child.
+            os._exit(code)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            # Workers of a previous generation (before a reload) are not ours to replace.
+            slot = self.children.pop(pid, None)
+            if slot is not None and self.state == "running":
+                self.stdout.write(f"Worker {pid} exited ({status}); starting a replacement.")
+                self._spawn(slot)
+
+    def _on_stop(self, signum, frame):
+        self.state = "stopping"
+
+    def _on_reload(self, signum, frame):
+        self.state = "reloading"
+
+    def _on_stats(self, signum, frame):
+        self.stdout.write(json.dumps(server.stats.snapshot(), indent=2))
+
+    def _reload(self):
+        self.stdout.write("Reloading: draining old workers and re-executing.")
+        self._signal_children(signal.SIGTERM)
+        os.set_inheritable(self.sock.fileno(), True)
+        os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    def _shutdown(self):
+        self.stdout.write("Shutting down: draining workers.")
+        self._signal_children(signal.SIGTERM)
+        deadline = time.monotonic() + self.options["graceful_timeout"] + 5
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        self._signal_children(signal.SIGKILL)
+        self.sock.close()
+        shutil.rmtree(os.environ.pop(METRICS_DIR_ENV), ignore_errors=True)
+
+    def _signal_children(self, signum):
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
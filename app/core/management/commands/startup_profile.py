@@ -0,0 +1,240 @@
+"""
+Django command to profile how long a fresh process takes to boot the app.
+
+A child interpreter is started with ``python -X importtime`` and goes
+through the same steps as a worker: load settings, ``django.setup()``
+(``apps.populate()``), import the URLconf and build the WSGI handler
+(middleware). The command reports the wall time of each phase, the time
+each installed app spends in its own import, ``models`` import and
+``ready()``, and the most expensive modules from the import-time tree.
+
+Use ``--lazy`` / ``--eager`` to compare the ``LAZY_IMPORTS`` boot modes.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PHASE_MARKER = "startup_profile:phase:"
+
+# Runs in the child interpreter. Writes a phase marker to stderr before each
+# phase, so the -X importtime lines that follow can be attributed to it, and
+# prints the measured timings as JSON on the last line of stdout.
+PROFILE_SCRIPT = """
+import json, sys, time
+
+def mark(phase):
+    sys.stderr.write("%(marker)s" + phase + "\\n")
+    sys.stderr.flush()
+
+result = {"phases": {}, "apps": {}}
+
+def timed(phase, func):
+    mark(phase)
+    start = time.perf_counter()
+    value = func()
+    result["phases"][phase] = (time.perf_counter() - start) * 1000
+    return value
+
+def app_timer(label, step, func):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings = result["apps"].setdefault(label, {"import": 0, "models": 0, "ready": 0})
+            timings[step] += (time.perf_counter() - start) * 1000
+    return wrapper
+
+import importlib, importlib.util
+
+def import_module(name, package=None):
+    # -X importtime only reports imports made through the import statement,
+    # which Django's importlib.import_module() calls (apps, models, URLconfs) bypass.
+    if name.startswith("."):
+        name = importlib.util.resolve_name(name, package)
+    __import__(name)
+    return sys.modules[name]
+
+importlib.import_module = import_module
+
+boot = time.perf_counter()
+import django
+from django.conf import settings
+from django.apps import AppConfig
+
+create = AppConfig.create.__func__
+
+def create_timed(cls, entry):
+    start = time.perf_counter()
+    config = create(cls, entry)
+    result["apps"][config.label] = {
+        "name": config.name,
+        "import": (time.perf_counter() - start) * 1000,
+        "models": 0,
+        "ready": 0,
+    }
+    config.import_models = app_timer(config.label, "models", config.import_models)
+    config.ready = app_timer(config.label, "ready", config.ready)
+    return config
+
+AppConfig.create = classmethod(create_timed)
+
+timed("settings", lambda: settings.INSTALLED_APPS)
+timed("apps", django.setup)
+
+def load_urlconf():
+    from django.urls import get_resolver
+    return get_resolver().url_patterns
+
+def load_handler():
+    from django.core.handlers.wsgi import WSGIHandler
+    return WSGIHandler()
+
+timed("urlconf", load_urlconf)
+timed("middleware", load_handler)
+mark("done")
+result["total"] = (time.perf_counter() - boot) * 1000
+result["lazy_imports"] = getattr(settings, "LAZY_IMPORTS", False)
+sys.stdout.write("\\n" + json.dumps(result) + "\\n")
+""" % {
+    "marker": PHASE_MARKER
+}
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into a list of module entries.
+
+    Each entry has the module name, its nesting depth, its self and
+    cumulative time in milliseconds and the boot phase it was imported in.
+    """
+    modules = []
+    phase = "interpreter"
+    for line in stderr.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase = line[len(PHASE_MARKER) :]
+            continue
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # The header line.
+        stripped = name.lstrip()
+        modules.append(
+            {
+                "module": stripped.strip(),
+                "depth": (len(name) - len(stripped) - 1) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "phase": phase,
+            }
+        )
+    return modules
+
+
+def summarize_imports(modules):
+    """Return the total top-level import time and module count of each phase."""
+    phases = {}
+    for entry in modules:
+        summary = phases.setdefault(entry["phase"], {"import_ms": 0.0, "modules": 0})
+        summary["modules"] += 1
+        if entry["depth"] == 0:
+            summary["import_ms"] += entry["cumulative_ms"]
+    return phases
+
+
+class Command(BaseCommand):
+    """Django command to measure process startup time."""
+
+    help = "Profile settings load, apps.populate(), URLconf and middleware import time."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25, help="Number of modules to list.")
+        parser.add_argument(
+            "--depth",
+            type=int,
+            default=1,
+            help="Deepest level of the import tree to list (0 = top-level imports only).",
+        )
+        parser.add_argument(
+            "--min-ms", type=float, default=1.0, help="Hide modules faster than this."
+        )
+        parser.add_argument("--json", action="store_true", help="Print the raw results as JSON.")
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            "--lazy",
+            dest="lazy",
+            action="store_true",
+            default=None,
+            help="Profile with LAZY_IMPORTS=True.",
+        )
+        mode.add_argument(
+            "--eager", dest="lazy", action="store_false", help="Profile with LAZY_IMPORTS=False."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        result = self.profile(options["lazy"])
+        modules = [entry for entry in result.pop("modules") if entry["depth"] <= options["depth"]]
+        modules = [entry for entry in modules if entry["cumulative_ms"] >= options["min_ms"]]
+        modules.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+        result["modules"] = modules[: options["top"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(result, indent=2))
+            return
+        self.report(result)
+
+    def profile(self, lazy):
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+        if lazy is not None:
+            env["LAZY_IMPORTS"] = str(lazy)
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROFILE_SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode:
+            raise CommandError(f"Profiled process failed:\n{proc.stderr[-4000:]}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result["modules"] = parse_importtime(proc.stderr)
+        result["imports"] = summarize_imports(result["modules"])
+        return result
+
+    def report(self, result):
+        mode = "lazy" if result["lazy_imports"] else "eager"
+        self.stdout.write(f"Startup: {result['total']:.1f} ms ({mode} imports)\n")
+
+        self.stdout.write(f"{'phase':<14}{'wall ms':>10}{'import ms':>12}{'modules':>9}")
+        for phase, wall_ms in result["phases"].items():
+            imports = result["imports"].get(phase, {"import_ms": 0.0, "modules": 0})
+            self.stdout.write(
+                f"{phase:<14}{wall_ms:>10.1f}{imports['import_ms']:>12.1f}{imports['modules']:>9}"
+            )
+
+        self.stdout.write(f"\n{'app':<24}{'import ms':>11}{'models ms':>11}{'ready ms':>10}")
+        apps = sorted(
+            result["apps"].items(),
+            key=lambda item: item[1]["import"] + item[1]["models"] + item[1]["ready"],
+            reverse=True,
+        )
+        for label, timings in apps:
+            self.stdout.write(
+                f"{label:<24}{timings['import']:>11.1f}{timings['models']:>11.1f}"
+                f"{timings['ready']:>10.1f}"
+            )
+
+        self.stdout.write(f"\n{'module':<48}{'self ms':>9}{'cum ms':>9}  phase")
+        for entry in result["modules"]:
+            name = "  " * entry["depth"] + entry["module"]
+            self.stdout.write(
+                f"{name:<48}{entry['self_ms']:>9.1f}{entry['cumulative_ms']:>9.1f}"
+                f"  {entry['phase']}"
+            )
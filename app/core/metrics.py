@@ -0,0 +1,448 @@
+"""
+Per-request timings and Prometheus metrics.
+
+``RequestMetricsMiddleware`` opens a ``RequestTimings`` for every request in
+a context variable. While it is open, the ``execute_wrapper`` installed on
+every database connection counts queries and their duration, and code can
+time its own steps with ``timer(name)`` (e.g. token authentication). When
+the response is ready the timings go out as a ``Server-Timing`` header and
+into per-view histograms, served in the Prometheus text format at
+api/core/metrics/.
+
+Under ``manage.py serve`` every worker also writes its values to its own
+memory-mapped file (``SharedValues``) in a directory the master creates
+before forking, and the endpoint sums the files of all workers, so any
+worker answering a scrape reports the totals of the server. Files of
+workers that exited stay, so counters never go backwards when a worker is
+recycled. Outside ``serve`` metrics are those of the process.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+_current = ContextVar("request_timings", default=None)
+
+# Directory of the per-process value files, set by `serve` before it forks.
+shared_dir = None
+# Bytes used, at the start of a value file; then entries of
+# (key length, key, padding to 8 bytes, value).
+USED = struct.Struct("=Q")
+KEY_LENGTH = struct.Struct("=I")
+VALUE = struct.Struct("=d")
+
+
+class RequestTimings:
+    """Timings of one request, in seconds."""
+
+    __slots__ = ("queries", "db", "steps")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.steps = {}
+
+    def add(self, name, duration):
+        self.steps[name] = self.steps.get(name, 0.0) + duration
+
+
+def current_timings():
+    """Return the timings of the request being handled, or None."""
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Collect the timings of everything run inside the block."""
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timer(name):
+    """Add the duration of the block to the current request's timing name."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute_wrapper counting queries run for the current request."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - started
+        timings.queries += 1
+
+
+@receiver(connection_created)
+def install_query_wrapper(sender, connection, **kwargs):
+    # The wrapper reads the request from a context variable, so one wrapper per
+    # connection also covers queries run in sync_to_async executor threads.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class SharedValues:
+    """
+    One process's metric values in a memory-mapped file, readable by others.
+
+    Only this process writes the file. Entries are appended and the used
+    size is updated after the entry is complete, so readers see whole
+    entries; values are aligned 8-byte writes.
+    """
+
+    def __init__(self, directory, size=1 << 16):
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix=f"{os.getpid()}-", suffix=".bin")
+        os.ftruncate(fd, size)
+        self._map = mmap.mmap(fd, size)
+        os.close(fd)
+        self._used = USED.size
+        self._offsets = {}
+        self._lock = threading.Lock()
+        USED.pack_into(self._map, 0, self._used)
+
+    def set(self, key, value):
+        with self._lock:
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            VALUE.pack_into(self._map, offset, value)
+
+    def _append(self, key):
+        data = key.encode()
+        offset = self._used + KEY_LENGTH.size + len(data)
+        offset += -offset % VALUE.size
+        end = offset + VALUE.size
+        if end > len(self._map):
+            self._map.resize(max(end, len(self._map) * 2))
+        KEY_LENGTH.pack_into(self._map, self._used, len(data))
+        self._map[self._used + KEY_LENGTH.size : self._used + KEY_LENGTH.size + len(data)] = data
+        VALUE.pack_into(self._map, offset, 0.0)
+        self._used = end
+        USED.pack_into(self._map, 0, end)
+        self._offsets[key] = offset
+        return offset
+
+
+def read_shared_values(directory):
+    """Return {key: value summed over every process's file} in directory."""
+    totals = {}
+    for name in os.listdir(directory):
+        try:
+            with open(os.path.join(directory, name), "rb") as handle:
+                data = handle.read()
+        except OSError:
+            continue
+        if len(data) < USED.size:
+            continue
+        used = min(USED.unpack_from(data, 0)[0], len(data))
+        position = USED.size
+        while position + KEY_LENGTH.size <= used:
+            (length,) = KEY_LENGTH.unpack_from(data, position)
+            key = data[position + KEY_LENGTH.size : position + KEY_LENGTH.size + length].decode()
+            offset = position + KEY_LENGTH.size + length
+            offset += -offset % VALUE.size
+            totals[key] = totals.get(key, 0.0) + VALUE.unpack_from(data, offset)[0]
+            position = offset + VALUE.size
+    return totals
+
+
+_values = None
+_values_lock = threading.Lock()
+
+
+def _shared_values():
+    # One file per process; a forked worker opens its own.
+    global _values
+    with _values_lock:
+        if _values is None or _values.pid != os.getpid():
+            values = SharedValues(shared_dir)
+            values.pid = os.getpid()
+            _values = values
+        return _values
+
+
+def share_across_processes(directory):
+    """Write metric values into directory and render the sum of all its files."""
+    global shared_dir, _values
+    shared_dir = directory
+    _values = None
+
+
+# Every Histogram and Counter, to drop the values a forked worker inherits.
+_instances = weakref.WeakSet()
+
+
+def _forget_inherited_values():
+    # The parent's file already holds them; counting them again in the
+    # child's file would add them twice.
+    if shared_dir is not None:
+        for metric in list(_instances):
+            metric.reset()
+
+
+os.register_at_fork(after_in_child=_forget_inherited_values)
+
+
+def _share(name, label_values, index, value):
+    if shared_dir is not None:
+        _shared_values().set(json.dumps([name, list(label_values), index]), value)
+
+
+def _shared_series(name, merged):
+    """Return {label values: {index: value}} of metric name from merged values."""
+    series = {}
+    for key, value in merged.items():
+        metric, label_values, index = json.loads(key)
+        if metric == name:
+            series.setdefault(tuple(label_values), {})[index] = value
+    return series
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with one series per label set."""
+
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def observe(self, label_values, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+            _share(self.name, label_values, index, series[index])
+            _share(self.name, label_values, len(series) - 1, series[-1])
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self, merged=None):
+        lines = _header(self.name, self.documentation, "histogram")
+        if merged is not None:
+            size = len(self.buckets) + 2
+            series = {
+                label_values: [_number(values.get(i, 0)) for i in range(size)]
+                for label_values, values in _shared_series(self.name, merged).items()
+            }
+        else:
+            with self._lock:
+                series = {key: list(values) for key, values in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            pairs = list(zip(self.labels, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Thread-safe Prometheus counter with one series per label set."""
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._series = {}
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def inc(self, label_values, amount=1):
+        with self._lock:
+            value = self._series[label_values] = self._series.get(label_values, 0) + amount
+            _share(self.name, label_values, 0, value)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self, merged=None):
+        lines = _header(self.name, self.documentation, "counter")
+        if merged is not None:
+            series = {
+                label_values: _number(values[0])
+                for label_values, values in _shared_series(self.name, merged).items()
+            }
+        else:
+            with self._lock:
+                series = dict(self._series)
+        for label_values, value in sorted(series.items()):
+            lines.append(f"{self.name}{_labels(zip(self.labels, label_values))} {value}")
+        return lines
+
+
+def _number(value):
+    # Counts are stored as floats in the shared files; render them as integers.
+    return int(value) if float(value).is_integer() else value
+
+
+def _header(name, documentation, kind):
+    return [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+
+
+def _labels(pairs):
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+requests_total = Counter(
+    "http_requests_total",
+    "Requests handled, by view, method and status.",
+    ("view", "method", "status"),
+)
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from the first middleware to the response.",
+    ("view", "method"),
+    DURATION_BUCKETS,
+)
+db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per request.",
+    ("view", "method"),
+    DURATION_BUCKETS,
+)
+db_queries = Histogram(
+    "http_request_db_queries",
+    "Database queries per request.",
+    ("view", "method"),
+    QUERY_BUCKETS,
+)
+REQUEST_METRICS = (requests_total, request_duration, db_duration, db_queries)
+
+# Background jobs (core.jobs), recorded by the process that runs them.
+jobs_total = Counter(
+    "jobs_total",
+    "Job attempts finished, by task and outcome (done, retried or failed).",
+    ("task", "status"),
+)
+job_wait = Histogram(
+    "job_wait_seconds",
+    "Time from when a job was due to when a worker started it.",
+    ("task",),
+    JOB_BUCKETS,
+)
+job_duration = Histogram(
+    "job_duration_seconds",
+    "Time spent running a job attempt.",
+    ("task",),
+    JOB_BUCKETS,
+)
+JOB_METRICS = (jobs_total, job_wait, job_duration)
+
+
+def observe(view, method, status, total, timings):
+    """Record a finished request in the histograms."""
+    key = (view, method)
+    requests_total.inc((view, method, str(status)))
+    request_duration.observe(key, total)
+    db_duration.observe(key, timings.db)
+    db_queries.observe(key, timings.queries)
+
+
+def reset():
+    """Clear every request and job metric of this process."""
+    for metric in REQUEST_METRICS + JOB_METRICS:
+        metric.reset()
+
+
+def server_timing(timings, total):
+    """Format timings as a Server-Timing header value (durations in ms)."""
+    entries = [f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries"']
+    entries.extend(f"{name};dur={duration * 1000:.2f}" for name, duration in timings.steps.items())
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def render_prometheus():
+    """
+    Return the metrics in the Prometheus text format.
+
+    Request and job metrics are summed over the server's workers when they
+    share values (see share_across_processes); the rest are this process's.
+    """
+    from core import response_cache
+    from core.backends.postgresql.pool import pool_stats
+
+    merged = read_shared_values(shared_dir) if shared_dir is not None else None
+    lines = []
+    for metric in REQUEST_METRICS + JOB_METRICS:
+        lines.extend(metric.render(merged))
+    lines.extend(render_job_queue())
+
+    cache = response_cache.stats.snapshot()
+    lines.extend(_header("response_cache_lookups_total", "Response cache lookups.", "counter"))
+    lines.append(f'response_cache_lookups_total{{result="hit"}} {cache["hits"]}')
+    lines.append(f'response_cache_lookups_total{{result="miss"}} {cache["misses"]}')
+
+    pools = sorted(pool_stats().items())
+    if pools:
+        lines.extend(_header("db_pool_connections", "Database pool connections.", "gauge"))
+        for alias, pool in pools:
+            for state in ("size", "in_use", "idle", "max_size"):
+                labels = _labels([("alias", alias), ("state", state)])
+                lines.append(f"db_pool_connections{labels} {pool[state]}")
+    return "\n".join(lines) + "\n"
+
+
+def render_job_queue():
+    """Return the depth and lag of the job queues, read from the database."""
+    from core.jobs import queue_stats
+    from django.utils import timezone
+
+    stats = sorted(queue_stats().items())
+    lines = _header("job_queue_depth", "Unfinished jobs, by queue and status.", "gauge")
+    for (queue, status), (count, _oldest) in stats:
+        lines.append(f"job_queue_depth{_labels([('queue', queue), ('status', status)])} {count}")
+    lines.extend(_header("job_queue_lag_seconds", "Age of the oldest due, unstarted job.", "gauge"))
+    now = timezone.now()
+    for (queue, status), (_count, oldest) in stats:
+        if status == "queued":
+            lag = max(0.0, (now - oldest).total_seconds())
+            lines.append(f"job_queue_lag_seconds{_labels([('queue', queue)])} {lag:.3f}")
+    return lines
@@ -0,0 +1,115 @@
+"""
+Middleware for the core app.
+"""
+
+import asyncio
+import time
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from core import metrics
+from core.routers import pin_user, request_user_id, routing_context
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+class ReplicaRoutingMiddleware:
+    """Scope replica routing to the request and pin users after they write."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with routing_context(request) as state:
+            response = self.get_response(request)
+            if state.wrote:
+                self._pin_writer(request, response)
+        return response
+
+    async def __acall__(self, request):
+        with routing_context(request) as state:
+            response = await self.get_response(request)
+            if state.wrote:
+                await sync_to_async(self._pin_writer)(request, response)
+        return response
+
+    def _pin_writer(self, request, response):
+        user_id = request_user_id(request, evaluate=True)
+        if user_id is not None:
+            pin_user(response, user_id)
+
+
+class RequestMetricsMiddleware:
+    """
+    Time every request, its database queries, view and rendering.
+
+    The timings are sent back in a ``Server-Timing`` header and recorded in
+    per-view histograms (see ``core.metrics``). Keep it first in MIDDLEWARE
+    so the total covers the other middleware too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "SERVER_TIMING_HEADER", True)
+        if asyncio.iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with metrics.collect() as timings:
+            response = self.get_response(request)
+        self._finish(request, response, timings, started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with metrics.collect() as timings:
+            response = await self.get_response(request)
+        self._finish(request, response, timings, started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metrics_view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # The view returned an unrendered response (e.g. a DRF Response); time
+        # the rendering separately from the view.
+        timings = metrics.current_timings()
+        view_started = getattr(request, "_metrics_view_started", None)
+        if timings is None or view_started is None:
+            return response
+        view_finished = time.perf_counter()
+        timings.add("view", view_finished - view_started)
+        request._metrics_view_started = None
+
+        def rendered(response):
+            timings.add("render", time.perf_counter() - view_finished)
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, timings, started):
+        finished = time.perf_counter()
+        view_started = getattr(request, "_metrics_view_started", None)
+        if view_started is not None:
+            timings.add("view", finished - view_started)
+        total = finished - started
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match is not None else "unmatched"
+        metrics.observe(view, request.method, response.status_code, total, timings)
+        if self.server_timing:
+            response["Server-Timing"] = metrics.server_timing(timings, total)
@@ -0,0 +1,16 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_recipe"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(fields=["user", "-id"], name="core_recipe_user_id_desc"),
+        ),
+    ]
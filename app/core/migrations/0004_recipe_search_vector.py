@@ -0,0 +1,60 @@
+# Generated by Django 4.0.10 on 2026-10-18 19:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('pg_catalog.english', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('pg_catalog.english', coalesce({row}description, '')), 'B')"
+)
+
+CREATE_TRIGGER_SQL = [
+    f"""
+    CREATE FUNCTION core_recipe_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER core_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON core_recipe
+    FOR EACH ROW EXECUTE PROCEDURE core_recipe_search_vector_update()
+    """,
+    f"UPDATE core_recipe SET search_vector = {SEARCH_VECTOR_SQL.format(row='')}",
+    "CREATE INDEX core_recipe_search_vector_gin ON core_recipe USING gin (search_vector)",
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP INDEX IF EXISTS core_recipe_search_vector_gin",
+    "DROP TRIGGER IF EXISTS core_recipe_search_vector_trigger ON core_recipe",
+    "DROP FUNCTION IF EXISTS core_recipe_search_vector_update()",
+]
+
+
+def _run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_recipe_user_id_desc_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            _run_on_postgres(CREATE_TRIGGER_SQL), _run_on_postgres(DROP_TRIGGER_SQL)
+        ),
+    ]
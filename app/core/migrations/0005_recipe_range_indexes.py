@@ -0,0 +1,20 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_recipe_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(fields=["user", "time_minutes"], name="core_recipe_user_time"),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(fields=["user", "price"], name="core_recipe_user_price"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:15
+
+import core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0007_userversion"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="userversion",
+            name="version",
+            field=models.PositiveBigIntegerField(default=core.models.initial_user_version),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.10 on 2026-10-18 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0008_userversion_initial_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="image",
+            field=models.ImageField(
+                blank=True, editable=False, null=True, upload_to="uploads/recipe/"
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.0.10 on 2026-10-18 19:40
+
+from django.db import migrations
+
+# Admin search_fields use icontains, i.e. UPPER(column) LIKE UPPER('%term%'),
+# which only a trigram index on the same expression can serve.
+TRIGRAM_INDEXES = {
+    "core_user_email_trgm": ("core_user", "email"),
+    "core_user_name_trgm": ("core_user", "name"),
+    "core_recipe_title_trgm": ("core_recipe", "title"),
+    "core_tag_name_trgm": ("core_tag", "name"),
+    "core_ingredient_name_trgm": ("core_ingredient", "name"),
+}
+
+# Built concurrently, outside a transaction, so large tables stay writable.
+CREATE_SQL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin "
+    f"(UPPER({column}) gin_trgm_ops)"
+    for name, (table, column) in TRIGRAM_INDEXES.items()
+]
+
+DROP_SQL = [f"DROP INDEX CONCURRENTLY IF EXISTS {name}" for name in TRIGRAM_INDEXES]
+
+
+def _run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("core", "0010_job"),
+    ]
+
+    operations = [
+        migrations.RunPython(_run_on_postgres(CREATE_SQL), _run_on_postgres(DROP_SQL)),
+    ]
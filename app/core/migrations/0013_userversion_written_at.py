@@ -0,0 +1,17 @@
+# Generated by Django 4.0.10 on 2026-10-18 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0012_importcheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userversion",
+            name="written_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
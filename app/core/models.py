@@ -1,7 +1,10 @@
 """Database models for the application."""
 
+import time
+
 from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
 
@@ -23,11 +26,9 @@ class UserManager(BaseUserManager):
 
     def create_superuser(self, email, password=None, **extra_fields):
         """Create and return a superuser with an email and password."""
-        user = self.create_user(email, password)
-        user.is_staff = True
-        user.is_superuser = True
-        user.save(using=self._db)
-        return user
+        extra_fields.setdefault("is_staff", True)
+        extra_fields.setdefault("is_superuser", True)
+        return self.create_user(email, password, **extra_fields)
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -59,8 +60,163 @@ class Recipe(models.Model):
     time_minutes = models.IntegerField()
     price = models.DecimalField(max_digits=5, decimal_places=2)
     link = models.CharField(max_length=255, blank=True)
-    # ingredients = models.ManyToManyField("Ingredient")
-    # tags = models.ManyToManyField("Tag")
+    # Maintained by a database trigger and GIN-indexed on PostgreSQL
+    # (see migration 0004); always NULL on other backends.
+    search_vector = SearchVectorField(null=True, editable=False)
+    tags = models.ManyToManyField("Tag", blank=True)
+    ingredients = models.ManyToManyField("Ingredient", blank=True)
+    # Set by the upload-image endpoint (recipe.images): the largest resized
+    # variant, plus {variant name: {"name", "width", "height"}} for all of them.
+    image = models.ImageField(null=True, blank=True, upload_to="uploads/recipe/", editable=False)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of a user's recipes (user_id, id DESC).
+            models.Index(fields=["user", "-id"], name="core_recipe_user_id_desc"),
+            # Back the time_minutes/price range filters and facets.
+            models.Index(fields=["user", "time_minutes"], name="core_recipe_user_time"),
+            models.Index(fields=["user", "price"], name="core_recipe_user_price"),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class Tag(models.Model):
+    """Tag for filtering recipes."""
+
+    name = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "name"], name="core_tag_unique_user_name"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class Ingredient(models.Model):
+    """Ingredient for recipes."""
+
+    name = models.CharField(max_length=255)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="core_ingredient_unique_user_name"
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+def initial_user_version():
+    """Start counters at the current time in microseconds so they never repeat."""
+    return time.time_ns() // 1000
+
+
+class UserVersion(models.Model):
+    """
+    Per-user counter bumped on every write to the user's data.
+
+    Read with a single primary-key lookup to build ETags and cache keys
+    without loading or serializing the data itself (see core.versioning).
+    Counters start from a timestamp rather than 0, so a recreated user or a
+    restored database never reuses a version that is still cached somewhere.
+    ``written_at`` tells readers whether replicas may still lag behind the
+    version (see core.routers).
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="data_version",
+    )
+    version = models.PositiveBigIntegerField(default=initial_user_version)
+    written_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id}@{self.version}"
+
+
+class Job(models.Model):
+    """
+    A unit of background work, run by `manage.py run_worker` (see core.jobs).
+
+    Rows are claimed by setting ``locked_by`` and ``locked_until``; a job whose
+    lock has expired is treated as abandoned by a dead worker and claimed again.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    queue = models.CharField(max_length=64, default="default")
+    task = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    # Set for jobs started on behalf of a user, who may then read their status.
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField()
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Backs the claim query; finished jobs stay out of the index.
+            models.Index(
+                fields=["queue", "run_at"],
+                name="core_job_pending",
+                condition=models.Q(status__in=["queued", "running"]),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task}#{self.pk} ({self.status})"
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Rows of an input file that `manage.py import_recipes` has committed.
+
+    Updated in the transaction that loads each batch, so an interrupted
+    import resumes exactly after the last committed row.
+    """
+
+    source = models.CharField(max_length=1024, unique=True)
+    rows = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}:{self.rows}"
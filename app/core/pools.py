@@ -0,0 +1,121 @@
+"""
+Bounded executors that reject work instead of queueing it forever.
+
+``BoundedPool`` runs at most ``max_workers`` tasks at once and lets at most
+``max_pending`` more wait; anything beyond that raises the pool's
+``overloaded`` exception (a 503 by default) straight away, so a burst of
+expensive requests cannot take the capacity of cheap ones. Apps subclass it
+with their own ``overloaded`` exception and, for process pools, their own
+``_new_executor()``: the password hashing pool in user.hashing, the image
+pool in recipe.images and the provisioning pool in user.provisioning.
+
+Callers that hold a server thread while they wait use ``run()``, which
+also caps how many of them may wait at once (``max_blocking``, by default
+one less than the worker's threads, see core.server.get_threads).
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core import server
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+
+
+class PoolOverloaded(exceptions.APIException):
+    """Raised when every worker of a bounded pool is busy and its queue is full."""
+
+    status_code = 503
+    default_detail = _("The server is busy, please retry shortly.")
+    default_code = "overloaded"
+    # Picked up by DRF's exception handler as a Retry-After header.
+    wait = 1
+
+
+class BoundedPool:
+    """A bounded executor that rejects work instead of queueing it forever."""
+
+    overloaded = PoolOverloaded
+    thread_name_prefix = "bounded-pool"
+
+    def __init__(self, max_workers=None, max_pending=None, max_blocking=None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        if max_pending is None:
+            max_pending = self.max_workers * 4
+        self.max_pending = max_pending
+        self.max_blocking = max_blocking
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_pending)
+        self._blocking = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        """Schedule fn(*args) and return its future, or raise ``overloaded``."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise self.overloaded()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn, *args):
+        """
+        Run fn(*args) on the pool and block until it finishes.
+
+        Raises ``overloaded`` when max_blocking callers are already waiting.
+        """
+        blocking = self._get_blocking()
+        if not blocking.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise self.overloaded()
+        try:
+            return self.submit(fn, *args).result()
+        finally:
+            blocking.release()
+
+    def shutdown(self):
+        """Stop the executor; a new one is started on the next submit."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _get_executor(self):
+        # Created lazily so forked workers never inherit a parent's threads.
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = self._new_executor()
+        return self._executor
+
+    def _get_blocking(self):
+        # Sized lazily, once a serve worker knows how many threads it has.
+        if self._blocking is None:
+            with self._lock:
+                if self._blocking is None:
+                    limit = self.max_blocking or max(1, server.get_threads() - 1)
+                    self._blocking = threading.BoundedSemaphore(limit)
+        return self._blocking
+
+    def _new_executor(self):
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+        )
+
+    def _release(self, future):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+        self._slots.release()
@@ -0,0 +1,199 @@
+"""
+Host-wide rate limiting in shared memory.
+
+``SharedRateLimiter`` keeps token buckets in a memory-mapped file
+(``THROTTLE_TABLE_PATH``, by default under /dev/shm) that every worker
+process on the host maps, so ``manage.py serve`` workers share one budget per
+client without a cache server. A check costs a few microseconds: no network
+hop, no system call beyond two byte-range locks.
+
+The file is a fixed-size table of ``SLOT`` records (key hash, tokens, last
+update, time the bucket is full again), split into stripes. Its layout is
+part of the file name, so a worker configured with another table size maps
+a file of its own instead of resizing one that running workers still map. A key lives in
+one stripe, found by open addressing within it; only that stripe is locked,
+with an ``fcntl`` record lock against other processes and a
+``threading.Lock`` against other threads of this one (record locks are per
+process). Slots whose bucket has refilled are free for reuse; when a stripe
+is full of live buckets the stalest one is evicted, which forgets a client
+rather than blocking it.
+
+``SharedRateThrottle`` plugs the limiter into DRF views through their
+``throttle_scope``, with rates from ``SHARED_THROTTLE_RATES``. Clients are
+told apart by DRF's ``get_ident``: the peer address, or the address
+``NUM_PROXIES`` trusted proxies in front of the app put in X-Forwarded-For.
+"""
+
+import fcntl
+import hashlib
+import mmap
+import os
+import stat
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.throttling import ScopedRateThrottle
+
+# key hash, tokens, updated at, full at (seconds since the epoch)
+SLOT = struct.Struct("=Qddd")
+# Slots probed for a key, from its home slot, within its stripe.
+PROBES = 8
+
+
+def default_table_path():
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, "recipe-api-throttle")
+
+
+class SharedRateLimiter:
+    """Token buckets in a memory-mapped file shared by the processes of a host."""
+
+    def __init__(self, path, slots=65536, stripes=256):
+        self.stripe_slots = max(PROBES, slots // stripes)
+        self.stripes = stripes
+        self.size = self.stripes * self.stripe_slots * SLOT.size
+        self.path = f"{path}-{self.stripes}x{self.stripe_slots}"
+        # The directory is usually world-writable /dev/shm: never follow a
+        # planted symlink, and only use a table that we own.
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                info = os.fstat(self._fd)
+                if not stat.S_ISREG(info.st_mode) or info.st_uid != os.geteuid():
+                    raise ImproperlyConfigured(f"{self.path} is not a file owned by this user.")
+                if info.st_size == 0:
+                    # New file: nobody maps it yet.
+                    os.ftruncate(self._fd, self.size)
+                elif info.st_size != self.size:
+                    # Shrinking or growing a table that other workers map
+                    # would crash them with SIGBUS.
+                    raise ImproperlyConfigured(
+                        f"{self.path} holds {info.st_size} bytes, not the {self.size} of a "
+                        f"{self.stripes}x{self.stripe_slots} table; remove it or change "
+                        "THROTTLE_TABLE_PATH."
+                    )
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        except BaseException:
+            os.close(self._fd)
+            raise
+        self._map = mmap.mmap(self._fd, self.size)
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+
+    def hit(self, key, capacity, refill_rate, now=None):
+        """
+        Take a token from key's bucket of capacity, refilled at refill_rate/s.
+
+        Returns ``(allowed, wait)``: wait is the number of seconds until a
+        token is available when the request is not allowed.
+        """
+        now = time.time() if now is None else now
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+        digest = digest or 1  # 0 marks an empty slot.
+        stripe = digest % self.stripes
+        home = (digest // self.stripes) % self.stripe_slots
+        start = stripe * self.stripe_slots * SLOT.size
+        length = self.stripe_slots * SLOT.size
+
+        with self._locks[stripe]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, length, start)
+            try:
+                offset, tokens, updated = self._find(digest, start, home, now)
+                # max(): a wall clock stepped back must not take tokens away.
+                tokens = min(capacity, tokens + max(0.0, now - updated) * refill_rate)
+                allowed = tokens >= 1
+                if allowed:
+                    tokens -= 1
+                full_at = now + (capacity - tokens) / refill_rate
+                SLOT.pack_into(self._map, offset, digest, tokens, now, full_at)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+        return allowed, (0.0 if allowed else (1 - tokens) / refill_rate)
+
+    def _find(self, digest, start, home, now):
+        """Return (offset, tokens, updated) of digest's slot, claiming one if needed."""
+        free = stalest = None
+        for probe in range(PROBES):
+            offset = start + (home + probe) % self.stripe_slots * SLOT.size
+            key, tokens, updated, full_at = SLOT.unpack_from(self._map, offset)
+            if key == digest:
+                return offset, tokens, updated
+            # A bucket stamped in the future predates a step back of the wall
+            # clock; how long ago is unknown, so it counts as refilled.
+            if free is None and (key == 0 or full_at <= now or updated > now):
+                free = offset
+            if stalest is None or updated < stalest[1]:
+                stalest = (offset, updated)
+        # A fresh bucket: full, so the refill computed by hit() is a no-op.
+        return (free if free is not None else stalest[0]), float("inf"), now
+
+    def reset(self):
+        """Empty every bucket."""
+        for stripe in range(self.stripes):
+            start = stripe * self.stripe_slots * SLOT.size
+            length = self.stripe_slots * SLOT.size
+            with self._locks[stripe]:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, length, start)
+                try:
+                    self._map[start : start + length] = bytes(length)
+                finally:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, length, start)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+@receiver(setting_changed)
+def drop_limiter(setting, **kwargs):
+    global _limiter
+    if setting in ("THROTTLE_TABLE_PATH", "THROTTLE_TABLE_SLOTS"):
+        _limiter = None
+
+
+def get_limiter():
+    """Return this process's mapping of the host's rate limit table."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = SharedRateLimiter(
+                    getattr(settings, "THROTTLE_TABLE_PATH", "") or default_table_path(),
+                    slots=getattr(settings, "THROTTLE_TABLE_SLOTS", 65536),
+                )
+    return _limiter
+
+
+class SharedRateThrottle(ScopedRateThrottle):
+    """
+    Throttle by client address per view ``throttle_scope``, across all workers.
+
+    Rates ("10/min" etc.) come from SHARED_THROTTLE_RATES; a scope without a
+    rate is not throttled. Requests are allowed in bursts of up to the
+    rate's count, refilled evenly over its period.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        key = f"{self.scope}:{self.get_ident(request)}"
+        allowed, self._wait = get_limiter().hit(
+            key, self.num_requests, self.num_requests / self.duration
+        )
+        return allowed
+
+    def get_rate(self):
+        return getattr(settings, "SHARED_THROTTLE_RATES", {}).get(self.scope)
+
+    def wait(self):
+        return self._wait
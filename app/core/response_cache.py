@@ -0,0 +1,110 @@
+"""
+Read-through cache for per-user API responses.
+
+Cached entries are keyed by view, action, user, the user's data version
+(core.versioning) and the full request URL. ``post_save``/``post_delete`` on
+a user's recipes, tags and ingredients bump that version (core.signals), so
+a write makes every cached response of that user, and of no other user,
+unreachable without deleting any keys; stale entries simply age out.
+
+Only serialized response data is stored, which keeps entries picklable for
+the local-memory, file-based or any shared backend configured in CACHES.
+"""
+
+import hashlib
+import threading
+
+from core.versioning import DataVersionMixin
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters for one worker process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def snapshot(self):
+        """Return the counters and the hit ratio as a dict."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        }
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    """Return the cache backend used for responses."""
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+class CachedResponseMixin(DataVersionMixin):
+    """
+    Serve ``list`` and ``retrieve`` from the response cache.
+
+    Mix in after VersionETagMixin (which answers 304s first) and before the
+    DRF generic view/viewset. Responses carry ``X-Cache: HIT`` or ``MISS``.
+    """
+
+    cached_actions = ("list", "retrieve")
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(super().retrieve, request, *args, **kwargs)
+
+    def get_response_cache_key(self, request):
+        """Return the cache key for the current request."""
+        # The absolute URL covers query parameters and the host used in page links.
+        url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+        return ":".join(
+            [
+                "response",
+                type(self).__name__,
+                self.action,
+                str(request.user.pk),
+                str(self.get_data_version()),
+                url,
+            ]
+        )
+
+    def _cached(self, handler, request, *args, **kwargs):
+        if self.action not in self.cached_actions:
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        stats.record(hit=data is not None)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, getattr(settings, "RESPONSE_CACHE_TTL", 300))
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,148 @@
+"""
+Database router sending safe reads of recipes and users to read replicas.
+
+Routing is decided per request by core.middleware.ReplicaRoutingMiddleware:
+
+* Outside a request (management commands, shells, workers) everything
+  uses the primary.
+* A request with an unsafe method, or one that has written anything so far,
+  uses the primary for all of its queries.
+* After a request writes, its user is pinned to the primary for
+  ``DB_REPLICA_PIN_SECONDS`` so they read their own writes despite replica
+  lag. The pin is carried by the client, as a signed ``db_pin`` cookie and
+  ``X-DB-Pin`` response header (clients without cookies send it back in that
+  request header), so it holds whichever worker or host serves the next
+  request without any shared storage.
+* A request that reads the user's data version (core.versioning) within
+  ``DB_REPLICA_PIN_SECONDS`` of the user's last write reads the primary from
+  then on, whatever the client sent, so rows never lag the version they are
+  cached or tagged under.
+* Other safe-method reads of ``core.Recipe`` and ``core.User`` go to one of
+  ``DATABASE_REPLICAS``, picked once per request.
+
+Tokens, version counters and everything else stay on the primary, so token
+authentication right after login always sees the new token.
+"""
+
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import SimpleLazyObject, empty
+
+REPLICATED_MODELS = {"core.recipe", "core.user"}
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PIN_COOKIE = "db_pin"
+PIN_HEADER = "X-DB-Pin"
+PIN_SALT = "core.routers.pin"
+
+_state = contextvars.ContextVar("db_routing_state", default=None)
+
+
+class RoutingState:
+    """Routing decisions made so far for one request."""
+
+    def __init__(self, request):
+        self.request = request
+        self.pinned = request.method not in SAFE_METHODS
+        self.wrote = False
+        self.replica = None
+        self.pin_checked = False
+
+
+@contextmanager
+def routing_context(request):
+    """Route the queries made inside the block on behalf of request."""
+    state = RoutingState(request)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def pin_seconds():
+    return getattr(settings, "DB_REPLICA_PIN_SECONDS", 10)
+
+
+def pin_user(response, user_id):
+    """Have the client send the user's reads to the primary for the next few seconds."""
+    value = signing.TimestampSigner(salt=PIN_SALT).sign(str(user_id))
+    response.set_cookie(PIN_COOKIE, value, max_age=pin_seconds(), httponly=True, samesite="Lax")
+    response[PIN_HEADER] = value
+
+
+def is_pinned(request, user_id):
+    """Return whether request carries a live pin for user_id."""
+    value = request.COOKIES.get(PIN_COOKIE) or request.headers.get(PIN_HEADER)
+    if not value:
+        return False
+    try:
+        pinned_id = signing.TimestampSigner(salt=PIN_SALT).unsign(value, max_age=pin_seconds())
+    except signing.BadSignature:
+        return False
+    return pinned_id == str(user_id)
+
+
+def pin_request():
+    """Send the rest of the current request's reads to the primary."""
+    state = _state.get()
+    if state is not None:
+        state.pinned = True
+
+
+def request_user_id(request, evaluate=False):
+    """Return the id of the request's authenticated user, if known."""
+    user = getattr(request, "user", None)
+    # Evaluating a session user from inside the router would recurse into it.
+    if isinstance(user, SimpleLazyObject) and user._wrapped is empty and not evaluate:
+        return None
+    if user is None or not user.is_authenticated:
+        return None
+    return user.pk
+
+
+class ReplicaRouter:
+    """Route safe reads of replicated models to a replica."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower not in REPLICATED_MODELS:
+            return None
+        replicas = getattr(settings, "DATABASE_REPLICAS", [])
+        state = _state.get()
+        if not replicas or state is None or state.pinned:
+            return None
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if not state.pin_checked:
+            user_id = request_user_id(state.request)
+            if user_id is not None:
+                state.pin_checked = True
+                if is_pinned(state.request, user_id):
+                    state.pinned = True
+                    return DEFAULT_DB_ALIAS
+        if state.replica is None:
+            state.replica = random.choice(replicas)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *getattr(settings, "DATABASE_REPLICAS", [])}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in getattr(settings, "DATABASE_REPLICAS", []):
+            return False
+        return None
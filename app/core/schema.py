@@ -0,0 +1,210 @@
+"""
+Precomputed OpenAPI schema.
+
+``manage.py build_schema`` renders the drf-spectacular schema once, as YAML
+and JSON (each also gzipped), into ``SCHEMA_DIR`` together with the code
+version it was built from. ``schema_view`` serves those files with a strong
+ETag, so a request costs a file read at most once per process and a dict
+lookup afterwards instead of introspecting every view and serializer.
+
+If the files are missing or were built from a different code version
+(``APP_VERSION``, or a fingerprint of the project's source files), the first
+request in the process regenerates them; later requests never regenerate
+again. Files are replaced atomically and the metadata is written last, so
+a worker reading while another regenerates sees whole files, and a
+matching version only once the files of that version are in place.
+"""
+
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from importlib import import_module
+from importlib.metadata import version as package_version
+from pathlib import Path
+
+from core.etags import etag_matches
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_safe
+
+logger = logging.getLogger(__name__)
+
+# format -> (renderer, content type). drf-spectacular is only imported when a
+# schema has to be generated, not when a prebuilt one is served.
+SCHEMA_FORMATS = {
+    "yaml": ("drf_spectacular.renderers.OpenApiYamlRenderer", "application/vnd.oai.openapi"),
+    "json": ("drf_spectacular.renderers.OpenApiJsonRenderer", "application/vnd.oai.openapi+json"),
+}
+METADATA_FILE = "schema.meta.json"
+
+_lock = threading.Lock()
+# format -> {"body", "gzip", "etag", "gzip_etag"} once resolved in this process
+_loaded = None
+
+
+def get_schema_dir():
+    return Path(getattr(settings, "SCHEMA_DIR", settings.BASE_DIR / "openapi"))
+
+
+def code_version():
+    """Return the version string the schema is keyed on."""
+    configured = getattr(settings, "APP_VERSION", "")
+    if configured:
+        return configured
+    return source_fingerprint()
+
+
+@functools.lru_cache(maxsize=None)
+def source_fingerprint():
+    """
+    Fingerprint the project's Python files and the schema generator.
+
+    Only the packages of the project's own apps and its URLconf are read,
+    not the media or other data under BASE_DIR. Cached per process: the
+    code a process runs does not change while it runs.
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(config.path).resolve() for config in apps.get_app_configs()}
+    roots.add(Path(import_module(settings.ROOT_URLCONF).__file__).resolve().parent)
+    digest = hashlib.sha1(package_version("drf-spectacular").encode())
+    for root in sorted(root for root in roots if root.is_relative_to(base_dir)):
+        for path in sorted(root.rglob("*.py")):
+            stat = path.stat()
+            digest.update(
+                f"{path.relative_to(base_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+            )
+    return digest.hexdigest()
+
+
+def render_schema():
+    """Generate the schema and return {format: rendered bytes}."""
+    from drf_spectacular.generators import SchemaGenerator
+
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    return {
+        name: import_string(renderer)().render(schema)
+        for name, (renderer, _type) in SCHEMA_FORMATS.items()
+    }
+
+
+def build_schema(directory=None, version=None):
+    """Write every schema format, gzipped copies and metadata into directory."""
+    directory = Path(directory or get_schema_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    rendered = render_schema()
+    for name, body in rendered.items():
+        _write_atomic(directory / f"schema.{name}", body)
+        _write_atomic(directory / f"schema.{name}.gz", gzip.compress(body, mtime=0))
+    # Last: readers trust the files once the metadata names their version.
+    metadata = {"version": version or code_version()}
+    _write_atomic(directory / METADATA_FILE, json.dumps(metadata).encode())
+    return rendered
+
+
+def _write_atomic(path, data):
+    """Replace path with data so readers see either the old or the new file."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _load():
+    directory = get_schema_dir()
+    expected = code_version()
+    try:
+        metadata = json.loads((directory / METADATA_FILE).read_text())
+        stale = metadata.get("version") != expected
+    except (OSError, ValueError):
+        stale = True
+
+    if stale:
+        logger.info("OpenAPI schema in %s is missing or stale; regenerating.", directory)
+        try:
+            build_schema(directory, expected)
+        except OSError:
+            # Read-only deployments still get the schema, kept in memory only.
+            logger.warning("Could not write the OpenAPI schema to %s.", directory, exc_info=True)
+            rendered = render_schema()
+            return {name: _entry(body, gzip.compress(body)) for name, body in rendered.items()}
+
+    return {
+        name: _entry(
+            (directory / f"schema.{name}").read_bytes(),
+            (directory / f"schema.{name}.gz").read_bytes(),
+        )
+        for name in SCHEMA_FORMATS
+    }
+
+
+def _entry(body, compressed):
+    digest = hashlib.sha256(body).hexdigest()
+    # Strong validators: each content coding has bytes of its own, so a tag of its own.
+    return {
+        "body": body,
+        "gzip": compressed,
+        "etag": f'"{digest}"',
+        "gzip_etag": f'"{digest}-gzip"',
+    }
+
+
+def get_schema():
+    """Return the schema of every format, resolving it at most once per process."""
+    global _loaded
+    if _loaded is None:
+        with _lock:
+            if _loaded is None:
+                _loaded = _load()
+    return _loaded
+
+
+def reset():
+    """Forget the schema resolved by this process."""
+    global _loaded
+    with _lock:
+        _loaded = None
+
+
+def _negotiate(request):
+    requested = request.GET.get("format")
+    if requested in SCHEMA_FORMATS:
+        return requested
+    return "json" if "json" in request.headers.get("Accept", "") else "yaml"
+
+
+@require_safe
+def schema_view(request):
+    """Serve the precomputed OpenAPI schema (YAML by default, ?format=json)."""
+    name = _negotiate(request)
+    entry = get_schema()[name]
+    content_type = SCHEMA_FORMATS[name][1]
+
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+    etag = entry["gzip_etag"] if gzipped else entry["etag"]
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        response = HttpResponseNotModified()
+    elif gzipped:
+        response = HttpResponse(entry["gzip"], content_type=content_type)
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(entry["body"], content_type=content_type)
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, max-age=300"
+    response["Content-Disposition"] = f'inline; filename="schema.{name}"'
+    patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+    return response
@@ -0,0 +1,22 @@
+"""Serializers for the core app."""
+
+from core.models import Job
+from rest_framework import serializers
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for the status of a background job."""
+
+    class Meta:
+        model = Job
+        fields = (
+            "id",
+            "task",
+            "status",
+            "attempts",
+            "result",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = fields
@@ -0,0 +1,182 @@
+"""
+Worker side of the ``serve`` management command.
+
+Each worker process runs a waitress server on the listening socket it
+inherited from the master. It counts requests into a slot of a shared
+memory table (``ServerStats``) that the master and every worker can read,
+stops accepting once it has served ``max_requests`` or receives SIGTERM,
+and exits after draining in-flight requests.
+"""
+
+import os
+import signal
+import threading
+import time
+from multiprocessing.sharedctypes import RawArray
+
+from django.conf import settings
+from waitress import wasyncore
+from waitress.server import create_server
+
+STAT_FIELDS = ("pid", "started_at", "requests", "in_flight", "errors", "busy_us", "restarts")
+
+# The table of the server this process belongs to, if it runs under ``serve``.
+stats = None
+# Request threads of this worker, if it runs under ``serve``.
+worker_threads = None
+
+
+def get_threads():
+    """Return the request threads of this process's server."""
+    if worker_threads is not None:
+        return worker_threads
+    return getattr(settings, "SERVE_THREADS", 4)
+
+
+class ServerStats:
+    """Per-worker counters in anonymous shared memory, inherited across fork()."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._values = RawArray("q", workers * len(STAT_FIELDS))
+
+    def _index(self, slot, field):
+        return slot * len(STAT_FIELDS) + STAT_FIELDS.index(field)
+
+    def get(self, slot, field):
+        return self._values[self._index(slot, field)]
+
+    def set(self, slot, field, value):
+        self._values[self._index(slot, field)] = value
+
+    def add(self, slot, field, delta):
+        # Only the slot's own worker writes to it, under WorkerApplication's lock.
+        self._values[self._index(slot, field)] += delta
+
+    def reset(self, slot, pid):
+        """Start a fresh set of counters for a new worker in slot."""
+        restarts = self.get(slot, "restarts") + (1 if self.get(slot, "pid") else 0)
+        for field in STAT_FIELDS:
+            self.set(slot, field, 0)
+        self.set(slot, "pid", pid)
+        self.set(slot, "started_at", int(time.time()))
+        self.set(slot, "restarts", restarts)
+
+    def snapshot(self):
+        """Return the counters of every worker as a list of dicts."""
+        workers = []
+        for slot in range(self.workers):
+            row = {field: self.get(slot, field) for field in STAT_FIELDS}
+            row["slot"] = slot
+            row["avg_ms"] = (
+                round(row["busy_us"] / row["requests"] / 1000, 3) if row["requests"] else 0.0
+            )
+            workers.append(row)
+        return workers
+
+
+class WorkerApplication:
+    """
+    WSGI wrapper counting requests into the worker's stats slot.
+
+    A request counts as in flight until the server closes its response
+    iterable, i.e. until the whole body has been sent.
+    """
+
+    def __init__(self, application, slot, max_requests=0, on_limit=None):
+        self.application = application
+        self.slot = slot
+        self.max_requests = max_requests
+        self.on_limit = on_limit
+        self.in_flight = 0
+        self._served = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+            stats.add(self.slot, "in_flight", 1)
+
+        def counting_start_response(status, headers, exc_info=None):
+            if status.startswith("5"):
+                with self._lock:
+                    stats.add(self.slot, "errors", 1)
+            return start_response(status, headers, exc_info)
+
+        try:
+            result = self.application(environ, counting_start_response)
+        except BaseException:
+            self._finish(started)
+            raise
+        # A streaming response is still being sent when the app returns; the
+        # server closes the iterable once the last byte is written.
+        return ClosingIterator(result, lambda: self._finish(started))
+
+    def _finish(self, started):
+        with self._lock:
+            self.in_flight -= 1
+            self._served += 1
+            stats.add(self.slot, "in_flight", -1)
+            stats.add(self.slot, "requests", 1)
+            stats.add(self.slot, "busy_us", int((time.perf_counter() - started) * 1e6))
+            limit_reached = self.max_requests and self._served >= self.max_requests
+        if limit_reached and self.on_limit:
+            self.on_limit()
+
+
+class ClosingIterator:
+    """WSGI response iterable calling on_close after the wrapped one is closed."""
+
+    def __init__(self, iterable, on_close):
+        self.iterable = iterable
+        self.on_close = on_close
+        self._closed = False
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if hasattr(self.iterable, "close"):
+                self.iterable.close()
+        finally:
+            self.on_close()
+
+
+def run_worker(sock, application, slot, threads=4, max_requests=0, graceful_timeout=30):
+    """Serve application on sock until told to stop, then drain and return."""
+    global worker_threads
+    worker_threads = threads
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    # The master owns Ctrl-C and reloads; workers only react to SIGTERM.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    app = WorkerApplication(application, slot, max_requests, on_limit=stopping.set)
+    socket_map = {}
+    server = create_server(app, map=socket_map, sockets=[sock], threads=threads)
+
+    while not stopping.is_set():
+        wasyncore.loop(timeout=1.0, map=socket_map, count=1)
+
+    # Drain: stop accepting, let queued and running requests finish and flush.
+    server.accepting = False
+    deadline = time.monotonic() + graceful_timeout
+    while time.monotonic() < deadline and (app.in_flight or _channels_busy(server)):
+        wasyncore.loop(timeout=0.1, map=socket_map, count=1)
+    server.task_dispatcher.shutdown(timeout=1)
+    wasyncore.close_all(socket_map)
+    stats.set(slot, "in_flight", 0)
+    return os.getpid()
+
+
+def _channels_busy(server):
+    return any(
+        channel.requests or channel.total_outbufs_len
+        for channel in list(server.active_channels.values())
+    )
@@ -0,0 +1,35 @@
+"""Signal handlers bumping per-user data versions on writes."""
+
+from core.models import Ingredient, Recipe, Tag, UserVersion
+from core.versioning import bump_version
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def bump_owner_version(sender, instance, **kwargs):
+    """Bump the owner's version when one of their objects changes."""
+    bump_version(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def bump_owner_version_on_m2m(sender, instance, action, **kwargs):
+    """Bump the owner's version when a recipe's tags or ingredients change."""
+    if action.startswith("post_"):
+        bump_version(instance.user_id)
+
+
+@receiver(post_save, sender=get_user_model())
+def bump_user_version(sender, instance, created, **kwargs):
+    """Start a new user's version counter, or bump it when the profile changes."""
+    if created:
+        UserVersion.objects.create(user=instance)
+    else:
+        bump_version(instance.pk)
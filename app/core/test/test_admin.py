@@ -1,10 +1,21 @@
 """Test for the admin modifications."""
 
+from core.admin import EstimatedCountPaginator
+from core.models import Recipe
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 
+def create_recipe(user, **params):
+    """Create and return a sample recipe."""
+    defaults = {"title": "Sample recipe", "time_minutes": 5, "price": "5.00"}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
 class AdminSiteTests(TestCase):
     """Test for the Django admin modifications."""
 
@@ -36,3 +47,50 @@ class AdminSiteTests(TestCase):
         self.assertEqual(res.status_code, 200)
         self.assertContains(res, self.user.name)
         self.assertContains(res, self.user.email)
+
+    def test_user_search(self):
+        """Test users can be searched by email."""
+        other = get_user_model().objects.create_user(email="other@example.com")
+        url = reverse("admin:core_user_changelist")
+        res = self.client.get(url, {"q": "user@"})
+
+        self.assertContains(res, self.user.email)
+        self.assertNotContains(res, other.email)
+
+    def test_recipe_changelist_queries_constant(self):
+        """Test recipe owners are joined instead of loaded per row."""
+        url = reverse("admin:core_recipe_changelist")
+        create_recipe(self.user)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for i in range(5):
+            other = get_user_model().objects.create_user(email=f"u{i}@example.com")
+            create_recipe(other, title=f"Recipe {i}")
+
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(url)
+
+        self.assertContains(res, "Recipe 4")
+        self.assertContains(res, "u4@example.com")
+        self.assertEqual(len(many), len(few))
+
+    def test_recipe_change_page_uses_autocomplete(self):
+        """Test the recipe form does not list every user, tag and ingredient."""
+        recipe = create_recipe(self.user)
+        url = reverse("admin:core_recipe_change", args=[recipe.id])
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, "admin-autocomplete")
+        self.assertNotContains(res, f'<option value="{self.admin_user.pk}">')
+
+    def test_paginator_counts_exactly_off_postgres(self):
+        """Test the estimated count paginator falls back to COUNT(*)."""
+        create_recipe(self.user)
+        create_recipe(self.user)
+
+        paginator = EstimatedCountPaginator(Recipe.objects.order_by("id"), 1)
+
+        self.assertEqual(paginator.count, 2)
+        self.assertEqual(paginator.num_pages, 2)
@@ -0,0 +1,44 @@
+"""Tests for the async wrappers of sync views."""
+
+from asgiref.sync import async_to_sync
+from core.async_views import async_view
+from django.test import RequestFactory, SimpleTestCase
+from rest_framework import views
+from rest_framework.response import Response
+
+
+class CookieView(views.APIView):
+    """Answer with a cookie."""
+
+    authentication_classes = []
+    permission_classes = []
+
+    def get(self, request):
+        response = Response({"ok": True})
+        response.set_cookie("flavour", "salted", httponly=True)
+        return response
+
+
+class AsyncViewTests(SimpleTestCase):
+    """Test async_view keeps what the sync view returns and declares."""
+
+    def test_cookies_survive(self):
+        """Test cookies set by the sync view reach the async response."""
+        view = async_view(CookieView.as_view())
+
+        response = async_to_sync(view)(RequestFactory().get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies["flavour"].value, "salted")
+        self.assertTrue(response.cookies["flavour"]["httponly"])
+
+    def test_view_attributes_survive(self):
+        """Test the wrapper keeps the view's docstring and csrf_exempt marker."""
+        sync_view = CookieView.as_view()
+
+        view = async_view(sync_view)
+
+        self.assertTrue(view.csrf_exempt)
+        self.assertEqual(view.__doc__, sync_view.__doc__)
+        self.assertEqual(view.__name__, sync_view.__name__)
+        self.assertFalse(hasattr(view, "cls"))
@@ -1,10 +1,19 @@
 """Test Custom Django Management Commands."""
 
+import json
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 
-from django.core.management import call_command
+from core import bench
+from core.management.commands import bench_api, import_recipes
+from core.models import ImportCheckpoint, Recipe
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models.signals import post_delete
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
 from psycopg2 import OperationalError as Psycopg2OpError
 
 
@@ -28,3 +37,228 @@ class CommandTests(SimpleTestCase):
         call_command("wait_for_db")
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class CopyColumnsTests(SimpleTestCase):
+    """Test the COPY writers of the recipe table cover its required columns."""
+
+    def test_copy_lists_required_columns(self):
+        """Test every NOT NULL column without a database default is copied."""
+        # Model defaults are not database defaults: COPY leaves unlisted
+        # columns NULL, or fails on NOT NULL ones.
+        required = {
+            field.column
+            for field in Recipe._meta.concrete_fields
+            if not field.null and not field.primary_key
+        }
+
+        self.assertLessEqual(required, set(bench.COPY_COLUMNS))
+
+    def test_copy_row_fills_defaults(self):
+        """Test columns a generated row leaves out get their defaults."""
+        row = {"user_id": 1, "title": "Soup", "time_minutes": 5, "price": "1.00"}
+
+        values = dict(zip(bench.COPY_COLUMNS, bench.copy_row(row)))
+
+        self.assertEqual(values["image_variants"], "{}")
+        self.assertEqual(values["description"], "")
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test the import_recipes management command."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        return path
+
+    def test_import_jsonl(self):
+        """Test valid JSONL rows are loaded for the given user."""
+        rows = [{"title": f"Recipe {i}", "time_minutes": i + 1, "price": "2.50"} for i in range(5)]
+        path = self._write("recipes.jsonl", "\n".join(json.dumps(row) for row in rows))
+
+        call_command("import_recipes", path, user="user@example.com", stdout=StringIO())
+
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+    def test_import_jsonl_rejects_malformed_lines(self):
+        """Test a line that is not JSON is reported and the rest are loaded."""
+        path = self._write(
+            "recipes.jsonl",
+            '{"title": "Good", "time_minutes": 1, "price": "1.00"}\n'
+            '{"title": "Broken", \n'
+            '{"title": "Also good", "time_minutes": 1, "price": "1.00"}\n',
+        )
+        err = StringIO()
+
+        call_command("import_recipes", path, user="user@example.com", stdout=StringIO(), stderr=err)
+
+        titles = set(Recipe.objects.values_list("title", flat=True))
+        self.assertEqual(titles, {"Good", "Also good"})
+        self.assertIn("Line 2 is not valid JSON", err.getvalue())
+
+    def test_import_csv_rejects_invalid_rows(self):
+        """Test rows failing RecipeSerializer validation are skipped."""
+        path = self._write(
+            "recipes.csv",
+            f"user_id,title,time_minutes,price\n"
+            f"{self.user.id},Good,10,1.00\n"
+            f"{self.user.id},Bad,ten,1.00\n"
+            f"999999,Orphan,10,1.00\n",
+        )
+        err = StringIO()
+
+        call_command("import_recipes", path, stdout=StringIO(), stderr=err)
+
+        self.assertEqual(list(Recipe.objects.values_list("title", flat=True)), ["Good"])
+        self.assertIn("Row 2", err.getvalue())
+        self.assertIn("Row 3", err.getvalue())
+
+    def test_import_resumes_from_checkpoint(self):
+        """Test rows before the checkpoint are not loaded again."""
+        rows = [{"title": f"Recipe {i}", "time_minutes": 1, "price": "1.00"} for i in range(4)]
+        path = self._write("recipes.jsonl", "\n".join(json.dumps(row) for row in rows))
+        ImportCheckpoint.objects.create(source=os.path.abspath(path), rows=3)
+
+        call_command("import_recipes", path, user="user@example.com", stdout=StringIO())
+
+        self.assertEqual(list(Recipe.objects.values_list("title", flat=True)), ["Recipe 3"])
+
+    def test_checkpoint_committed_with_batch(self):
+        """Test a batch that fails to load leaves the checkpoint at the last commit."""
+        rows = [{"title": f"Recipe {i}", "time_minutes": 1, "price": "1.00"} for i in range(4)]
+        path = self._write("recipes.jsonl", "\n".join(json.dumps(row) for row in rows))
+        loader = "core.management.commands.import_recipes.Command._bulk_create_rows"
+        original = import_recipes.Command._bulk_create_rows
+        calls = []
+
+        def fail_second_batch(command, batch):
+            calls.append(batch)
+            if len(calls) == 2:
+                raise RuntimeError("crash")
+            original(command, batch)
+
+        with patch(loader, fail_second_batch), self.assertRaises(RuntimeError):
+            call_command(
+                "import_recipes", path, user="user@example.com", batch_size=2, stdout=StringIO()
+            )
+
+        self.assertEqual(ImportCheckpoint.objects.get(source=os.path.abspath(path)).rows, 2)
+        call_command("import_recipes", path, user="user@example.com", stdout=StringIO())
+        self.assertEqual(Recipe.objects.count(), 4)
+
+
+@override_settings(ALLOWED_HOSTS=["localhost"])
+class BenchApiCommandTests(TransactionTestCase):
+    """Test the bench_api management command."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.output = os.path.join(self.tmpdir.name, "results.json")
+
+    def _bench(self, *args):
+        call_command(
+            "bench_api",
+            "--scenarios",
+            "user-me",
+            "recipe-create",
+            *args,
+            duration=0.2,
+            warmup=0,
+            concurrency=1,
+            stdout=StringIO(),
+        )
+
+    def test_results_saved_and_writes_cleaned_up(self):
+        """Test a run seeds the tier, saves results and removes created rows."""
+        self._bench("--output", self.output)
+
+        with open(self.output) as handle:
+            report = json.load(handle)
+        self.assertEqual(report["meta"]["tier"], "1k")
+        self.assertEqual(report["meta"]["transport"], "in-process")
+        me = report["results"]["user-me"]
+        self.assertGreater(me["requests"], 0)
+        self.assertEqual(me["errors"], 0)
+        self.assertGreaterEqual(me["queries_per_request"], 1)
+        self.assertEqual(Recipe.objects.count(), 1000)
+
+    def test_regression_against_baseline_fails(self):
+        """Test a run far slower than the baseline raises a CommandError."""
+        self._bench("--output", self.output)
+        with open(self.output) as handle:
+            report = json.load(handle)
+        report["results"]["user-me"]["rps"] *= 100
+        with open(self.output, "w") as handle:
+            json.dump(report, handle)
+
+        with self.assertRaisesRegex(CommandError, "user-me throughput"):
+            self._bench("--baseline", self.output, "--threshold", "20")
+
+    def test_reseed_deletes_recipes_without_loading_them(self):
+        """Test reseeding a tier drops the old recipes in bulk, not one by one."""
+        bench_api.seed(50)
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance)
+
+        post_delete.connect(receiver, sender=Recipe)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Recipe)
+
+        self.assertTrue(bench_api.seed(100))
+
+        self.assertEqual(deleted, [])
+        self.assertEqual(Recipe.objects.count(), 100)
+
+
+class SeedDataCommandTests(TestCase):
+    """Test the seed_data management command."""
+
+    def _seed(self, *args):
+        call_command("seed_data", "--users", "30", "--mean-recipes", "5", *args, stdout=StringIO())
+
+    def _snapshot(self):
+        return list(
+            Recipe.objects.order_by("user__email", "id").values_list(
+                "user__email", "title", "time_minutes", "price", "description", "link"
+            )
+        )
+
+    def test_users_share_one_password_hash(self):
+        """Test generated users get the same, usable password hash."""
+        self._seed("--password", "pw12345")
+
+        users = get_user_model().objects.filter(email__startswith="seed-")
+        self.assertEqual(users.count(), 30)
+        self.assertEqual(len(set(users.values_list("password", flat=True))), 1)
+        self.assertTrue(users.first().check_password("pw12345"))
+
+    def test_same_seed_same_data(self):
+        """Test a seed reproduces the same recipes and another seed does not."""
+        self._seed("--seed", "7")
+        first = self._snapshot()
+
+        self._seed("--seed", "7", "--clear")
+        self.assertEqual(self._snapshot(), first)
+        self.assertGreater(len(first), 0)
+
+        self._seed("--seed", "8", "--clear")
+        self.assertNotEqual(self._snapshot(), first)
+
+    def test_existing_prefix_refused(self):
+        """Test generating over existing users requires --clear."""
+        self._seed()
+
+        with self.assertRaisesRegex(CommandError, "--clear"):
+            self._seed()
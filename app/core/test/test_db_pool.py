@@ -0,0 +1,160 @@
+"""Tests for the in-process database connection pool."""
+
+import threading
+from unittest.mock import patch
+
+from core.backends.postgresql.pool import ConnectionPool, PoolTimeout
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from rest_framework import status
+from rest_framework.test import APIClient
+
+POOL_STATS_URL = reverse("core:db-pool-stats")
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise RuntimeError("server closed the connection unexpectedly")
+
+
+class FakeConnection:
+    """Minimal stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.status = TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Test checkout, reuse and limits of ConnectionPool."""
+
+    def test_released_connection_is_reused(self):
+        """Test a released connection is handed out again."""
+        pool = ConnectionPool(max_size=2)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        self.assertEqual(pool.stats()["created"], 1)
+        self.assertEqual(pool.stats()["reused"], 1)
+
+    def test_open_transaction_rolled_back_on_release(self):
+        """Test a connection left inside a transaction is reset."""
+        pool = ConnectionPool(max_size=1)
+        connection = pool.acquire(FakeConnection)
+        connection.status = TRANSACTION_STATUS_INTRANS
+
+        pool.release(connection)
+
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertEqual(pool.stats()["idle"], 1)
+
+    def test_unhealthy_connection_replaced(self):
+        """Test a connection failing the health check is discarded."""
+        pool = ConnectionPool(max_size=1)
+        stale = pool.acquire(FakeConnection)
+        pool.release(stale)
+        stale.broken = True
+
+        connection = pool.acquire(FakeConnection)
+
+        self.assertIsNot(connection, stale)
+        self.assertTrue(stale.closed)
+        self.assertEqual(pool.stats()["discarded"], 1)
+        self.assertEqual(pool.stats()["size"], 1)
+
+    @patch("core.backends.postgresql.pool.time.monotonic")
+    def test_expired_connection_closed_on_release(self, patched_monotonic):
+        """Test connections older than max_lifetime are not pooled again."""
+        patched_monotonic.return_value = 100
+        pool = ConnectionPool(max_size=1, max_lifetime=60)
+        connection = pool.acquire(FakeConnection)
+
+        patched_monotonic.return_value = 161
+        pool.release(connection)
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_exhausted_pool_times_out(self):
+        """Test acquiring beyond max_size waits and then raises PoolTimeout."""
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        pool.acquire(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection)
+
+        stats = pool.stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["utilization"], 1.0)
+
+    def test_waiter_gets_released_connection(self):
+        """Test a waiting thread receives a connection released meanwhile."""
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.acquire(FakeConnection)
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(FakeConnection)))
+        waiter.start()
+
+        pool.release(connection)
+        waiter.join()
+
+        self.assertEqual(acquired, [connection])
+        self.assertEqual(pool.stats()["created"], 1)
+
+    def test_failed_connect_frees_slot(self):
+        """Test a failing connect() does not leak pool capacity."""
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+
+        def fail():
+            raise RuntimeError("could not connect")
+
+        with self.assertRaises(RuntimeError):
+            pool.acquire(fail)
+
+        self.assertIsNotNone(pool.acquire(FakeConnection))
+
+
+class DatabasePoolStatsAPITests(TestCase):
+    """Test the pool stats endpoint."""
+
+    def test_pool_stats_admin_only(self):
+        """Test pool stats are only visible to staff."""
+        user = get_user_model().objects.create_user(email="user@example.com", password="pass123")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        res = client.get(POOL_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        user.is_staff = True
+        res = client.get(POOL_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
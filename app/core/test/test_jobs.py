@@ -0,0 +1,196 @@
+"""Tests for the background job queue."""
+
+from datetime import timedelta
+from io import StringIO
+
+from core import jobs, metrics
+from core.models import Job
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+calls = []
+
+
+@jobs.task(name="test.add")
+def add(a, b):
+    calls.append((a, b))
+    return a + b
+
+
+@jobs.task(name="test.fail")
+def fail():
+    raise RuntimeError("boom")
+
+
+def job_url(job):
+    return reverse("core:job-detail", args=[job.pk])
+
+
+class JobQueueTests(TestCase):
+    """Test claiming and running jobs."""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_claim_leases_due_jobs_once(self):
+        """Test due jobs are claimed by one worker only, in due order."""
+        later = jobs.enqueue("test.add", {"a": 1, "b": 2}, delay=60)
+        second = jobs.enqueue(add, {"a": 1, "b": 2})
+        first = jobs.enqueue(add, {"a": 3, "b": 4}, delay=-5)
+
+        claimed = jobs.claim("w1", limit=10)
+
+        self.assertEqual([job.pk for job in claimed], [first.pk, second.pk])
+        self.assertEqual(claimed[0].status, Job.RUNNING)
+        self.assertEqual(claimed[0].attempts, 1)
+        self.assertEqual(claimed[0].locked_by, "w1")
+        self.assertEqual(jobs.claim("w2"), [])
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.QUEUED)
+
+    def test_claim_respects_limit_and_queue(self):
+        """Test at most limit jobs of the requested queue are claimed."""
+        for _ in range(3):
+            jobs.enqueue(add, {"a": 1, "b": 1})
+        jobs.enqueue(add, {"a": 1, "b": 1}, queue="other")
+
+        self.assertEqual(len(jobs.claim("w1", limit=2)), 2)
+        self.assertEqual(len(jobs.claim("w1", queue="other")), 1)
+
+    def test_execute_records_result(self):
+        """Test a successful job is marked done with its return value."""
+        jobs.enqueue(add, {"a": 2, "b": 3})
+        job = jobs.claim("w1")[0]
+
+        outcome, _duration = jobs.execute(job)
+
+        job.refresh_from_db()
+        self.assertEqual(outcome, "done")
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result, 5)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_job_retried_with_backoff(self):
+        """Test a failing job goes back to the queue until max_attempts."""
+        jobs.enqueue(fail, max_attempts=2)
+        job = jobs.claim("w1")[0]
+
+        outcome, _duration = jobs.execute(job)
+
+        job.refresh_from_db()
+        self.assertEqual(outcome, "retried")
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=4))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        job = jobs.claim("w1")[0]
+        outcome, _duration = jobs.execute(job)
+
+        job.refresh_from_db()
+        self.assertEqual(outcome, "failed")
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_lease_reclaimed(self):
+        """Test a job whose worker stopped renewing its lease is claimed again."""
+        jobs.enqueue(add, {"a": 1, "b": 1})
+        stale = jobs.claim("dead-worker")[0]
+        Job.objects.filter(pk=stale.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        job = jobs.claim("w2")[0]
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(jobs.execute(stale)[0], None)
+        self.assertEqual(jobs.execute(job)[0], "done")
+
+    def test_expired_last_attempt_fails(self):
+        """Test a job that timed out on its last attempt is not run again."""
+        jobs.enqueue(add, {"a": 1, "b": 1}, max_attempts=1)
+        stale = jobs.claim("dead-worker")[0]
+        Job.objects.filter(pk=stale.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        calls.clear()
+
+        outcome, _duration = jobs.execute(jobs.claim("w2")[0])
+
+        self.assertEqual(outcome, "failed")
+        self.assertEqual(calls, [])
+        self.assertEqual(Job.objects.get().last_error, "Timed out.")
+
+    def test_queue_metrics(self):
+        """Test job outcomes and queue depth are exported."""
+        jobs.enqueue(add, {"a": 1, "b": 1})
+        jobs.enqueue(add, {"a": 1, "b": 1})
+        job = jobs.claim("w1", limit=1)[0]
+        jobs.record(job, *jobs.execute(job))
+
+        body = metrics.render_prometheus()
+
+        self.assertIn('jobs_total{task="test.add",status="done"} 1', body)
+        self.assertIn('job_duration_seconds_count{task="test.add"} 1', body)
+        self.assertIn('job_queue_depth{queue="default",status="queued"} 1', body)
+        self.assertIn('job_queue_lag_seconds{queue="default"}', body)
+
+
+class JobViewTests(TestCase):
+    """Test the job status endpoint."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email="user@example.com", password="pw")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_accepted_response(self):
+        """Test a 202 response points at the job's status."""
+        job = jobs.enqueue(add, {"a": 1, "b": 1}, user=self.user)
+        request = APIClient().get("/").wsgi_request
+
+        res = jobs.accepted_response(job, request)
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(res["Location"].endswith(job_url(job)))
+
+    def test_owner_reads_job(self):
+        """Test users can read the status of their jobs."""
+        job = jobs.enqueue(add, {"a": 1, "b": 1}, user=self.user)
+
+        res = self.client.get(job_url(job))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], Job.QUEUED)
+        self.assertNotIn("last_error", res.data)
+
+    def test_other_users_job_not_found(self):
+        """Test users cannot read jobs of others."""
+        other = get_user_model().objects.create_user(email="other@example.com", password="pw")
+        job = jobs.enqueue(add, {"a": 1, "b": 1}, user=other)
+
+        res = self.client.get(job_url(job))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(JOB_RETRY_BACKOFF=0)
+class RunWorkerCommandTests(TransactionTestCase):
+    """Test the run_worker command."""
+
+    def test_burst_runs_queued_jobs(self):
+        """Test a burst worker runs every due job on its pool, then exits."""
+        calls.clear()
+        for i in range(5):
+            jobs.enqueue(add, {"a": i, "b": 1})
+        jobs.enqueue(fail, max_attempts=2)
+        out = StringIO()
+
+        call_command("run_worker", "--burst", "--concurrency=2", "--batch-size=2", stdout=out)
+
+        self.assertEqual(sorted(calls), [(i, 1) for i in range(5)])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 5)
+        failed = Job.objects.get(task="test.fail")
+        self.assertEqual((failed.status, failed.attempts), (Job.FAILED, 2))
+        self.assertIn("stopped after 7 jobs", out.getvalue())
@@ -0,0 +1,125 @@
+"""Tests for request instrumentation and the metrics endpoint."""
+
+import os
+import shutil
+import tempfile
+
+from core import metrics
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+METRICS_URL = reverse("core:metrics")
+ME_URL = reverse("user:me")
+
+
+class HistogramTests(SimpleTestCase):
+    """Test the Prometheus text rendering."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts, sum and count of a histogram series."""
+        histogram = metrics.Histogram("latency", "Latency.", ("view",), (0.1, 1))
+
+        histogram.observe(("a",), 0.05)
+        histogram.observe(("a",), 0.1)
+        histogram.observe(("a",), 3)
+
+        lines = histogram.render()
+        self.assertIn('latency_bucket{view="a",le="0.1"} 2', lines)
+        self.assertIn('latency_bucket{view="a",le="1"} 2', lines)
+        self.assertIn('latency_bucket{view="a",le="+Inf"} 3', lines)
+        self.assertIn('latency_sum{view="a"} 3.150000', lines)
+        self.assertIn('latency_count{view="a"} 3', lines)
+
+    def test_values_summed_across_processes(self):
+        """Test every worker's shared file counts when rendering, not only ours."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        metrics.share_across_processes(directory)
+        self.addCleanup(metrics.share_across_processes, None)
+        counter = metrics.Counter("hits", "Hits.", ("view",))
+        histogram = metrics.Histogram("latency", "Latency.", ("view",), (0.1, 1))
+        counter.inc(("a",))
+        histogram.observe(("a",), 0.05)
+
+        pid = os.fork()
+        if not pid:
+            try:
+                counter.inc(("a",), 2)
+                histogram.observe(("a",), 3)
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        merged = metrics.read_shared_values(directory)
+
+        self.assertEqual(len(os.listdir(directory)), 2)
+        self.assertIn('hits{view="a"} 3', counter.render(merged))
+        lines = histogram.render(merged)
+        self.assertIn('latency_bucket{view="a",le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{view="a",le="+Inf"} 2', lines)
+        self.assertIn('latency_sum{view="a"} 3.050000', lines)
+        # This process alone still renders its own values.
+        self.assertIn('hits{view="a"} 1', counter.render())
+
+    def test_label_values_escaped(self):
+        """Test quotes and backslashes in label values are escaped."""
+        self.assertEqual(metrics._labels([("view", 'a"b\\c')]), '{view="a\\"b\\\\c"}')
+
+
+class RequestMetricsTests(TestCase):
+    """Test the request metrics middleware."""
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        self.user = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="pw"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_server_timing_header(self):
+        """Test responses carry database, view and render timings."""
+        res = self.client.get(ME_URL)
+
+        timing = res["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        for name in ("view", "render", "total"):
+            self.assertIn(f"{name};dur=", timing)
+
+    def test_queries_counted_per_request(self):
+        """Test the query count of a request lands in its view's histogram."""
+        self.client.get(reverse("recipe:recipe-list"))
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = res.content.decode()
+        self.assertIn(
+            'http_requests_total{view="recipe:recipe-list",method="GET",status="200"} 1', body
+        )
+        self.assertIn(
+            'http_request_db_queries_count{view="recipe:recipe-list",method="GET"} 1', body
+        )
+        self.assertNotIn(
+            'http_request_db_queries_bucket{view="recipe:recipe-list",method="GET",le="0"} 1', body
+        )
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_server_timing_can_be_disabled(self):
+        """Test the header is omitted when SERVER_TIMING_HEADER is off."""
+        res = self.client.get(ME_URL)
+
+        self.assertNotIn("Server-Timing", res)
+
+    def test_metrics_requires_staff(self):
+        """Test non-staff users cannot read the metrics."""
+        user = get_user_model().objects.create_user(email="user@example.com", password="pw")
+        self.client.force_authenticate(user=user)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
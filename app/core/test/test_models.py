@@ -4,7 +4,9 @@ from decimal import Decimal
 
 from core import models
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 
 class ModelTests(TestCase):
@@ -45,6 +47,21 @@ class ModelTests(TestCase):
         self.assertEqual(user.is_superuser, True)
         self.assertEqual(user.is_staff, True)
 
+    def test_create_superuser_saves_once(self):
+        """Test a superuser is written with a single INSERT and keeps extra fields."""
+        with CaptureQueriesContext(connection) as queries:
+            user = get_user_model().objects.create_superuser(
+                email="test@example.com", password="testpassword123", name="Admin"
+            )
+
+        writes = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith(('INSERT INTO "core_user" ', 'UPDATE "core_user" '))
+        ]
+        self.assertEqual(len(writes), 1)
+        self.assertEqual(user.name, "Admin")
+
     def test_create_recipe(self):
         """Test creating a recipe is successful."""
         user = get_user_model().objects.create_user(
@@ -0,0 +1,50 @@
+"""Tests for the bounded executors."""
+
+import threading
+import time
+from unittest.mock import patch
+
+from core import pools, server
+from django.test import SimpleTestCase
+
+
+class BoundedPoolTests(SimpleTestCase):
+    """Test the bounded executor."""
+
+    def test_rejects_when_queue_is_full(self):
+        """Test submissions beyond workers + pending raise PoolOverloaded."""
+        pool = pools.BoundedPool(max_workers=1, max_pending=1)
+        gate = threading.Event()
+        futures = [pool.submit(gate.wait), pool.submit(gate.wait)]
+
+        with self.assertRaises(pools.PoolOverloaded):
+            pool.submit(gate.wait)
+
+        gate.set()
+        for future in futures:
+            future.result()
+        pool.shutdown()
+        self.assertEqual(pool.rejected, 1)
+        self.assertEqual(pool.in_flight, 0)
+        self.assertEqual(pool.completed, 2)
+
+    def test_run_rejects_beyond_server_threads(self):
+        """Test blocking callers are capped below the server's request threads."""
+        pool = pools.BoundedPool(max_workers=1, max_pending=8)
+        gate = threading.Event()
+        with patch.object(server, "worker_threads", 2):
+            waiter = threading.Thread(target=pool.run, args=(gate.wait,))
+            waiter.start()
+            while not pool.in_flight:
+                time.sleep(0.01)
+
+            with self.assertRaises(pools.PoolOverloaded):
+                pool.run(gate.wait)
+            # Callers that do not block are only bounded by the queue.
+            future = pool.submit(gate.wait)
+
+        gate.set()
+        waiter.join()
+        future.result()
+        pool.shutdown()
+        self.assertEqual(pool.rejected, 1)
@@ -0,0 +1,70 @@
+"""
+Per-endpoint query-count budgets.
+
+Each read endpoint is exercised against enough related rows that an N+1
+regression (a relation fetched per recipe instead of prefetched) pushes it
+over its budget and fails the suite. Clients use force_authenticate, so the
+budgets cover the endpoint's own work and not the token lookup.
+"""
+
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+# url name -> maximum number of SQL queries for a GET
+QUERY_BUDGETS = {
+    "recipe:recipe-list": 4,
+    "recipe:recipe-detail": 4,
+    "recipe:recipe-facets": 1,
+    "recipe:tag-list": 1,
+    "recipe:ingredient-list": 1,
+    "user:me": 1,
+}
+
+
+class QueryBudgetTests(TestCase):
+    """Test read endpoints stay within their query budgets."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        tags = [Tag.objects.create(user=cls.user, name=f"Tag {i}") for i in range(3)]
+        ingredients = [
+            Ingredient.objects.create(user=cls.user, name=f"Ingredient {i}") for i in range(3)
+        ]
+        for i in range(20):
+            recipe = Recipe.objects.create(
+                user=cls.user, title=f"Recipe {i}", time_minutes=i + 1, price=Decimal("4.50")
+            )
+            recipe.tags.set(tags)
+            recipe.ingredients.set(ingredients)
+        cls.recipe = recipe
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _url(self, name):
+        if name == "recipe:recipe-detail":
+            return reverse(name, args=[self.recipe.id])
+        return reverse(name)
+
+    def test_endpoints_within_budget(self):
+        """Test every budgeted endpoint stays within its query count."""
+        for name, budget in QUERY_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                with CaptureQueriesContext(connection) as ctx:
+                    res = self.client.get(self._url(name))
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                queries = "\n".join(query["sql"] for query in ctx.captured_queries)
+                self.assertLessEqual(len(ctx), budget, f"{name} ran {len(ctx)} queries:\n{queries}")
@@ -0,0 +1,227 @@
+"""Tests for the shared memory rate limiter and throttle."""
+
+import multiprocessing
+import os
+import tempfile
+import threading
+
+from core.ratelimit import SharedRateLimiter, get_limiter
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TOKEN_URL = reverse("user:token")
+TOKEN_ASYNC_URL = reverse("user:token-async")
+CREATE_USER_URL = reverse("user:create")
+
+
+def _hit_in_child(path, results):
+    limiter = SharedRateLimiter(path, slots=1024)
+    results.put([limiter.hit("client", 5, 0.001)[0] for _ in range(3)])
+
+
+class SharedRateLimiterTests(SimpleTestCase):
+    """Test the token buckets in the memory-mapped table."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "throttle")
+        self.limiter = SharedRateLimiter(self.path, slots=1024)
+
+    def test_burst_then_refill(self):
+        """Test a bucket allows its capacity at once, then refills over time."""
+        results = [self.limiter.hit("client", 3, 1.0, now=100.0) for _ in range(4)]
+
+        self.assertEqual([allowed for allowed, _wait in results], [True, True, True, False])
+        self.assertAlmostEqual(results[3][1], 1.0)
+        self.assertEqual(self.limiter.hit("client", 3, 1.0, now=100.5), (False, 0.5))
+        self.assertTrue(self.limiter.hit("client", 3, 1.0, now=101.0)[0])
+
+    def test_clock_stepped_back(self):
+        """Test a wall clock stepping back neither drains nor pins buckets."""
+        for _ in range(2):
+            self.limiter.hit("client", 2, 1.0, now=1000.0)
+
+        self.assertEqual(self.limiter.hit("client", 2, 1.0, now=900.0), (False, 1.0))
+        self.assertTrue(self.limiter.hit("client", 2, 1.0, now=901.0)[0])
+
+    def test_bucket_stamped_in_future_expires(self):
+        """Test buckets updated before the clock stepped back are free for reuse."""
+        limiter = SharedRateLimiter(f"{self.path}-small", slots=8, stripes=1)
+        for i in range(7):
+            limiter.hit(f"old-{i}", 1, 1.0, now=1000.0)
+        # Stepped back by 400s; "live" takes the last slot and stays empty for long.
+        limiter.hit("live", 1, 1e-6, now=600.0)
+
+        self.assertTrue(limiter.hit("fresh", 1, 1e-6, now=602.0)[0])
+        self.assertFalse(limiter.hit("live", 1, 1e-6, now=602.0)[0])
+
+    def test_keys_are_independent(self):
+        """Test exhausting one key leaves others untouched."""
+        for _ in range(2):
+            self.limiter.hit("a", 2, 0.001)
+
+        self.assertFalse(self.limiter.hit("a", 2, 0.001)[0])
+        self.assertTrue(self.limiter.hit("b", 2, 0.001)[0])
+
+    def test_full_stripe_evicts_stalest(self):
+        """Test keys beyond the probe window replace the least recently used one."""
+        keys = [f"key-{i}" for i in range(5000)]
+        for now, key in enumerate(keys):
+            self.limiter.hit(key, 1, 1e-6, now=float(now))
+
+        self.assertTrue(self.limiter.hit("fresh", 1, 1e-6, now=6000.0)[0])
+        self.assertFalse(self.limiter.hit(keys[-1], 1, 1e-6, now=6000.0)[0])
+        self.assertTrue(self.limiter.hit(keys[0], 1, 1e-6, now=6000.0)[0])
+
+    def test_shared_between_processes(self):
+        """Test processes mapping the same file draw from one bucket."""
+        results = multiprocessing.get_context("fork").Queue()
+        child = multiprocessing.get_context("fork").Process(
+            target=_hit_in_child, args=(self.path, results)
+        )
+        child.start()
+        child.join()
+
+        self.assertEqual(results.get(timeout=5), [True, True, True])
+        self.assertEqual(
+            [self.limiter.hit("client", 5, 0.001)[0] for _ in range(3)], [True, True, False]
+        )
+
+    def test_threads_never_exceed_capacity(self):
+        """Test concurrent hits from threads grant exactly the capacity."""
+        granted = []
+
+        def worker():
+            for _ in range(50):
+                if self.limiter.hit("client", 100, 0.001)[0]:
+                    granted.append(1)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(granted), 100)
+
+    def test_table_size_in_file_name(self):
+        """Test tables of different sizes use different files, never resizing one."""
+        other = SharedRateLimiter(self.path, slots=4096)
+
+        self.assertNotEqual(other.path, self.limiter.path)
+        self.assertEqual(os.path.getsize(self.limiter.path), self.limiter.size)
+
+    def test_refuses_table_of_wrong_size(self):
+        """Test a file of the table's name but another size is not truncated."""
+        with open(self.limiter.path, "ab") as handle:
+            handle.write(b"x")
+
+        with self.assertRaises(ImproperlyConfigured):
+            SharedRateLimiter(self.path, slots=1024)
+        self.assertEqual(os.path.getsize(self.limiter.path), self.limiter.size + 1)
+
+    def test_symlink_not_followed(self):
+        """Test a symlink planted at the table's path is refused."""
+        target = self.path + "-target"
+        planted = self.path + "-planted"
+        layout = self.limiter.path[len(self.path) :]
+        os.symlink(target, planted + layout)
+
+        with self.assertRaises(OSError):
+            SharedRateLimiter(planted, slots=1024)
+        self.assertFalse(os.path.exists(target))
+
+    def test_reset(self):
+        """Test reset empties every bucket."""
+        self.limiter.hit("client", 1, 0.001)
+
+        self.limiter.reset()
+
+        self.assertTrue(self.limiter.hit("client", 1, 0.001)[0])
+
+
+class AuthThrottleTests(TestCase):
+    """Test the auth endpoints are throttled per client address."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            THROTTLE_TABLE_PATH=os.path.join(directory.name, "throttle"),
+            SHARED_THROTTLE_RATES={"login": "2/min", "signup": "1/hour"},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+        self.payload = {"email": "test@example.com", "password": "testpass123"}
+        get_user_model().objects.create_user(**self.payload)
+
+    def test_token_throttled(self):
+        """Test logins beyond the rate get a 429 with Retry-After, before hashing."""
+        for _ in range(2):
+            res = self.client.post(TOKEN_URL, self.payload)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res["Retry-After"], "30")
+        other = self.client.post(TOKEN_URL, self.payload, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
+
+    def test_async_token_shares_login_budget(self):
+        """Test the async token endpoint draws from the same bucket."""
+        self.client.post(TOKEN_URL, self.payload)
+        self.client.post(TOKEN_ASYNC_URL, self.payload, format="json")
+
+        res = self.client.post(TOKEN_ASYNC_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+    def test_signup_throttled(self):
+        """Test account creation has its own budget."""
+        payload = {"email": "new@example.com", "password": "testpass123", "name": "New"}
+        self.assertEqual(
+            self.client.post(CREATE_USER_URL, payload).status_code, status.HTTP_201_CREATED
+        )
+
+        payload["email"] = "new2@example.com"
+        res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.client.post(TOKEN_URL, self.payload).status_code, 200)
+
+    def test_limiter_follows_table_setting(self):
+        """Test changing THROTTLE_TABLE_PATH maps the new table."""
+        limiter = get_limiter()
+        with override_settings(THROTTLE_TABLE_PATH=limiter.path + "-other"):
+            other = get_limiter()
+            self.assertNotEqual(other.path, limiter.path)
+        os.remove(other.path)
+
+    def test_spoofed_forwarded_for_still_throttled(self):
+        """Test a client cannot pick its identity with X-Forwarded-For."""
+        for i in range(2):
+            self.client.post(TOKEN_URL, self.payload, HTTP_X_FORWARDED_FOR=f"10.9.0.{i}")
+
+        res = self.client.post(TOKEN_URL, self.payload, HTTP_X_FORWARDED_FOR="10.9.0.99")
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK={"NUM_PROXIES": 1})
+    def test_forwarded_for_trusted_behind_proxy(self):
+        """Test the address added by a trusted proxy identifies the client."""
+        for _ in range(2):
+            self.client.post(TOKEN_URL, self.payload, HTTP_X_FORWARDED_FOR="1.1.1.1, 10.9.0.1")
+
+        blocked = self.client.post(TOKEN_URL, self.payload, HTTP_X_FORWARDED_FOR="10.9.0.1")
+        other = self.client.post(TOKEN_URL, self.payload, HTTP_X_FORWARDED_FOR="10.9.0.2")
+
+        self.assertEqual(blocked.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other.status_code, status.HTTP_200_OK)
@@ -0,0 +1,113 @@
+"""Tests for the read replica router."""
+
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import Recipe
+from core.routers import PIN_COOKIE, PIN_HEADER, ReplicaRouter, routing_context
+from core.versioning import bump_version, get_version
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+
+@override_settings(DATABASE_REPLICAS=["replica_0"])
+class ReplicaRouterTests(TestCase):
+    """Test which database each query is routed to."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+
+    def _get(self, user=None):
+        request = self.factory.get("/api/recipe/recipes/")
+        request.user = user or AnonymousUser()
+        return request
+
+    def test_reads_outside_requests_use_primary(self):
+        """Test commands and shells always read from the primary."""
+        self.assertEqual(Recipe.objects.all().db, "default")
+
+    def test_safe_read_uses_replica(self):
+        """Test a GET reads recipes and users from a replica."""
+        with routing_context(self._get(self.user)):
+            self.assertEqual(Recipe.objects.all().db, "replica_0")
+            self.assertEqual(get_user_model().objects.all().db, "replica_0")
+
+    def test_tokens_stay_on_primary(self):
+        """Test token lookups are never sent to a replica."""
+        with routing_context(self._get()):
+            self.assertEqual(Token.objects.all().db, "default")
+
+    def test_unsafe_method_uses_primary(self):
+        """Test every query of a POST goes to the primary."""
+        request = self.factory.post("/api/recipe/recipes/")
+        request.user = self.user
+
+        with routing_context(request):
+            self.assertEqual(Recipe.objects.all().db, "default")
+
+    def test_reads_after_write_use_primary(self):
+        """Test a request reads from the primary once it has written."""
+        with routing_context(self._get(self.user)):
+            Recipe.objects.create(user=self.user, title="Soup", time_minutes=5, price=1)
+
+            self.assertEqual(Recipe.objects.all().db, "default")
+
+    def _write(self):
+        def write(request):
+            Recipe.objects.create(user=self.user, title="Soup", time_minutes=5, price=1)
+            return HttpResponse()
+
+        return ReplicaRoutingMiddleware(write)(self._get(self.user))
+
+    def test_writer_pinned_to_primary(self):
+        """Test the client of a writer is pinned to the primary on later requests."""
+        response = self._write()
+        other = get_user_model().objects.create_user(email="other@example.com", password="pass")
+
+        request = self._get(self.user)
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        with routing_context(request):
+            self.assertEqual(Recipe.objects.all().db, "default")
+        # Another user presenting the pin is not pinned by it.
+        request = self._get(other)
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        with routing_context(request):
+            self.assertEqual(Recipe.objects.all().db, "replica_0")
+
+    def test_pin_header(self):
+        """Test clients without cookies carry the pin in the X-DB-Pin header."""
+        response = self._write()
+
+        request = self.factory.get("/", HTTP_X_DB_PIN=response[PIN_HEADER])
+        request.user = self.user
+        with routing_context(request):
+            self.assertEqual(Recipe.objects.all().db, "default")
+        request = self.factory.get("/", HTTP_X_DB_PIN=response[PIN_HEADER] + "x")
+        request.user = self.user
+        with routing_context(request):
+            self.assertEqual(Recipe.objects.all().db, "replica_0")
+
+    @override_settings(DB_REPLICA_PIN_SECONDS=60)
+    def test_recent_version_reads_primary(self):
+        """Test reading a version bumped within the pin window pins the request."""
+        with routing_context(self._get(self.user)):
+            get_version(self.user.pk)
+            self.assertEqual(Recipe.objects.all().db, "replica_0")
+
+        bump_version(self.user.pk)
+
+        with routing_context(self._get(self.user)):
+            self.assertEqual(Recipe.objects.all().db, "replica_0")
+            get_version(self.user.pk)
+            self.assertEqual(Recipe.objects.all().db, "default")
+
+    def test_replicas_not_migrated(self):
+        """Test migrations never run against a replica."""
+        router = ReplicaRouter()
+
+        self.assertFalse(router.allow_migrate("replica_0", "core"))
+        self.assertIsNone(router.allow_migrate("default", "core"))
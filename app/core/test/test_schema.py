@@ -0,0 +1,115 @@
+"""Tests for the precomputed OpenAPI schema."""
+
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from core import schema
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+SCHEMA_URL = reverse("api-schema")
+
+
+class SchemaViewTests(TestCase):
+    """Test /api/schema/ serves the precomputed files."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        overrides = override_settings(SCHEMA_DIR=str(self.dir), APP_VERSION="v1")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        schema.reset()
+        self.addCleanup(schema.reset)
+
+    def test_missing_schema_generated_once_per_process(self):
+        """Test a missing schema is built on the first request only."""
+        with patch.object(schema, "render_schema", wraps=schema.render_schema) as render:
+            res = self.client.get(SCHEMA_URL)
+            self.client.get(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(render.call_count, 1)
+        self.assertTrue((self.dir / "schema.yaml").exists())
+        self.assertIn(b"openapi:", res.content)
+
+    def test_prebuilt_schema_served_without_generation(self):
+        """Test a schema built for the current version is only read."""
+        call_command("build_schema", dir=str(self.dir), stdout=StringIO())
+
+        with patch.object(schema, "render_schema") as render:
+            res = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        render.assert_not_called()
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi+json")
+        self.assertIn("/api/recipe/recipes/", json.loads(res.content)["paths"])
+
+    def test_stale_schema_regenerated(self):
+        """Test a schema built from another code version is rebuilt."""
+        schema.build_schema(self.dir, version="v0")
+
+        self.client.get(SCHEMA_URL)
+
+        metadata = json.loads((self.dir / schema.METADATA_FILE).read_text())
+        self.assertEqual(metadata["version"], "v1")
+
+    def test_etag_and_gzip(self):
+        """Test revalidation returns 304 and gzip is served when accepted."""
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertIn(b"openapi:", gzip.decompress(res.content))
+
+        res = self.client.get(
+            SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, br", HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_each_coding_has_its_own_etag(self):
+        """Test the gzip and identity bodies never share a strong ETag."""
+        gzipped = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=gzipped)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("Content-Encoding", res)
+        self.assertNotEqual(res["ETag"], gzipped)
+
+    def test_failed_rebuild_keeps_previous_files(self):
+        """Test a rebuild failing midway leaves the old files and metadata whole."""
+        schema.build_schema(self.dir, version="v0")
+        before = (self.dir / "schema.yaml").read_bytes()
+
+        with patch.object(schema.os, "replace", side_effect=OSError), self.assertRaises(OSError):
+            schema.build_schema(self.dir, version="v1")
+
+        self.assertEqual((self.dir / "schema.yaml").read_bytes(), before)
+        metadata = json.loads((self.dir / schema.METADATA_FILE).read_text())
+        self.assertEqual(metadata["version"], "v0")
+        self.assertEqual(sorted(path.name for path in self.dir.glob(".*")), [])
+
+    def test_source_fingerprint_scans_app_packages_once(self):
+        """Test the fingerprint reads only the project's packages, once per process."""
+        schema.source_fingerprint.cache_clear()
+        self.addCleanup(schema.source_fingerprint.cache_clear)
+        scanned = []
+        rglob = Path.rglob
+
+        def recording_rglob(path, pattern):
+            scanned.append(path.name)
+            return rglob(path, pattern)
+
+        with override_settings(APP_VERSION=""), patch.object(Path, "rglob", recording_rglob):
+            first = schema.code_version()
+            self.assertEqual(schema.code_version(), first)
+
+        self.assertEqual(sorted(scanned), ["app", "core", "recipe", "user"])
@@ -0,0 +1,123 @@
+"""Tests for the worker side of the serve command."""
+
+from unittest.mock import patch
+
+from core import server
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+SERVER_STATS_URL = reverse("core:server-stats")
+
+
+def hello_app(environ, start_response):
+    status_line = environ.get("TEST_STATUS", "200 OK")
+    start_response(status_line, [("Content-Type", "text/plain")])
+    return [b"hello"]
+
+
+def serve(app, environ=None):
+    """Call app like a WSGI server: consume the body, then close it."""
+    result = app(environ or {}, lambda status, headers, exc_info=None: None)
+    body = b"".join(result)
+    result.close()
+    return body
+
+
+class ClosingBody:
+    """Response body recording that it was closed."""
+
+    def __init__(self, chunks, closed):
+        self.chunks = chunks
+        self.closed = closed
+
+    def __iter__(self):
+        return self.chunks
+
+    def close(self):
+        self.closed.append(True)
+
+
+class WorkerApplicationTests(SimpleTestCase):
+    """Test request counting and recycling in WorkerApplication."""
+
+    def setUp(self):
+        patcher = patch.object(server, "stats", server.ServerStats(workers=2))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        server.stats.reset(1, pid=1234)
+
+    def test_counts_requests_and_errors(self):
+        """Test requests and 5xx responses are counted in the worker's slot."""
+        app = server.WorkerApplication(hello_app, slot=1)
+
+        serve(app)
+        serve(app, {"TEST_STATUS": "500 Internal Server Error"})
+
+        row = server.stats.snapshot()[1]
+        self.assertEqual(row["pid"], 1234)
+        self.assertEqual(row["requests"], 2)
+        self.assertEqual(row["errors"], 1)
+        self.assertEqual(row["in_flight"], 0)
+        self.assertEqual(server.stats.snapshot()[0]["requests"], 0)
+
+    def test_limit_triggers_recycle(self):
+        """Test on_limit fires once max_requests have been served."""
+        recycled = []
+        app = server.WorkerApplication(
+            hello_app, slot=1, max_requests=2, on_limit=lambda: recycled.append(True)
+        )
+
+        serve(app)
+        self.assertEqual(recycled, [])
+        serve(app)
+
+        self.assertEqual(recycled, [True])
+
+    def test_streaming_response_in_flight_until_closed(self):
+        """Test a request stays in flight while its body is still being sent."""
+        closed = []
+
+        def streaming_app(environ, start_response):
+            start_response("200 OK", [])
+            body = iter([b"a", b"b"])
+            return ClosingBody(body, closed)
+
+        app = server.WorkerApplication(streaming_app, slot=1)
+        result = app({}, lambda *args: None)
+        next(iter(result))
+
+        self.assertEqual(server.stats.get(1, "in_flight"), 1)
+        self.assertEqual(server.stats.get(1, "requests"), 0)
+        list(result)
+        result.close()
+        self.assertEqual(closed, [True])
+        self.assertEqual(server.stats.get(1, "in_flight"), 0)
+        self.assertEqual(server.stats.get(1, "requests"), 1)
+
+    def test_reset_counts_restarts(self):
+        """Test replacing a worker clears its counters and records the restart."""
+        server.stats.add(1, "requests", 10)
+
+        server.stats.reset(1, pid=5678)
+
+        row = server.stats.snapshot()[1]
+        self.assertEqual(row["requests"], 0)
+        self.assertEqual(row["restarts"], 1)
+
+
+class ServerStatsAPITests(TestCase):
+    """Test the server stats endpoint."""
+
+    def test_server_stats_without_serve(self):
+        """Test the endpoint reports no workers outside manage.py serve."""
+        user = get_user_model().objects.create_superuser(email="admin@example.com", password="pw")
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        res = client.get(SERVER_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["workers"], [])
@@ -0,0 +1,91 @@
+"""Tests for the lazy-import URL helpers and the startup_profile command."""
+
+import json
+from io import StringIO
+from unittest.mock import patch
+
+from core.lazy import lazy_include, lazy_view
+from core.management.commands.startup_profile import PHASE_MARKER, parse_importtime
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from django.views import View
+
+urlpatterns = [lazy_include("admin/", "core.admin_urls", namespace="admin")]
+
+
+class HelloView(View):
+    greeting = "hello"
+
+    def get(self, request):
+        return HttpResponse(self.greeting)
+
+
+class LazyURLTests(SimpleTestCase):
+    """Test the URLconf helpers used with LAZY_IMPORTS."""
+
+    def test_lazy_view_imports_on_first_call(self):
+        """Test the view class is only imported when the view is first called."""
+        view = lazy_view("core.test.test_startup.HelloView", greeting="hi")
+
+        with patch("core.lazy.import_string", return_value=HelloView) as import_string:
+            import_string.assert_not_called()
+            request = RequestFactory().get("/")
+            view(request)
+            res = view(request)
+
+        import_string.assert_called_once_with("core.test.test_startup.HelloView")
+        self.assertEqual(res.content, b"hi")
+
+    @override_settings(ROOT_URLCONF="core.test.test_startup")
+    def test_lazy_include_reverses_admin(self):
+        """Test the lazily included admin keeps its namespace."""
+        self.assertEqual(reverse("admin:index"), "/admin/")
+        self.assertEqual(reverse("admin:core_recipe_changelist"), "/admin/core/recipe/")
+
+
+class StartupProfileTests(SimpleTestCase):
+    """Test the startup_profile command."""
+
+    def test_parse_importtime(self):
+        """Test importtime lines are parsed with depth and phase."""
+        stderr = "\n".join(
+            [
+                "import time: self [us] | cumulative | imported package",
+                "import time:       100 |        100 | zipimport",
+                f"{PHASE_MARKER}apps",
+                "import time:       250 |        250 |   core.versioning",
+                "import time:      1000 |       1250 | core.signals",
+            ]
+        )
+
+        modules = parse_importtime(stderr)
+
+        self.assertEqual(
+            modules[1],
+            {
+                "module": "core.versioning",
+                "depth": 1,
+                "self_ms": 0.25,
+                "cumulative_ms": 0.25,
+                "phase": "apps",
+            },
+        )
+        self.assertEqual(modules[0]["phase"], "interpreter")
+        self.assertEqual(modules[2]["depth"], 0)
+
+    def test_profile_lazy_boot(self):
+        """Test a lazy boot is profiled per phase and app without the admin modules."""
+        out = StringIO()
+
+        call_command("startup_profile", "--lazy", "--json", depth=9, min_ms=0, top=5000, stdout=out)
+
+        result = json.loads(out.getvalue())
+        self.assertTrue(result["lazy_imports"])
+        self.assertEqual(list(result["phases"]), ["settings", "apps", "urlconf", "middleware"])
+        self.assertIn("recipe", result["apps"])
+        modules = {entry["module"] for entry in result["modules"]}
+        self.assertIn("core.models", modules)
+        self.assertNotIn("core.admin", modules)
+        self.assertNotIn("drf_spectacular.views", modules)
@@ -0,0 +1,15 @@
+"""
+URL mappings for the core app.
+"""
+
+from core import views
+from django.urls import path
+
+app_name = "core"
+
+urlpatterns = [
+    path("db-pool-stats/", views.DatabasePoolStatsView.as_view(), name="db-pool-stats"),
+    path("server-stats/", views.ServerStatsView.as_view(), name="server-stats"),
+    path("metrics/", views.MetricsView.as_view(), name="metrics"),
+    path("jobs/<int:pk>/", views.JobView.as_view(), name="job-detail"),
+]
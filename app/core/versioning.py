@@ -0,0 +1,82 @@
+"""
+Per-user data version counters.
+
+Every write to a user's recipes, tags, ingredients or profile bumps the
+user's ``UserVersion`` row (see core.signals). Readers compare that single
+number instead of loading rows, e.g. to answer conditional GETs or to key
+cached responses.
+
+Versions are read from the primary. While a replica may still lag the last
+bump, the rest of the request reads the primary too (core.routers), so the
+rows behind an ETag or cached response are never older than its version.
+"""
+
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from core.models import UserVersion
+from core.routers import pin_request, pin_seconds
+from django.db.models import F
+from django.utils import timezone
+
+_state = threading.local()
+
+
+def get_version(user_id):
+    """Return the user's current data version with one primary-key lookup."""
+    row = UserVersion.objects.filter(user_id=user_id).values_list("version", "written_at").first()
+    if row is None:
+        # Users created without signals (bulk_create) get their row lazily.
+        return UserVersion.objects.get_or_create(user_id=user_id)[0].version
+    version, written_at = row
+    if written_at is not None and timezone.now() - written_at < timedelta(seconds=pin_seconds()):
+        pin_request()
+    return version
+
+
+class DataVersionMixin:
+    """Look the request user's data version up at most once per view instance."""
+
+    def get_data_version(self, refresh=False):
+        """Return the request user's data version, cached for this request."""
+        if refresh or not hasattr(self, "_data_version"):
+            self._data_version = get_version(self.request.user.pk)
+        return self._data_version
+
+
+def bump_version(*user_ids):
+    """Increment the data version of the given users."""
+    pending = getattr(_state, "pending", None)
+    if pending is not None:
+        pending.update(user_ids)
+        return
+    _bump(user_ids)
+
+
+@contextmanager
+def bump_once():
+    """
+    Collapse every bump made inside the block into one UPDATE.
+
+    Bulk writes fire a signal per row; wrap them in this (inside their
+    transaction) so a thousand-row delete costs one counter update.
+    """
+    if getattr(_state, "pending", None) is not None:
+        yield
+        return
+    _state.pending = set()
+    try:
+        yield
+        pending = _state.pending
+    finally:
+        _state.pending = None
+    _bump(pending)
+
+
+def _bump(user_ids):
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if user_ids:
+        UserVersion.objects.filter(user_id__in=user_ids).update(
+            version=F("version") + 1, written_at=timezone.now()
+        )
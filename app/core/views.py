@@ -0,0 +1,66 @@
+"""
+Views for the core app.
+"""
+
+import os
+
+from core import metrics, server
+from core.backends.postgresql.pool import pool_stats
+from core.models import Job
+from core.serializers import JobSerializer
+from django.http import HttpResponse
+from rest_framework import generics, permissions, views
+from rest_framework.response import Response
+from user.authentication import CachedTokenAuthentication
+
+
+class DatabasePoolStatsView(views.APIView):
+    """Report the utilization of this worker's database connection pools."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    # Operational endpoint, kept out of the public OpenAPI schema.
+    schema = None
+
+    def get(self, request):
+        return Response(pool_stats())
+
+
+class ServerStatsView(views.APIView):
+    """Report per-worker request counters when running under ``manage.py serve``."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    # Operational endpoint, kept out of the public OpenAPI schema.
+    schema = None
+
+    def get(self, request):
+        workers = server.stats.snapshot() if server.stats is not None else []
+        return Response({"pid": os.getpid(), "workers": workers})
+
+
+class MetricsView(views.APIView):
+    """Serve the request metrics of all workers in the Prometheus text format."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    # Operational endpoint, kept out of the public OpenAPI schema.
+    schema = None
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class JobView(generics.RetrieveAPIView):
+    """Report the status of a background job started by the user."""
+
+    serializer_class = JobSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(user=self.request.user)
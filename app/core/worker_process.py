@@ -0,0 +1,23 @@
+"""
+Entrypoints of the processes spawned by ``run_worker --pool process``.
+
+Imported by the new interpreter before Django is set up, so nothing that
+needs the app registry is imported at module level.
+"""
+
+
+def initialize():
+    """Set up Django and register the tasks in a new worker process."""
+    import django
+    from django.utils.module_loading import autodiscover_modules
+
+    django.setup()
+    autodiscover_modules("tasks")
+
+
+def run_job(pk):
+    """Execute the claimed job pk."""
+    from core.jobs import execute
+    from core.models import Job
+
+    return execute(Job.objects.get(pk=pk))
@@ -0,0 +1,69 @@
+"""
+Streaming export of recipes as NDJSON or CSV.
+
+Rows are read with ``QuerySet.iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL) and encoded one at a time, so worker memory stays flat
+however many recipes a user has.
+"""
+
+import csv
+import json
+
+from recipe.serializers import RecipeSerializer
+
+
+class RecipeRowEncoder:
+    """
+    Format value rows exactly like RecipeSerializer, without building one per row.
+
+    The serializer's fields are bound once and each column is passed through
+    its ``to_representation``, so e.g. ``price`` comes out as ``"5.25"``.
+    """
+
+    def __init__(self, serializer_class=RecipeSerializer):
+        fields = serializer_class().fields
+        self.columns = [name for name, field in fields.items() if not field.write_only]
+        self._fields = [fields[name] for name in self.columns]
+
+    def encode(self, row):
+        """Return the representation of a values_list() row as a dict."""
+        return {
+            name: None if value is None else field.to_representation(value)
+            for name, field, value in zip(self.columns, self._fields, row)
+        }
+
+
+class _Echo:
+    """File-like object whose write() hands the line straight back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, encoder, chunk_size):
+    rows = queryset.values_list(*encoder.columns).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield encoder.encode(row)
+
+
+def stream_ndjson(queryset, chunk_size, encoder=None):
+    """Yield one JSON document per recipe, newline terminated."""
+    encoder = encoder or RecipeRowEncoder()
+    for item in _rows(queryset, encoder, chunk_size):
+        yield json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def stream_csv(queryset, chunk_size, encoder=None):
+    """Yield a header line and then one CSV line per recipe."""
+    encoder = encoder or RecipeRowEncoder()
+    writer = csv.writer(_Echo())
+    yield writer.writerow(encoder.columns)
+    for item in _rows(queryset, encoder, chunk_size):
+        yield writer.writerow(item.values())
+
+
+# output name -> (streamer, content type, download filename)
+EXPORT_FORMATS = {
+    "ndjson": (stream_ndjson, "application/x-ndjson", "recipes.ndjson"),
+    "csv": (stream_csv, "text/csv", "recipes.csv"),
+}
@@ -0,0 +1,110 @@
+"""
+Filters and facet counts for the recipe list.
+
+``time_minutes_min``/``time_minutes_max`` and ``price_min``/``price_max``
+narrow the list (min inclusive, max inclusive). ``tags``/``ingredients``
+take comma separated IDs and keep recipes having any of them. Facet
+counts for every bucket are computed by one aggregate query using
+``Count(filter=...)``, so adding buckets never adds queries.
+"""
+
+from decimal import Decimal
+
+from core.models import Recipe
+from django.db.models import Count, Q
+from rest_framework import serializers
+
+# field -> ordered (lower inclusive, upper exclusive) buckets; None is unbounded.
+FACET_BUCKETS = {
+    "time_minutes": [(None, 15), (15, 30), (30, 60), (60, None)],
+    "price": [
+        (None, Decimal("5")),
+        (Decimal("5"), Decimal("10")),
+        (Decimal("10"), Decimal("20")),
+        (Decimal("20"), None),
+    ],
+}
+
+# query parameter -> column on the Recipe M2M through table
+RELATED_FILTERS = {"tags": "tag_id", "ingredients": "ingredient_id"}
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """Validates the filter query parameters of the recipe list."""
+
+    time_minutes_min = serializers.IntegerField(required=False, min_value=0)
+    time_minutes_max = serializers.IntegerField(required=False, min_value=0)
+    price_min = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    price_max = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    tags = serializers.CharField(required=False)
+    ingredients = serializers.CharField(required=False)
+
+    def _validate_ids(self, value):
+        try:
+            return [int(part) for part in value.split(",") if part.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Expected a comma separated list of IDs.")
+
+    def validate_tags(self, value):
+        return self._validate_ids(value)
+
+    def validate_ingredients(self, value):
+        return self._validate_ids(value)
+
+
+def filter_recipes(queryset, params):
+    """Apply the filters present in params (a QueryDict) to queryset."""
+    serializer = RecipeFilterSerializer(data=params)
+    serializer.is_valid(raise_exception=True)
+    for name, value in serializer.validated_data.items():
+        if name in RELATED_FILTERS:
+            # A subquery on the through table needs no JOIN and so no DISTINCT.
+            through = getattr(Recipe, name).through
+            matching = through.objects.filter(**{f"{RELATED_FILTERS[name]}__in": value})
+            queryset = queryset.filter(id__in=matching.values("recipe_id"))
+        else:
+            field, bound = name.rsplit("_", 1)
+            lookup = "gte" if bound == "min" else "lte"
+            queryset = queryset.filter(**{f"{field}__{lookup}": value})
+    return queryset
+
+
+def _bucket_label(lower, upper):
+    if lower is None:
+        return f"<{upper}"
+    if upper is None:
+        return f"{lower}+"
+    return f"{lower}-{upper}"
+
+
+def _bucket_filter(field, lower, upper):
+    condition = Q()
+    if lower is not None:
+        condition &= Q(**{f"{field}__gte": lower})
+    if upper is not None:
+        condition &= Q(**{f"{field}__lt": upper})
+    return condition
+
+
+def facet_counts(queryset, buckets=None):
+    """Return bucket counts for every faceted field in a single query."""
+    buckets = buckets or FACET_BUCKETS
+    aggregates = {}
+    for field, ranges in buckets.items():
+        for index, (lower, upper) in enumerate(ranges):
+            aggregates[f"{field}_{index}"] = Count("id", filter=_bucket_filter(field, lower, upper))
+
+    counts = queryset.aggregate(**aggregates)
+
+    return {
+        field: [
+            {
+                "label": _bucket_label(lower, upper),
+                "min": lower,
+                "max": upper,
+                "count": counts[f"{field}_{index}"],
+            }
+            for index, (lower, upper) in enumerate(ranges)
+        ]
+        for field, ranges in buckets.items()
+    }
@@ -0,0 +1,145 @@
+"""
+Recipe image uploads.
+
+The upload is streamed to a temporary file in chunks as it is received
+(``StreamingImageUploadHandler``) and never held in memory. Decoding and
+resizing into ``VARIANT_SIZES`` runs in a bounded process pool
+(``image_pool``), so image work neither holds the GIL of the request
+threads nor queues without limit: when every process is busy and the queue
+is full, uploads are rejected with a 503. Variants are re-encoded in
+``RECIPE_IMAGE_FORMAT`` without any of the upload's metadata, saved through
+the default storage, and the variants of the previous image are deleted.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from core.pools import BoundedPool
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from recipe.thumbnails import make_variants
+from rest_framework import exceptions, serializers
+
+# Variant name -> longest side in pixels.
+VARIANT_SIZES = {"thumbnail": 160, "medium": 640, "full": 2048}
+# The variant stored in Recipe.image.
+MAIN_VARIANT = "full"
+
+
+class ImageTooLarge(exceptions.APIException):
+    """Raised while streaming an upload that exceeds RECIPE_IMAGE_MAX_BYTES."""
+
+    status_code = 413
+    default_detail = _("The image is too large.")
+    default_code = "image_too_large"
+
+
+class ImageProcessingOverloaded(exceptions.APIException):
+    """Raised when the image processing queue is full."""
+
+    status_code = 503
+    default_detail = _("Too many images being processed, please retry shortly.")
+    default_code = "image_processing_overloaded"
+    wait = 1
+
+
+class StreamingImageUploadHandler(TemporaryFileUploadHandler):
+    """Write uploaded files to a temporary file chunk by chunk, up to a size limit."""
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or getattr(settings, "RECIPE_IMAGE_MAX_BYTES", 10 * 2**20)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Refuse an oversized body before reading any of it; the multipart
+        # envelope adds well under a kilobyte.
+        if content_length and content_length > self.max_bytes + 4096:
+            raise ImageTooLarge()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_bytes:
+            raise ImageTooLarge()
+        return super().receive_data_chunk(raw_data, start)
+
+
+class ImagePool(BoundedPool):
+    """Bounded process pool for image decoding and resizing."""
+
+    overloaded = ImageProcessingOverloaded
+
+    def _new_executor(self):
+        # Spawned, not forked: the server's threads and connections stay behind.
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+
+image_pool = ImagePool(
+    max_workers=getattr(settings, "RECIPE_IMAGE_POOL_SIZE", None),
+    max_pending=getattr(settings, "RECIPE_IMAGE_QUEUE_DEPTH", None),
+)
+
+
+def save_image(recipe, upload):
+    """Store resized variants of an uploaded file as the recipe's image."""
+    prefix = f"uploads/recipe/{recipe.pk}/{uuid.uuid4().hex}"
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            variants = image_pool.run(
+                make_variants,
+                upload.temporary_file_path(),
+                workdir,
+                VARIANT_SIZES,
+                getattr(settings, "RECIPE_IMAGE_FORMAT", "JPEG"),
+                getattr(settings, "RECIPE_IMAGE_QUALITY", 85),
+                getattr(settings, "RECIPE_IMAGE_MAX_PIXELS", None),
+            )
+        except ValueError as exc:
+            raise serializers.ValidationError({"image": [str(exc)]})
+
+        stored = {}
+        for name, (filename, width, height) in variants.items():
+            with open(os.path.join(workdir, filename), "rb") as fh:
+                stored[name] = {
+                    "name": default_storage.save(f"{prefix}-{filename}", File(fh)),
+                    "width": width,
+                    "height": height,
+                }
+
+    with transaction.atomic():
+        # Lock the row so concurrent uploads each delete the image they replaced.
+        previous = (
+            type(recipe)
+            .objects.select_for_update()
+            .values_list("image_variants", flat=True)
+            .get(pk=recipe.pk)
+        )
+        recipe.image = stored[MAIN_VARIANT]["name"]
+        recipe.image_variants = stored
+        recipe.save(update_fields=["image", "image_variants"])
+        transaction.on_commit(lambda: delete_variants(previous))
+    return recipe
+
+
+def delete_variants(variants):
+    """Delete the stored files of an image's variants."""
+    for variant in (variants or {}).values():
+        default_storage.delete(variant["name"])
+
+
+def variant_urls(variants, request=None):
+    """Return {name: {"url", "width", "height"}} for an image's variants."""
+    urls = {}
+    for name, variant in (variants or {}).items():
+        url = default_storage.url(variant["name"])
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        urls[name] = {"url": url, "width": variant["width"], "height": variant["height"]}
+    return urls
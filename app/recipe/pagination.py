@@ -0,0 +1,28 @@
+"""
+Pagination classes for the recipe API.
+"""
+
+from recipe.search import SEARCH_PARAM
+from rest_framework.pagination import CursorPagination
+
+
+class RecipeCursorPagination(CursorPagination):
+    """
+    Keyset pagination over a user's recipes.
+
+    Pages are addressed by opaque next/previous cursors that encode the last
+    seen ``id``, so every page is a ``WHERE user_id = %s AND id < %s`` range
+    scan on the ``(user, -id)`` index. No ``COUNT(*)`` is issued, which keeps
+    page N as cheap as page 1.
+    """
+
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        """Order search results by relevance, keeping ``id`` as the tie-breaker."""
+        if request.query_params.get(SEARCH_PARAM):
+            return ("-rank", "-id")
+        return super().get_ordering(request, queryset, view)
@@ -0,0 +1,81 @@
+"""
+Full-text search over recipe titles and descriptions.
+
+On PostgreSQL, ``core_recipe.search_vector`` is a ``tsvector`` maintained by
+a trigger (title weighted A, description weighted B) and covered by a GIN
+index, so a search is an index lookup plus ``ts_rank`` over the matches.
+
+Other backends (SQLite in tests) use a small in-memory inverted index built
+from the user's recipes. It mirrors ``plainto_tsquery`` semantics closely
+enough to exercise the API: every term must match, title hits outrank
+description hits.
+"""
+
+import re
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+
+SEARCH_PARAM = "search"
+SEARCH_CONFIG = "english"
+
+# ts_rank's default weights for the A (title) and B (description) labels.
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be but by for from in into is it of on or the to with".split()
+)
+
+
+def tokenize(text):
+    """Split text into lower-cased terms, dropping English stop words."""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOP_WORDS]
+
+
+class InvertedIndex:
+    """Term -> {recipe id: weight} postings for the fallback search."""
+
+    def __init__(self):
+        self._postings = defaultdict(lambda: defaultdict(float))
+
+    def add(self, recipe_id, title, description):
+        """Index one recipe."""
+        for token in tokenize(title):
+            self._postings[token][recipe_id] += TITLE_WEIGHT
+        for token in tokenize(description or ""):
+            self._postings[token][recipe_id] += DESCRIPTION_WEIGHT
+
+    def search(self, query):
+        """Return {recipe id: rank} for recipes containing every query term."""
+        terms = tokenize(query)
+        if not terms:
+            return {}
+        postings = [self._postings.get(term, {}) for term in terms]
+        matches = set(postings[0]).intersection(*postings[1:])
+        return {recipe_id: sum(posting[recipe_id] for posting in postings) for recipe_id in matches}
+
+
+def search_recipes(queryset, query):
+    """Filter queryset to recipes matching query, annotated with a ``rank``."""
+    if connections[queryset.db].vendor == "postgresql":
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F("search_vector"), search_query)
+        )
+
+    index = InvertedIndex()
+    for recipe_id, title, description in queryset.values_list("id", "title", "description"):
+        index.add(recipe_id, title, description)
+    ranks = index.search(query)
+    if not ranks:
+        return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    return queryset.filter(id__in=ranks).annotate(
+        rank=Case(
+            *[When(id=recipe_id, then=Value(rank)) for recipe_id, rank in ranks.items()],
+            output_field=FloatField(),
+        )
+    )
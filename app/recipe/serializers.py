@@ -2,13 +2,275 @@
 Serializer for recipe objects API.
 """
 
+from core.models import Ingredient, Recipe, Tag
+from django.conf import settings
+from recipe.images import variant_urls
 from rest_framework import serializers
-from core.models import Recipe
+
+# Rows per INSERT/UPDATE statement issued by the bulk endpoint.
+BULK_BATCH_SIZE = 500
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """Persist many recipes with one bulk query per operation."""
+
+    def validate_items(self, data):
+        """
+        Validate each item on its own.
+
+        Returns ``(valid, errors)`` where ``valid`` is a list of
+        ``(index, attrs)`` pairs and ``errors`` maps item index to its error
+        detail, so callers can keep the good rows when asked to.
+        """
+        valid, errors = [], {}
+        for index, item in enumerate(data):
+            try:
+                valid.append((index, self.child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+        return valid, errors
+
+    def create(self, validated_data):
+        recipes = [Recipe(**attrs) for attrs in validated_data]
+        return Recipe.objects.bulk_create(recipes, batch_size=BULK_BATCH_SIZE)
+
+    def update(self, instance, validated_data):
+        fields = set()
+        for recipe, attrs in zip(instance, validated_data):
+            for attr, value in attrs.items():
+                setattr(recipe, attr, value)
+            fields.update(attrs)
+        if fields:
+            Recipe.objects.bulk_update(instance, sorted(fields), batch_size=BULK_BATCH_SIZE)
+        return instance
+
 
 class RecipeSerializer(serializers.ModelSerializer):
     """Serializer for recipe objects."""
+
     class Meta:
         model = Recipe
         fields = ["id", "title", "description", "time_minutes", "price", "link"]
         read_only_fields = ["id"]
-        
\ No newline at end of file
+        list_serializer_class = RecipeListSerializer
+
+
+class UserNamedSerializer(serializers.ModelSerializer):
+    """Base serializer for tags and ingredients, unique by name per user."""
+
+    def validate_name(self, value):
+        """Reject a name another of the user's rows already has."""
+        request = self.context.get("request")
+        if self.parent is not None or request is None:
+            # Nested in a recipe, names refer to existing rows (get_or_create_named).
+            return value
+        others = self.Meta.model.objects.filter(user=request.user, name=value)
+        if self.instance is not None:
+            others = others.exclude(pk=self.instance.pk)
+        if others.exists():
+            raise serializers.ValidationError(
+                f"You already have a {self.Meta.model._meta.verbose_name} with this name."
+            )
+        return value
+
+
+class TagSerializer(UserNamedSerializer):
+    """Serializer for tags."""
+
+    class Meta:
+        model = Tag
+        fields = ["id", "name"]
+        read_only_fields = ["id"]
+
+
+class IngredientSerializer(UserNamedSerializer):
+    """Serializer for ingredients."""
+
+    class Meta:
+        model = Ingredient
+        fields = ["id", "name"]
+        read_only_fields = ["id"]
+
+
+def get_or_create_named(model, user, names):
+    """
+    Return the user's ``model`` rows for names, creating missing ones in bulk.
+
+    Costs one SELECT when everything exists, and one INSERT plus one SELECT
+    more otherwise, regardless of how many names are given.
+    """
+    names = list(dict.fromkeys(names))
+    found = {obj.name: obj for obj in model.objects.filter(user=user, name__in=names)}
+    missing = [name for name in names if name not in found]
+    if missing:
+        model.objects.bulk_create(
+            [model(user=user, name=name) for name in missing], ignore_conflicts=True
+        )
+        # Re-read: ignore_conflicts does not hand back primary keys.
+        found.update({obj.name: obj for obj in model.objects.filter(user=user, name__in=missing)})
+    return [found[name] for name in names]
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Represent stored image variants as {name: {"url", "width", "height"}}."""
+
+    def to_representation(self, value):
+        return variant_urls(value, self.context.get("request"))
+
+
+class RecipeImageSerializer(serializers.ModelSerializer):
+    """Serializer for a recipe's image and its precomputed variants."""
+
+    image = serializers.ImageField(read_only=True)
+    image_variants = ImageVariantsField()
+
+    class Meta:
+        model = Recipe
+        fields = ["id", "image", "image_variants"]
+        read_only_fields = ["id"]
+
+
+class RecipeDetailSerializer(RecipeSerializer):
+    """Serializer for recipes with nested, writable tags and ingredients."""
+
+    tags = TagSerializer(many=True, required=False)
+    ingredients = IngredientSerializer(many=True, required=False)
+    image = serializers.ImageField(read_only=True)
+    image_variants = ImageVariantsField()
+
+    class Meta(RecipeSerializer.Meta):
+        fields = RecipeSerializer.Meta.fields + ["tags", "ingredients", "image", "image_variants"]
+
+    def _assign_related(self, recipe, related):
+        for field, (model, items) in related.items():
+            if items is None:
+                continue
+            objs = get_or_create_named(model, recipe.user, [item["name"] for item in items])
+            getattr(recipe, field).set(objs)
+
+    def _pop_related(self, validated_data):
+        return {
+            "tags": (Tag, validated_data.pop("tags", None)),
+            "ingredients": (Ingredient, validated_data.pop("ingredients", None)),
+        }
+
+    def create(self, validated_data):
+        """Create a recipe, creating any missing tags/ingredients in bulk."""
+        related = self._pop_related(validated_data)
+        recipe = super().create(validated_data)
+        self._assign_related(recipe, related)
+        return recipe
+
+    def update(self, instance, validated_data):
+        """Update a recipe; tags/ingredients are replaced only when given."""
+        related = self._pop_related(validated_data)
+        recipe = super().update(instance, validated_data)
+        self._assign_related(recipe, related)
+        return recipe
+
+
+def _duplicate_errors(items):
+    """Return {index: detail} for every (index, id) item repeating an earlier id."""
+    first, errors = {}, {}
+    for index, recipe_id in items:
+        if recipe_id in first:
+            errors[index] = {"id": [f"Duplicate of item {first[recipe_id]}."]}
+        else:
+            first[recipe_id] = index
+    return errors
+
+
+class RecipeBulkSerializer(serializers.Serializer):
+    """
+    Serializer for the envelope posted to the bulk recipe endpoint.
+
+    Items are validated individually with ``RecipeListSerializer``; creates
+    and updates are then written with ``bulk_create``/``bulk_update`` and
+    deletes with a single ``DELETE ... WHERE id IN``, all in the caller's
+    transaction. Without ``partial`` any item error rejects the whole batch.
+    With ``background`` the view queues the batch as a job (recipe.tasks)
+    and answers 202 straight away.
+
+    The batch is applied with ``apply()`` rather than ``save()`` because the
+    ``create``/``update`` payload keys shadow the serializer's own methods.
+    """
+
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    partial = serializers.BooleanField(required=False, default=False)
+    background = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        max_items = getattr(settings, "RECIPE_BULK_MAX_ITEMS", 5000)
+        total = len(attrs["create"]) + len(attrs["update"]) + len(attrs["delete"])
+        if total > max_items:
+            raise serializers.ValidationError(
+                f"A bulk request may contain at most {max_items} items, got {total}."
+            )
+        return attrs
+
+    def apply(self, user, queryset):
+        """Apply the batch to the recipes in ``queryset``; return the results."""
+        validated_data = self.validated_data
+        errors = {}
+
+        creator = RecipeSerializer(many=True)
+        to_create, errors["create"] = creator.validate_items(validated_data["create"])
+
+        updater = RecipeSerializer(many=True, partial=True)
+        targets, errors["update"] = self._resolve_updates(queryset, validated_data["update"])
+        valid_updates, update_errors = updater.validate_items(
+            [validated_data["update"][index] for index in targets]
+        )
+        indexes = list(targets)
+        errors["update"].update({indexes[i]: detail for i, detail in update_errors.items()})
+        to_update = [(targets[indexes[i]], attrs) for i, attrs in valid_updates]
+
+        delete_ids = set(validated_data["delete"])
+        existing = set(queryset.filter(id__in=delete_ids).values_list("id", flat=True))
+        errors["delete"] = _duplicate_errors(enumerate(validated_data["delete"]))
+        for index, recipe_id in enumerate(validated_data["delete"]):
+            if recipe_id not in existing:
+                errors["delete"][index] = {"id": [f"Recipe {recipe_id} not found."]}
+
+        errors = {op: detail for op, detail in errors.items() if detail}
+        if errors and not validated_data["partial"]:
+            raise serializers.ValidationError({"errors": errors})
+
+        created = creator.create([{**attrs, "user": user} for _index, attrs in to_create])
+        updated = updater.update(
+            [recipe for recipe, _attrs in to_update], [attrs for _recipe, attrs in to_update]
+        )
+        if existing:
+            queryset.filter(id__in=existing).delete()
+
+        return {
+            "created": RecipeSerializer(created, many=True).data,
+            "updated": RecipeSerializer(updated, many=True).data,
+            "deleted": sorted(existing),
+            "errors": errors,
+        }
+
+    def _resolve_updates(self, queryset, items):
+        """Map update item index -> Recipe with one query; report bad, repeated or unknown ids."""
+        id_field = serializers.IntegerField()
+        ids, errors = {}, {}
+        for index, item in enumerate(items):
+            try:
+                ids[index] = id_field.run_validation(item.get("id", serializers.empty))
+            except serializers.ValidationError as exc:
+                errors[index] = {"id": exc.detail}
+        # in_bulk gives one instance per id: a repeated id would be updated twice.
+        duplicates = _duplicate_errors(ids.items())
+        errors.update(duplicates)
+        ids = {index: recipe_id for index, recipe_id in ids.items() if index not in duplicates}
+
+        recipes = queryset.in_bulk(set(ids.values()))
+        targets = {}
+        for index, recipe_id in ids.items():
+            if recipe_id in recipes:
+                targets[index] = recipes[recipe_id]
+            else:
+                errors[index] = {"id": [f"Recipe {recipe_id} not found."]}
+        return targets, errors
@@ -0,0 +1,15 @@
+"""Signal handlers for recipe images."""
+
+from core.models import Recipe
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from recipe.images import delete_variants
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_image(sender, instance, **kwargs):
+    """Delete the stored image variants once a recipe's deletion is committed."""
+    if instance.image_variants:
+        variants = instance.image_variants
+        transaction.on_commit(lambda: delete_variants(variants))
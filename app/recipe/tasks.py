@@ -0,0 +1,37 @@
+"""
+Background jobs of the recipe app (see core.jobs).
+
+A bulk recipe request posted with ``background`` is answered with 202 and
+applied here by ``manage.py run_worker``; the job's result is the body the
+synchronous request would have returned.
+"""
+
+from core import versioning
+from core.jobs import task
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from recipe.serializers import RecipeBulkSerializer
+from rest_framework import serializers
+
+
+def apply_bulk(serializer, user):
+    """Apply a validated RecipeBulkSerializer to user's recipes in one transaction."""
+    with transaction.atomic(), versioning.bump_once():
+        result = serializer.apply(user=user, queryset=Recipe.objects.filter(user=user))
+        # bulk_create/bulk_update send no signals.
+        versioning.bump_version(user.pk)
+    return result
+
+
+@task
+def bulk(user_id, data):
+    """Apply the bulk request data on behalf of user_id; return the response body."""
+    user = get_user_model().objects.get(pk=user_id)
+    serializer = RecipeBulkSerializer(data=data)
+    try:
+        serializer.is_valid(raise_exception=True)
+        return apply_bulk(serializer, user)
+    except serializers.ValidationError as exc:
+        # A rejected batch is an outcome, not a failure worth retrying.
+        return exc.detail
@@ -2,18 +2,59 @@
 Test cases for the Recipe API endpoints.
 """
 
+import csv
+import json
+import os
+import tempfile
 from decimal import Decimal
+from io import BytesIO
+
+from core import jobs
+from core.models import Ingredient, Job, Recipe, Tag, UserVersion
+from core.response_cache import get_cache, stats
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from PIL import Image
+from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
 from rest_framework import status
 from rest_framework.test import APIClient
-from core.models import Recipe
 
-from recipe.serializers import RecipeSerializer
+RECIPE_URL = reverse("recipe:recipe-list")
+BULK_URL = reverse("recipe:recipe-bulk")
+EXPORT_URL = reverse("recipe:recipe-export")
+FACETS_URL = reverse("recipe:recipe-facets")
+TAGS_URL = reverse("recipe:tag-list")
+CACHE_STATS_URL = reverse("recipe:cache-stats")
+RECIPE_ASYNC_URL = reverse("recipe:recipe-list-async")
 
 
-RECIPE_URL = reverse("recipe:recipe-list")
+def image_upload_url(recipe_id):
+    """Create and return an image upload URL."""
+    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+
+
+def detail_url(recipe_id):
+    """Create and return a recipe detail URL."""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def tag_detail_url(tag_id):
+    """Create and return a tag detail URL."""
+    return reverse("recipe:tag-detail", args=[tag_id])
+
+
+def ingredient_detail_url(ingredient_id):
+    """Create and return an ingredient detail URL."""
+    return reverse("recipe:ingredient-detail", args=[ingredient_id])
+
+
+def detail_async_url(recipe_id):
+    """Create and return an async recipe detail URL."""
+    return reverse("recipe:recipe-detail-async", args=[recipe_id])
+
 
 def create_recipe(user, **params):
     """Create and return a sample recipe."""
@@ -50,10 +91,10 @@ class PrivateRecipeAPITests(TestCase):
     def setUp(self):
         self.client = APIClient()
         self.user = get_user_model().objects.create_user(
-            email="user@example.com",
-            password="testpass123"
+            email="user@example.com", password="testpass123"
         )
         self.client.force_authenticate(user=self.user)
+
     def test_retrieve_recipes(self):
         """Test retrieving a list of recipes."""
         create_recipe(user=self.user)
@@ -62,16 +103,14 @@ class PrivateRecipeAPITests(TestCase):
         res = self.client.get(RECIPE_URL)
 
         recipes = Recipe.objects.all().order_by("-id")
-        serializer = RecipeSerializer(recipes, many=True)
+        serializer = RecipeDetailSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
-
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_retrieve_recipes_limited_to_user(self):
         """Test retrieving recipes for the authenticated user."""
         other_user = get_user_model().objects.create_user(
-            email="other@example.com",
-            password="testpass123"
+            email="other@example.com", password="testpass123"
         )
         create_recipe(user=other_user)
         create_recipe(user=self.user)
@@ -79,9 +118,50 @@ class PrivateRecipeAPITests(TestCase):
         res = self.client.get(RECIPE_URL)
 
         recipes = Recipe.objects.filter(user=self.user).order_by("-id")
-        serializer = RecipeSerializer(recipes, many=True)
+        serializer = RecipeDetailSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+
+    def test_recipe_list_cursor_pagination(self):
+        """Test the recipe list is paginated with opaque cursors."""
+        recipes = [create_recipe(user=self.user, title=f"Recipe {i}") for i in range(5)]
+
+        res = self.client.get(RECIPE_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", res.data)
+        self.assertIsNone(res.data["previous"])
+        self.assertEqual([r["id"] for r in res.data["results"]], [recipes[4].id, recipes[3].id])
+
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual([r["id"] for r in res.data["results"]], [recipes[2].id, recipes[1].id])
+        self.assertIsNotNone(res.data["previous"])
+
+    def test_recipe_list_page_cost_is_constant(self):
+        """Test a later page costs the same number of queries as the first."""
+        for i in range(6):
+            create_recipe(user=self.user, title=f"Recipe {i}")
+
+        # ETag version + recipes + prefetched tags + prefetched ingredients
+        with self.assertNumQueries(4):
+            first = self.client.get(RECIPE_URL, {"page_size": 2})
+        with self.assertNumQueries(4):
+            self.client.get(first.data["next"])
+
+    def test_create_recipe(self):
+        """Test creating a recipe assigns it to the authenticated user."""
+        payload = {
+            "title": "Sample recipe",
+            "time_minutes": 30,
+            "price": Decimal("5.99"),
+        }
+        res = self.client.post(RECIPE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertEqual(recipe.user, self.user)
+        self.assertEqual(recipe.title, payload["title"])
 
 
 # create recipe serializer test cases
@@ -91,19 +171,750 @@ class RecipeSerializerTests(TestCase):
     def test_recipe_serializer(self):
         """Test the recipe serializer with a sample recipe."""
         user = get_user_model().objects.create_user(
-            email="user@example.com",
-            password="testpass123"
+            email="user@example.com", password="testpass123"
         )
         recipe = create_recipe(user=user)
 
         serializer = RecipeSerializer(recipe)
-        self.assertEqual(serializer.data, {
-            "id": recipe.id,
-            "title": recipe.title,
-            "description": recipe.description,
-            "time_minutes": recipe.time_minutes,
-            "price": str(recipe.price),
-            "link": recipe.link,
-        })
-
-# create recipe recipeViewSet test cases
\ No newline at end of file
+        self.assertEqual(
+            serializer.data,
+            {
+                "id": recipe.id,
+                "title": recipe.title,
+                "description": recipe.description,
+                "time_minutes": recipe.time_minutes,
+                "price": str(recipe.price),
+                "link": recipe.link,
+            },
+        )
+
+
+# create recipe recipeViewSet test cases
+
+
+class BulkRecipeAPITests(TestCase):
+    """Test the bulk recipe endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create_uses_single_insert(self):
+        """Test many recipes are created with one INSERT."""
+        payload = {
+            "create": [
+                {"title": f"Recipe {i}", "time_minutes": i + 1, "price": "1.50"} for i in range(20)
+            ]
+        }
+        # SAVEPOINT + INSERT + version bump + RELEASE SAVEPOINT
+        with self.assertNumQueries(4):
+            res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["created"]), 20)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 20)
+
+    def test_bulk_update_and_delete(self):
+        """Test updates and deletes are applied to the user's recipes."""
+        keep = create_recipe(user=self.user, title="Keep")
+        drop = create_recipe(user=self.user, title="Drop")
+        payload = {
+            "update": [{"id": keep.id, "title": "Renamed"}],
+            "delete": [drop.id],
+        }
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        keep.refresh_from_db()
+        self.assertEqual(keep.title, "Renamed")
+        self.assertFalse(Recipe.objects.filter(id=drop.id).exists())
+        self.assertEqual(res.data["deleted"], [drop.id])
+
+    def test_bulk_cannot_touch_other_users_recipes(self):
+        """Test recipes owned by another user are reported as not found."""
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        recipe = create_recipe(user=other_user)
+        payload = {"update": [{"id": recipe.id, "title": "Mine"}], "delete": [recipe.id]}
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Sample Recipe")
+
+    def test_bulk_error_aborts_whole_batch(self):
+        """Test an invalid item rejects the batch when partial is off."""
+        payload = {
+            "create": [
+                {"title": "Valid", "time_minutes": 5, "price": "1.00"},
+                {"title": "Invalid", "price": "1.00"},
+            ]
+        }
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("time_minutes", res.data["errors"]["create"][1])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_partial_keeps_valid_rows(self):
+        """Test partial mode saves valid rows and reports the rest."""
+        payload = {
+            "create": [
+                {"title": "Valid", "time_minutes": 5, "price": "1.00"},
+                {"title": "Invalid", "price": "1.00"},
+            ],
+            "partial": True,
+        }
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["title"] for r in res.data["created"]], ["Valid"])
+        self.assertIn(1, res.data["errors"]["create"])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_rejects_repeated_ids(self):
+        """Test an id repeated in update or delete is reported per item."""
+        recipe = create_recipe(user=self.user, title="Original")
+        payload = {
+            "update": [{"id": recipe.id, "title": "First"}, {"id": recipe.id, "title": "Second"}],
+            "delete": [recipe.id, recipe.id],
+            "partial": True,
+        }
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["errors"]["update"], {1: {"id": ["Duplicate of item 0."]}})
+        self.assertEqual(res.data["errors"]["delete"], {1: {"id": ["Duplicate of item 0."]}})
+        self.assertEqual([r["title"] for r in res.data["updated"]], ["First"])
+        self.assertEqual(res.data["deleted"], [recipe.id])
+
+    def test_bulk_in_background(self):
+        """Test a background batch is queued with 202 and applied by a job."""
+        payload = {
+            "create": [{"title": "Later", "time_minutes": 5, "price": "1.00"}],
+            "background": True,
+        }
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Recipe.objects.exists())
+        job = Job.objects.get(pk=res.data["id"])
+        self.assertEqual(job.user, self.user)
+        self.assertEqual(res["Location"], res.data["url"])
+
+        outcome, _duration = jobs.execute(jobs.claim("w1")[0])
+
+        self.assertEqual(outcome, Job.DONE)
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.title, "Later")
+        res = self.client.get(res.data["url"])
+        self.assertEqual(res.data["status"], Job.DONE)
+        self.assertEqual(res.data["result"]["created"][0]["id"], recipe.id)
+
+    def test_bulk_in_background_reports_rejected_batch(self):
+        """Test a background batch with errors is rejected in the job's result."""
+        payload = {"create": [{"title": "Invalid", "price": "1.00"}], "background": True}
+        self.client.post(BULK_URL, payload, format="json")
+
+        outcome, _duration = jobs.execute(jobs.claim("w1")[0])
+
+        self.assertEqual(outcome, Job.DONE)
+        self.assertIn("time_minutes", Job.objects.get().result["errors"]["create"]["0"])
+        self.assertFalse(Recipe.objects.exists())
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_item_limit(self):
+        """Test requests over the configured item limit are rejected."""
+        res = self.client.post(BULK_URL, {"delete": [1, 2, 3]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExportRecipeAPITests(TestCase):
+    """Test the streaming recipe export endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_export_ndjson_matches_serializer(self):
+        """Test NDJSON rows are formatted exactly like RecipeSerializer."""
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        create_recipe(user=other_user)
+        create_recipe(user=self.user, title="First")
+        create_recipe(user=self.user, title="Second", price=Decimal("7"))
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = b"".join(res.streaming_content).decode().splitlines()
+        recipes = Recipe.objects.filter(user=self.user).order_by("-id")
+        serializer = RecipeSerializer(recipes, many=True)
+        self.assertEqual([json.loads(line) for line in lines], serializer.data)
+
+    def test_export_csv(self):
+        """Test CSV export has a header and one line per recipe."""
+        recipe = create_recipe(user=self.user)
+
+        res = self.client.get(EXPORT_URL, {"output": "csv"})
+
+        self.assertEqual(res["Content-Type"], "text/csv")
+        rows = list(csv.reader(b"".join(res.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ["id", "title", "description", "time_minutes", "price", "link"])
+        self.assertEqual(rows[1][0], str(recipe.id))
+        self.assertEqual(rows[1][4], "5.25")
+
+    def test_export_unknown_output(self):
+        """Test an unsupported output format is rejected."""
+        res = self.client.get(EXPORT_URL, {"output": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SearchRecipeAPITests(TestCase):
+    """Test full-text search on the recipe list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_search_matches_all_terms(self):
+        """Test only recipes containing every search term are returned."""
+        curry = create_recipe(user=self.user, title="Thai green curry", description="Spicy")
+        create_recipe(user=self.user, title="Green salad", description="Fresh")
+        create_recipe(user=self.user, title="Beef stew", description="Hearty")
+
+        res = self.client.get(RECIPE_URL, {"search": "green curry"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data["results"]], [curry.id])
+
+    def test_search_ranks_title_above_description(self):
+        """Test title matches outrank description matches."""
+        in_title = create_recipe(user=self.user, title="Lemon tart", description="Sweet")
+        in_description = create_recipe(
+            user=self.user, title="Roast chicken", description="With lemon"
+        )
+
+        res = self.client.get(RECIPE_URL, {"search": "lemon"})
+
+        self.assertEqual([r["id"] for r in res.data["results"]], [in_title.id, in_description.id])
+
+    def test_search_limited_to_user(self):
+        """Test another user's recipes never appear in search results."""
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        create_recipe(user=other_user, title="Lemon tart")
+
+        res = self.client.get(RECIPE_URL, {"search": "lemon"})
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_search_results_paginate(self):
+        """Test ranked search results can be paged with cursors."""
+        for i in range(3):
+            create_recipe(user=self.user, title=f"Pasta {i}")
+
+        first = self.client.get(RECIPE_URL, {"search": "pasta", "page_size": 2})
+        second = self.client.get(first.data["next"])
+
+        ids = [r["id"] for r in first.data["results"] + second.data["results"]]
+        self.assertEqual(len(set(ids)), 3)
+
+
+class RangeFilterRecipeAPITests(TestCase):
+    """Test range filters and facet counts on the recipe list."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.quick = create_recipe(user=self.user, time_minutes=10, price=Decimal("3.00"))
+        self.medium = create_recipe(user=self.user, time_minutes=25, price=Decimal("8.00"))
+        self.slow = create_recipe(user=self.user, time_minutes=90, price=Decimal("25.00"))
+
+    def test_filter_by_time_and_price_range(self):
+        """Test min/max parameters narrow the list inclusively."""
+        res = self.client.get(
+            RECIPE_URL, {"time_minutes_min": 10, "time_minutes_max": 25, "price_max": "5.00"}
+        )
+
+        self.assertEqual([r["id"] for r in res.data["results"]], [self.quick.id])
+
+    def test_invalid_range_value(self):
+        """Test a non-numeric bound is rejected."""
+        res = self.client.get(RECIPE_URL, {"price_min": "cheap"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_facets_single_query(self):
+        """Test all facet buckets are counted with one query."""
+        with self.assertNumQueries(1):
+            res = self.client.get(FACETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([b["count"] for b in res.data["time_minutes"]], [1, 1, 0, 1])
+        self.assertEqual([b["count"] for b in res.data["price"]], [1, 1, 0, 1])
+        self.assertEqual(res.data["time_minutes"][0]["label"], "<15")
+
+    def test_facets_respect_filters(self):
+        """Test facet counts are computed over the filtered recipes."""
+        res = self.client.get(FACETS_URL, {"price_min": "5.00"})
+
+        self.assertEqual([b["count"] for b in res.data["time_minutes"]], [0, 1, 0, 1])
+
+
+class TagIngredientRecipeAPITests(TestCase):
+    """Test nested tags and ingredients on recipes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_create_recipe_with_new_and_existing_tags(self):
+        """Test missing tags are created and existing ones reused."""
+        existing = Tag.objects.create(user=self.user, name="Dinner")
+        payload = {
+            "title": "Thai curry",
+            "time_minutes": 30,
+            "price": "7.00",
+            "tags": [{"name": "Dinner"}, {"name": "Thai"}, {"name": "Thai"}],
+            "ingredients": [{"name": "Coconut milk"}],
+        }
+        res = self.client.post(RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertEqual(sorted(t.name for t in recipe.tags.all()), ["Dinner", "Thai"])
+        self.assertIn(existing, recipe.tags.all())
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(recipe.ingredients.get().name, "Coconut milk")
+
+    def test_missing_tags_created_in_bulk(self):
+        """Test creating many new tags costs a fixed number of queries."""
+        payload = {
+            "title": "Salad",
+            "time_minutes": 5,
+            "price": "3.00",
+            "tags": [{"name": f"Tag {i}"} for i in range(10)],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(RECIPE_URL, payload, format="json")
+
+        inserts = [
+            q
+            for q in ctx.captured_queries
+            if q["sql"].startswith("INSERT") and '"core_tag"' in q["sql"]
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 10)
+
+    def test_update_replaces_tags(self):
+        """Test a PATCH with tags replaces the recipe's tags."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Breakfast"))
+
+        res = self.client.patch(detail_url(recipe.id), {"tags": [{"name": "Lunch"}]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([t.name for t in recipe.tags.all()], ["Lunch"])
+
+    def test_filter_by_tags_and_ingredients(self):
+        """Test filtering the list by tag and ingredient IDs."""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        ingredient = Ingredient.objects.create(user=self.user, name="Tofu")
+        tagged = create_recipe(user=self.user, title="Tagged")
+        tagged.tags.add(tag)
+        tagged.ingredients.add(ingredient)
+        create_recipe(user=self.user, title="Plain")
+
+        res = self.client.get(RECIPE_URL, {"tags": f"{tag.id}"})
+        self.assertEqual([r["id"] for r in res.data["results"]], [tagged.id])
+
+        res = self.client.get(RECIPE_URL, {"ingredients": f"{ingredient.id},999"})
+        self.assertEqual([r["id"] for r in res.data["results"]], [tagged.id])
+
+    def test_tags_limited_to_user(self):
+        """Test the tag list only contains the user's tags."""
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        Tag.objects.create(user=other_user, name="Other")
+        Tag.objects.create(user=self.user, name="Mine")
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual([t["name"] for t in res.data], ["Mine"])
+
+    def test_rename_tag_to_existing_name(self):
+        """Test renaming a tag to a name the user already has is a 400."""
+        Tag.objects.create(user=self.user, name="Dinner")
+        tag = Tag.objects.create(user=self.user, name="Lunch")
+
+        res = self.client.patch(tag_detail_url(tag.id), {"name": "Dinner"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("name", res.data)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "Lunch")
+        res = self.client.patch(tag_detail_url(tag.id), {"name": "Lunch"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_rename_ingredient_to_existing_name(self):
+        """Test renaming an ingredient to a name the user already has is a 400."""
+        Ingredient.objects.create(user=self.user, name="Salt")
+        ingredient = Ingredient.objects.create(user=self.user, name="Pepper")
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        Ingredient.objects.create(user=other_user, name="Sugar")
+
+        res = self.client.patch(ingredient_detail_url(ingredient.id), {"name": "Salt"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.patch(ingredient_detail_url(ingredient.id), {"name": "Sugar"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class ConditionalRecipeAPITests(TestCase):
+    """Test ETag support on the recipe endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_list_not_modified(self):
+        """Test an unchanged list answers 304 after one query."""
+        res = self.client.get(RECIPE_URL)
+        etag = res["ETag"]
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+
+    def test_etag_changes_after_write(self):
+        """Test any recipe write invalidates the previous ETag."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        create_recipe(user=self.user, title="Another")
+
+        res = self.client.get(detail_url(self.recipe.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_if_match_rejects_stale_update(self):
+        """Test PATCH with an outdated If-Match fails with 412."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        create_recipe(user=self.user, title="Concurrent write")
+
+        res = self.client.patch(detail_url(self.recipe.id), {"title": "New"}, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "Sample Recipe")
+
+    def test_if_match_allows_current_update(self):
+        """Test PATCH with the current If-Match succeeds and returns a new ETag."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+
+        res = self.client.patch(detail_url(self.recipe.id), {"title": "New"}, HTTP_IF_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_if_match_rejects_weak_tag(self):
+        """Test If-Match uses strong comparison, so a weak tag never matches."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+
+        res = self.client.patch(
+            detail_url(self.recipe.id), {"title": "New"}, HTTP_IF_MATCH=f"W/{etag}"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_if_match_without_version_row(self):
+        """Test If-Match compares with the version reads create for a user without one."""
+        UserVersion.objects.filter(user=self.user).delete()
+        url = detail_url(self.recipe.id)
+
+        res = self.client.patch(url, {"title": "New"}, HTTP_IF_MATCH=f'"{self.user.pk}.0"')
+
+        self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        version = UserVersion.objects.get(user=self.user).version
+        self.assertEqual(res["ETag"], f'"{self.user.pk}.{version}"')
+        res = self.client.patch(url, {"title": "New"}, HTTP_IF_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_not_modified_never_hides_missing_recipe(self):
+        """Test If-None-Match on a missing or foreign recipe is a 404, not a 304."""
+        etag = self.client.get(detail_url(self.recipe.id))["ETag"]
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        foreign = create_recipe(user=other_user)
+
+        for recipe_id in (foreign.id, foreign.id + 1000):
+            for header in ("*", etag):
+                res = self.client.get(detail_url(recipe_id), HTTP_IF_NONE_MATCH=header)
+                self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CachedRecipeAPITests(TestCase):
+    """Test the per-user response cache on the recipe endpoints."""
+
+    def setUp(self):
+        get_cache().clear()
+        stats.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_repeated_list_served_from_cache(self):
+        """Test a repeated list read only costs the version lookup."""
+        first = self.client.get(RECIPE_URL)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(res["X-Cache"], "HIT")
+        self.assertEqual(res.data, first.data)
+        self.assertEqual(stats.snapshot()["hits"], 1)
+
+    def test_query_params_are_part_of_key(self):
+        """Test different query parameters are cached separately."""
+        create_recipe(user=self.user, title="Quick", time_minutes=5)
+        self.client.get(RECIPE_URL)
+
+        res = self.client.get(RECIPE_URL, {"time_minutes_max": 10})
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual([r["title"] for r in res.data["results"]], ["Quick"])
+
+    def test_recipe_save_invalidates(self):
+        """Test saving a recipe outside the API invalidates cached reads."""
+        self.client.get(detail_url(self.recipe.id))
+        self.recipe.title = "Changed"
+        self.recipe.save()
+
+        res = self.client.get(detail_url(self.recipe.id))
+
+        self.assertEqual(res["X-Cache"], "MISS")
+        self.assertEqual(res.data["title"], "Changed")
+
+    def test_recipe_delete_invalidates(self):
+        """Test deleting a recipe invalidates the cached list."""
+        self.client.get(RECIPE_URL)
+        self.recipe.delete()
+
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.data["results"], [])
+
+    def test_other_users_cache_untouched(self):
+        """Test a write by one user keeps other users' entries cached."""
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="testpass123"
+        )
+        other_client = APIClient()
+        other_client.force_authenticate(user=other)
+        other_client.get(RECIPE_URL)
+        create_recipe(user=self.user, title="Another")
+
+        res = other_client.get(RECIPE_URL)
+
+        self.assertEqual(res["X-Cache"], "HIT")
+
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+            "files": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": "/tmp/recipe-api-test-cache",
+            },
+        },
+        RESPONSE_CACHE_ALIAS="files",
+    )
+    def test_file_based_backend(self):
+        """Test cached responses round-trip through the file-based backend."""
+        get_cache().clear()
+        first = self.client.get(RECIPE_URL)
+
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res["X-Cache"], "HIT")
+        self.assertEqual(res.data, first.data)
+        get_cache().clear()
+
+    def test_cache_stats_admin_only(self):
+        """Test the hit/miss counters are only visible to staff."""
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL)
+
+        res = self.client.get(CACHE_STATS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        res = self.client.get(CACHE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"hits": 1, "misses": 1, "hit_ratio": 0.5})
+
+
+class AsyncRecipeAPITests(TransactionTestCase):
+    """Test the async (ASGI) variants of the recipe read endpoints."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def test_async_list_matches_sync(self):
+        """Test the async list returns the same page as the sync one."""
+        res = self.client.get(RECIPE_ASYNC_URL)
+        sync_res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"], sync_res.json()["results"])
+        self.assertEqual(res["ETag"], sync_res["ETag"])
+
+    def test_async_detail(self):
+        """Test the async detail returns the recipe and honours If-None-Match."""
+        res = self.client.get(detail_async_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["title"], self.recipe.title)
+
+        res = self.client.get(detail_async_url(self.recipe.id), HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_async_endpoints_read_only(self):
+        """Test the async variants reject writes."""
+        res = self.client.post(RECIPE_ASYNC_URL, {"title": "New"})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_async_auth_required(self):
+        """Test the async list requires authentication."""
+        res = APIClient().get(RECIPE_ASYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ImageUploadRecipeAPITests(TestCase):
+    """Test uploading recipe images."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.media_root = media.name
+        overrides = override_settings(MEDIA_ROOT=self.media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.recipe = create_recipe(user=self.user)
+
+    def _image(self, size=(300, 200)):
+        """Return a JPEG with a camera model and a rotating EXIF orientation."""
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise.
+        exif[0x0110] = "Test Camera"
+        buffer = BytesIO()
+        Image.new("RGB", size, "red").save(buffer, "JPEG", exif=exif)
+        buffer.seek(0)
+        buffer.name = "photo.jpg"
+        return buffer
+
+    def _upload(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                image_upload_url(self.recipe.id), {"image": image}, format="multipart"
+            )
+
+    def test_upload_image_creates_stripped_variants(self):
+        """Test an upload is stored as resized, oriented variants without EXIF."""
+        res = self._upload(self._image())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        variants = res.data["image_variants"]
+        self.assertEqual(set(variants), {"thumbnail", "medium", "full"})
+        self.assertEqual((variants["full"]["width"], variants["full"]["height"]), (200, 300))
+        self.assertEqual(variants["thumbnail"]["height"], 160)
+        self.assertTrue(variants["thumbnail"]["url"].startswith("http://testserver/media/"))
+        self.assertTrue(res.data["image"].endswith(self.recipe.image.name))
+
+        path = os.path.join(self.media_root, self.recipe.image_variants["thumbnail"]["name"])
+        with Image.open(path) as stored:
+            self.assertEqual(stored.format, "JPEG")
+            self.assertEqual(dict(stored.getexif()), {})
+
+        detail = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(detail.data["image_variants"], variants)
+
+    def test_new_upload_deletes_previous_variants(self):
+        """Test replacing an image removes the old files."""
+        self._upload(self._image())
+        self.recipe.refresh_from_db()
+        old_path = os.path.join(self.media_root, self.recipe.image.name)
+
+        self._upload(self._image((50, 50)))
+
+        self.assertFalse(os.path.exists(old_path))
+
+    def test_upload_invalid_image(self):
+        """Test a file that is not an image is rejected."""
+        upload = BytesIO(b"not an image")
+        upload.name = "photo.jpg"
+
+        res = self._upload(upload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+
+    @override_settings(RECIPE_IMAGE_MAX_BYTES=256)
+    def test_upload_too_large(self):
+        """Test uploads over RECIPE_IMAGE_MAX_BYTES are refused."""
+        res = self._upload(self._image())
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
@@ -0,0 +1,51 @@
+"""
+Image resizing run in the recipe image process pool.
+
+Kept free of Django imports: the pool's worker processes are spawned and
+only import this module and Pillow.
+"""
+
+import os
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+EXTENSIONS = {"JPEG": "jpg", "WEBP": "webp", "PNG": "png"}
+
+
+def make_variants(source, directory, sizes, image_format="JPEG", quality=85, max_pixels=None):
+    """
+    Write a resized copy of the image at source for each of sizes.
+
+    ``sizes`` maps variant name to the longest side in pixels; images are
+    never upscaled. Orientation from EXIF is applied and then every metadata
+    block dropped. Returns ``{name: (filename, width, height)}`` with
+    filenames relative to directory; raises ValueError for input that is not
+    an acceptable image.
+    """
+    if max_pixels is not None:
+        Image.MAX_IMAGE_PIXELS = max_pixels
+    try:
+        with Image.open(source) as original:
+            original.load()
+            image = ImageOps.exif_transpose(original)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise ValueError(f"Upload a valid image: {exc}") from None
+
+    if image_format == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    # Drop EXIF, XMP, ICC and comments: nothing from the upload is passed on.
+    image.info = {}
+
+    variants = {}
+    extension = EXTENSIONS[image_format]
+    for name, longest in sizes.items():
+        variant = image.copy()
+        variant.thumbnail((longest, longest), Image.Resampling.LANCZOS)
+        filename = f"{name}.{extension}"
+        variant.save(
+            os.path.join(directory, filename), image_format, quality=quality, optimize=True
+        )
+        variants[name] = (filename, variant.width, variant.height)
+    return variants
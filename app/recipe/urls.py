@@ -0,0 +1,21 @@
+"""
+URL mappings for the recipe app.
+"""
+
+from django.urls import include, path
+from recipe import views
+from rest_framework.routers import DefaultRouter
+
+router = DefaultRouter()
+router.register("recipes", views.RecipeViewSet)
+router.register("tags", views.TagViewSet)
+router.register("ingredients", views.IngredientViewSet)
+
+app_name = "recipe"
+
+urlpatterns = [
+    path("recipes/async/", views.recipe_list_async, name="recipe-list-async"),
+    path("recipes/<int:pk>/async/", views.recipe_detail_async, name="recipe-detail-async"),
+    path("", include(router.urls)),
+    path("cache-stats/", views.CacheStatsView.as_view(), name="cache-stats"),
+]
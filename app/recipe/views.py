@@ -1 +1,173 @@
-# Create your views here.
+"""
+Views for the recipe APIs.
+"""
+
+from core import jobs, versioning
+from core.async_views import async_view
+from core.etags import VersionETagMixin
+from core.models import Ingredient, Recipe, Tag
+from core.response_cache import CachedResponseMixin, stats
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from recipe import images, tasks
+from recipe.export import EXPORT_FORMATS
+from recipe.filters import facet_counts, filter_recipes
+from recipe.pagination import RecipeCursorPagination
+from recipe.search import SEARCH_PARAM, search_recipes
+from recipe.serializers import (
+    IngredientSerializer,
+    RecipeBulkSerializer,
+    RecipeDetailSerializer,
+    RecipeImageSerializer,
+    TagSerializer,
+)
+from rest_framework import mixins, parsers, permissions, serializers, views, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from user.authentication import CachedTokenAuthentication
+
+
+class RecipeViewSet(VersionETagMixin, CachedResponseMixin, viewsets.ModelViewSet):
+    """View for manage recipe APIs."""
+
+    serializer_class = RecipeDetailSerializer
+    queryset = Recipe.objects.all()
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+
+    def get_serializer_class(self):
+        """Return the serializer class for request."""
+        if self.action == "bulk":
+            return RecipeBulkSerializer
+        if self.action == "upload_image":
+            return RecipeImageSerializer
+        return self.serializer_class
+
+    def get_queryset(self):
+        """Retrieve recipes for authenticated user."""
+        queryset = self.queryset.filter(user=self.request.user).order_by("-id")
+        if self.action in ("list", "facets"):
+            queryset = filter_recipes(queryset, self.request.query_params)
+            query = self.request.query_params.get(SEARCH_PARAM)
+            if query:
+                queryset = search_recipes(queryset, query)
+        if self.action in ("list", "retrieve"):
+            # Fixed cost per page: one query per relation, never one per recipe.
+            queryset = queryset.prefetch_related(
+                Prefetch("tags", queryset=Tag.objects.order_by("name")),
+                Prefetch("ingredients", queryset=Ingredient.objects.order_by("name")),
+            )
+        return queryset
+
+    def perform_create(self, serializer):
+        """Create a new recipe."""
+        with versioning.bump_once():
+            serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        """Update a recipe."""
+        with versioning.bump_once():
+            serializer.save()
+
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        """Create, update and delete many recipes in one transaction."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data["background"]:
+            payload = {"user_id": request.user.pk, "data": request.data}
+            job = jobs.enqueue(tasks.bulk, payload, user=request.user)
+            return jobs.accepted_response(job, request)
+        return Response(tasks.apply_bulk(serializer, request.user))
+
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="upload-image",
+        parser_classes=[parsers.MultiPartParser],
+    )
+    def upload_image(self, request, pk=None):
+        """Upload an image (multipart field ``image``) and store its resized variants."""
+        # Must be set before request.data is read: stream the file to disk.
+        request._request.upload_handlers = [images.StreamingImageUploadHandler(request._request)]
+        recipe = self.get_object()
+        upload = request.FILES.get("image")
+        if upload is None:
+            raise serializers.ValidationError({"image": ["No image was uploaded."]})
+        images.save_image(recipe, upload)
+        return Response(self.get_serializer(recipe).data)
+
+    @action(methods=["GET"], detail=False, url_path="facets")
+    def facets(self, request):
+        """Return time and price bucket counts for the filtered recipe list."""
+        return Response(facet_counts(self.get_queryset()))
+
+    @action(methods=["GET"], detail=False, url_path="export")
+    def export(self, request):
+        """Stream all of the user's recipes as NDJSON (default) or CSV."""
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise serializers.ValidationError(
+                {"output": [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]}
+            )
+        streamer, content_type, filename = EXPORT_FORMATS[output]
+        chunk_size = getattr(settings, "RECIPE_EXPORT_CHUNK_SIZE", 2000)
+
+        response = StreamingHttpResponse(
+            streamer(self.get_queryset(), chunk_size), content_type=content_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+# Async (ASGI) variants of the read endpoints: one thread hop per request.
+recipe_list_async = async_view(
+    RecipeViewSet.as_view({"get": "list"}, basename="recipe", detail=False)
+)
+recipe_detail_async = async_view(
+    RecipeViewSet.as_view({"get": "retrieve"}, basename="recipe", detail=True)
+)
+
+
+class BaseRecipeAttrViewSet(
+    mixins.DestroyModelMixin,
+    mixins.UpdateModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Base viewset for recipe attributes."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Filter queryset to authenticated user."""
+        return self.queryset.filter(user=self.request.user).order_by("name")
+
+
+class TagViewSet(BaseRecipeAttrViewSet):
+    """Manage tags in the database."""
+
+    serializer_class = TagSerializer
+    queryset = Tag.objects.all()
+
+
+class IngredientViewSet(BaseRecipeAttrViewSet):
+    """Manage ingredients in the database."""
+
+    serializer_class = IngredientSerializer
+    queryset = Ingredient.objects.all()
+
+
+class CacheStatsView(views.APIView):
+    """Report the response cache hit/miss counters of this worker."""
+
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+    # Operational endpoint, kept out of the public OpenAPI schema.
+    schema = None
+
+    def get(self, request):
+        return Response(stats.snapshot())
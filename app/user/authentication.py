@@ -0,0 +1,141 @@
+"""Authentication classes for the user API."""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from core.metrics import timer
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Bounded, thread-safe LRU of token key -> (user, token) with a TTL.
+
+    The cache lives in the memory of a single worker process. Signal handlers
+    evict entries in the process that performed the write; other workers
+    rely on the TTL to pick up the change.
+    """
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached (user, token) pair for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, token, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user, token
+
+    def set(self, key, user, token):
+        """Store the (user, token) pair for key, evicting the oldest entry if full."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (user, token, time.monotonic() + self.ttl)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate_token(self, key):
+        """Drop a single token from the cache."""
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_user(self, user_id):
+        """Drop every token cached for a user."""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[0].pk
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache(
+    max_size=getattr(settings, "TOKEN_AUTH_CACHE_MAX_SIZE", 10000),
+    ttl=getattr(settings, "TOKEN_AUTH_CACHE_TTL", 60),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that memoizes the Token/User lookup per worker.
+
+    A cache hit costs no database queries. Entries are evicted when the token
+    is deleted or the user row is saved (see ``user.signals``), and expire
+    after ``TOKEN_AUTH_CACHE_TTL`` seconds otherwise. Until then another
+    worker may have changed the user, so users carry ``cached_version``, the
+    data version (core.versioning) they were loaded at: views that serve the
+    user's own fields compare it and reload a stale user.
+    """
+
+    cache = token_cache
+
+    def authenticate(self, request):
+        with timer("auth"):
+            return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        cached = self.cache.get(key)
+        if cached is not None:
+            user, token = cached
+            # Hand each request its own instance so views can mutate it safely.
+            return copy.copy(user), token
+
+        model = self.get_model()
+        try:
+            # The version comes from the same statement, so it matches the row.
+            token = model.objects.select_related("user__data_version").get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        user = token.user
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        try:
+            user.cached_version = user.data_version.version
+        except ObjectDoesNotExist:
+            # No counter yet: never equal to the one readers create.
+            user.cached_version = None
+        self.cache.set(key, user, token)
+        return copy.copy(user), token
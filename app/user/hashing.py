@@ -0,0 +1,106 @@
+"""
+Password verification off the request thread.
+
+PBKDF2 is deliberately slow, so a burst of logins can occupy every worker
+thread. Verification is pushed onto a small, bounded executor instead: at
+most ``LOGIN_HASH_POOL_SIZE`` hashes run at once, at most
+``LOGIN_HASH_QUEUE_DEPTH`` more may wait, and anything beyond that is
+rejected straight away with a 503 so cheap endpoints keep their capacity.
+
+The sync token view still holds its server thread while it waits for the
+pool, so fewer of those may wait than the server has threads
+(``LOGIN_HASH_MAX_BLOCKING``, by default one less than the worker's
+threads): a login storm then gets 503s instead of every thread of the
+worker. The async view waits without a thread and is bounded by the queue
+alone.
+
+The pool is a core.pools.BoundedPool. ``hashlib.pbkdf2_hmac`` releases the
+GIL, so a thread pool gives real parallelism here without having to pickle
+users across processes.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from core.pools import BoundedPool
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+
+
+class LoginOverloaded(exceptions.APIException):
+    """Raised when the password hashing queue is full."""
+
+    status_code = 503
+    default_detail = _("Too many login attempts in progress, please retry shortly.")
+    default_code = "login_overloaded"
+    # Picked up by DRF's exception handler as a Retry-After header.
+    wait = 1
+
+
+class PasswordHashPool(BoundedPool):
+    """Bounded thread pool verifying passwords."""
+
+    overloaded = LoginOverloaded
+    thread_name_prefix = "password-hash"
+
+
+hash_pool = PasswordHashPool(
+    max_workers=getattr(settings, "LOGIN_HASH_POOL_SIZE", None),
+    max_pending=getattr(settings, "LOGIN_HASH_QUEUE_DEPTH", None),
+    max_blocking=getattr(settings, "LOGIN_HASH_MAX_BLOCKING", None),
+)
+
+
+def _check_password(password, encoded):
+    """Verify password against encoded; runs on the hash pool."""
+    if encoded is None:
+        # Hash anyway so unknown emails take as long as wrong passwords.
+        hashers.make_password(password)
+        return False, False
+
+    must_update = False
+
+    def setter(raw_password):
+        nonlocal must_update
+        must_update = True
+
+    return hashers.check_password(password, encoded, setter), must_update
+
+
+def _get_user(email):
+    user_model = get_user_model()
+    try:
+        return user_model._default_manager.get_by_natural_key(email)
+    except user_model.DoesNotExist:
+        return None
+
+
+def _finish(user, password, is_valid, must_update):
+    if not is_valid or user is None or not user.is_active:
+        return None
+    if must_update:
+        # Hasher parameters changed; re-encode with the current defaults.
+        user.set_password(password)
+        user.save(update_fields=["password"])
+    return user
+
+
+def authenticate(email, password):
+    """Return the active user matching the credentials, or None."""
+    user = _get_user(email)
+    encoded = user.password if user is not None else None
+    is_valid, must_update = hash_pool.run(_check_password, password, encoded)
+    return _finish(user, password, is_valid, must_update)
+
+
+async def aauthenticate(email, password):
+    """Async variant of authenticate() that awaits the pool instead of blocking."""
+    user = await sync_to_async(_get_user)(email)
+    encoded = user.password if user is not None else None
+    future = hash_pool.submit(_check_password, password, encoded)
+    is_valid, must_update = await asyncio.wrap_future(future)
+    if must_update:
+        return await sync_to_async(_finish)(user, password, is_valid, must_update)
+    return _finish(user, password, is_valid, must_update)
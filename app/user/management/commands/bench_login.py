@@ -0,0 +1,133 @@
+"""
+Django command to benchmark the token endpoint under a login storm.
+
+Measures /api/user/me/ latency on its own, then again while a pool of
+client threads hammers /api/user/token/. Requests go over HTTP to a real
+``manage.py serve`` process (started for the run, or ``--base-url``), so the
+storm competes with /me for the worker's request threads as in production.
+With password hashing on the bounded pool, excess logins get fast 503s and
+the p99 of the cheap endpoint should stay roughly flat.
+"""
+
+import threading
+import time
+from contextlib import nullcontext
+
+from core.bench import HttpTransport, percentile, running_server
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+BENCH_EMAIL = "bench-login@example.com"
+BENCH_PASSWORD = "bench-login-password"
+
+
+class Command(BaseCommand):
+    """Django command to benchmark login throughput against /me latency."""
+
+    help = "Benchmark /api/user/me/ latency while /api/user/token/ is saturated."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per phase.")
+        parser.add_argument("--login-threads", type=int, default=32)
+        parser.add_argument("--me-threads", type=int, default=4)
+        parser.add_argument(
+            "--base-url", help="Benchmark a running server instead of starting one."
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1, help="Worker processes of the started server."
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=getattr(settings, "SERVE_THREADS", 4),
+            help="Request threads per worker of the started server.",
+        )
+        parser.add_argument(
+            "--throttled",
+            action="store_true",
+            help="Keep the login throttle on; by default it is off to load the hash pool.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        user = get_user_model().objects.filter(email=BENCH_EMAIL).first()
+        if user is None:
+            user = get_user_model().objects.create_user(email=BENCH_EMAIL, password=BENCH_PASSWORD)
+        token, _created = Token.objects.get_or_create(user=user)
+
+        if options["base_url"]:
+            server = nullcontext(options["base_url"])
+        else:
+            # An empty rate disables the scope (see SHARED_THROTTLE_RATES).
+            env = {} if options["throttled"] else {"THROTTLE_LOGIN_RATE": ""}
+            server = running_server(
+                options["workers"], options["threads"], env=env, quiet=options["verbosity"] < 2
+            )
+            self.stdout.write(
+                f"Starting serve with {options['workers']} worker(s) "
+                f"x {options['threads']} threads..."
+            )
+
+        duration = options["duration"]
+        with server as base_url:
+            transport = HttpTransport(base_url)
+            self.stdout.write(f"Phase 1: /me only ({duration:.0f}s)...")
+            idle = self._run(transport, duration, options["me_threads"], 0, token.key)
+            self.stdout.write(f"Phase 2: /me during login storm ({duration:.0f}s)...")
+            storm = self._run(
+                transport, duration, options["me_threads"], options["login_threads"], token.key
+            )
+
+        self._report("me (idle)", idle["me"], duration)
+        self._report("me (login storm)", storm["me"], duration)
+        self._report("token (login storm)", storm["token"], duration)
+        self.stdout.write(f"token responses by status: {storm['token_statuses']}")
+
+    def _run(self, transport, duration, me_threads, login_threads, token_key):
+        results = {"me": [], "token": [], "token_statuses": {}}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def me_worker():
+            url = reverse("user:me")
+            samples = []
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                transport.request("GET", url, token=token_key)
+                samples.append(time.perf_counter() - start)
+            transport.close()
+            with lock:
+                results["me"].extend(samples)
+
+        def login_worker():
+            url = reverse("user:token")
+            payload = {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}
+            samples, statuses = [], {}
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status, _timing = transport.request("POST", url, payload)
+                samples.append(time.perf_counter() - start)
+                statuses[status] = statuses.get(status, 0) + 1
+            transport.close()
+            with lock:
+                results["token"].extend(samples)
+                for code, count in statuses.items():
+                    results["token_statuses"][code] = results["token_statuses"].get(code, 0) + count
+
+        threads = [threading.Thread(target=me_worker) for _ in range(me_threads)]
+        threads += [threading.Thread(target=login_worker) for _ in range(login_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _report(self, label, samples, duration):
+        self.stdout.write(
+            f"{label:<22} {len(samples) / duration:8.1f} req/s  "
+            f"p50 {percentile(samples, 50) * 1000:7.2f} ms  "
+            f"p99 {percentile(samples, 99) * 1000:7.2f} ms"
+        )
@@ -0,0 +1,107 @@
+"""
+Django command to create users in bulk from a JSONL or CSV file.
+
+Rows carry ``email``, ``name`` and optionally ``password`` (users without
+one get an unusable password). Each batch is provisioned with
+``user.provisioning.provision_users``: one lookup for existing emails,
+passwords hashed in parallel, one transaction of bulk inserts. Rows that
+fail validation or already exist are reported and skipped. Created users,
+with their tokens when ``--tokens`` is given, are written as CSV to
+``--output``.
+"""
+
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from user.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    """Django command to provision users from JSONL/CSV files."""
+
+    help = "Create users from a JSONL or CSV file, hashing passwords in parallel."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="JSONL (.jsonl/.ndjson) or CSV (.csv) file to load.")
+        parser.add_argument(
+            "--format",
+            choices=["jsonl", "csv"],
+            help="Input format; inferred from the file extension when omitted.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--tokens", action="store_true", help="Issue an auth token to every created user."
+        )
+        parser.add_argument(
+            "--output", help="CSV file of created users (id, email[, token]); '-' for stdout."
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for the command."""
+        path = options["path"]
+        input_format = options["format"] or self._infer_format(path)
+        if options["tokens"] and not options["output"]:
+            raise CommandError("--tokens needs --output, or the tokens would be lost.")
+
+        output = None
+        if options["output"] == "-":
+            output = self.stdout
+        elif options["output"]:
+            output = open(options["output"], "w", newline="", encoding="utf-8")
+        # Keep stdout clean for --output -.
+        log = self.stderr if output is self.stdout else self.stdout
+        columns = ["id", "email"] + (["token"] if options["tokens"] else [])
+        writer = csv.writer(output) if output else None
+        if writer:
+            writer.writerow(columns)
+
+        done = created = rejected = 0
+        started = time.perf_counter()
+        try:
+            with open(path, newline="", encoding="utf-8") as handle:
+                rows = self._read_rows(handle, input_format)
+                while True:
+                    batch = list(islice(rows, options["batch_size"]))
+                    if not batch:
+                        break
+                    result = provision_users(batch, partial=True, tokens=options["tokens"])
+                    for index, detail in result["errors"].items():
+                        self.stderr.write(f"Row {done + index + 1}: {detail}")
+                    if writer:
+                        writer.writerows([user[c] for c in columns] for user in result["created"])
+                    done += len(batch)
+                    created += len(result["created"])
+                    rejected += len(result["errors"])
+                    log.write(f"{done} rows read, {created} users created")
+        finally:
+            if output not in (None, self.stdout):
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        summary = (
+            f"Created {created} users in {elapsed:.1f}s "
+            f"({created / elapsed if elapsed else 0:,.0f} users/s), {rejected} rejected."
+        )
+        log.write(self.style.SUCCESS(summary))
+
+    def _infer_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension in (".jsonl", ".ndjson"):
+            return "jsonl"
+        if extension == ".csv":
+            return "csv"
+        raise CommandError(f"Cannot infer format of {path}; pass --format.")
+
+    def _read_rows(self, handle, input_format):
+        if input_format == "csv":
+            for row in csv.DictReader(handle):
+                # An empty password column means no password.
+                yield {key: value for key, value in row.items() if value != ""}
+            return
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,174 @@
+"""
+Bulk user provisioning.
+
+``provision_users()`` creates thousands of users in a handful of queries:
+emails are normalized as ``UserManager.create_user`` does, duplicates within
+the batch and against existing accounts are found with one lookup on the
+unique email index, passwords are hashed in parallel on ``provision_pool``
+and the rows go in with ``bulk_create``, optionally together with their auth
+tokens. Used by the user/bulk/ endpoint and ``manage.py provision_users``.
+
+Like the login pool in user.hashing this is a core.pools.BoundedPool: PBKDF2
+releases the GIL, so threads hash in parallel without pickling anything,
+and a second batch arriving while one is being hashed gets a 503 instead of
+halving the throughput of both.
+"""
+
+from core.models import UserVersion
+from core.pools import BoundedPool
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, serializers
+from rest_framework.authtoken.models import Token
+
+# Rows per INSERT statement.
+BATCH_SIZE = 1000
+
+
+class ProvisioningOverloaded(exceptions.APIException):
+    """Raised when the provisioning hash pool is busy with other batches."""
+
+    status_code = 503
+    default_detail = _("Another batch of users is being provisioned, please retry shortly.")
+    default_code = "provisioning_overloaded"
+    wait = 5
+
+
+class ProvisioningPool(BoundedPool):
+    """Bounded thread pool hashing the passwords of provisioned users."""
+
+    overloaded = ProvisioningOverloaded
+    thread_name_prefix = "provision-hash"
+
+    def hash_all(self, passwords):
+        """Return make_password() of every password, hashed across the pool."""
+        # One task per thread rather than per password, so a batch takes
+        # max_workers slots however large it is.
+        step = -(-len(passwords) // self.max_workers) or 1
+        chunks = [passwords[i : i + step] for i in range(0, len(passwords), step)]
+        futures = [self.submit(_hash_chunk, chunk) for chunk in chunks]
+        return [encoded for future in futures for encoded in future.result()]
+
+
+def _hash_chunk(passwords):
+    # None gives an unusable password: the user sets one with a reset.
+    return [make_password(password) for password in passwords]
+
+
+provision_pool = ProvisioningPool(
+    max_workers=getattr(settings, "USER_PROVISION_POOL_SIZE", None), max_pending=0
+)
+
+
+class ProvisionUserSerializer(serializers.Serializer):
+    """
+    Serializer for one user of a provisioning batch.
+
+    Unlike UserSerializer it has no per-item unique validator; uniqueness is
+    checked for the whole batch at once.
+    """
+
+    email = serializers.EmailField(max_length=254)
+    name = serializers.CharField(max_length=255)
+    password = serializers.CharField(
+        min_length=5, required=False, allow_null=True, default=None, trim_whitespace=False
+    )
+
+
+def normalize_email(email):
+    """Normalize email the way UserManager.create_user does."""
+    return get_user_model().objects.normalize_email(email.lower())
+
+
+def provision_users(items, partial=False, tokens=False):
+    """
+    Validate and create the users described by items (dicts).
+
+    Returns ``{"created": [...], "errors": {index: detail}}`` where created
+    lists ``{"index", "id", "email"}`` (plus ``"token"`` with tokens) in item
+    order. Without partial any error rejects the whole batch with a
+    ValidationError.
+    """
+    User = get_user_model()
+    valid, errors = {}, {}
+    for index, item in enumerate(items):
+        try:
+            attrs = ProvisionUserSerializer().run_validation(item)
+        except serializers.ValidationError as exc:
+            errors[index] = exc.detail
+            continue
+        attrs["email"] = normalize_email(attrs["email"])
+        valid[index] = attrs
+
+    first_index = {}
+    for index, attrs in valid.items():
+        if attrs["email"] in first_index:
+            errors[index] = {"email": [f"Duplicate of item {first_index[attrs['email']]}."]}
+        else:
+            first_index[attrs["email"]] = index
+    _pop_taken(User, first_index, errors)
+
+    if errors and not partial:
+        raise serializers.ValidationError({"errors": errors})
+
+    indexes = sorted(first_index.values())
+    passwords = provision_pool.hash_all([valid[index]["password"] for index in indexes])
+    users = {
+        index: User(email=valid[index]["email"], name=valid[index]["name"], password=password)
+        for index, password in zip(indexes, passwords)
+    }
+    while True:
+        try:
+            with transaction.atomic():
+                _insert(User, list(users.values()), tokens)
+            break
+        except IntegrityError:
+            # Emails registered since the lookup above; anything else is re-raised.
+            if not _pop_taken(User, first_index, errors):
+                raise
+            if not partial:
+                raise serializers.ValidationError({"errors": errors})
+            remaining = set(first_index.values())
+            users = {index: user for index, user in users.items() if index in remaining}
+            for user in users.values():
+                # Ids handed out by the rolled back batch.
+                user.pk = None
+
+    created = []
+    for index, user in users.items():
+        result = {"index": index, "id": user.pk, "email": user.email}
+        if tokens:
+            result["token"] = user.auth_token.key
+        created.append(result)
+    return {"created": created, "errors": errors}
+
+
+def _pop_taken(User, first_index, errors):
+    """Move emails of first_index that have an account into errors; return them."""
+    taken = set(User.objects.filter(email__in=list(first_index)).values_list("email", flat=True))
+    for email in taken:
+        errors[first_index.pop(email)] = {"email": ["A user with this email already exists."]}
+    return taken
+
+
+def _insert(User, users, tokens):
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    if users and users[0].pk is None:
+        # Backends that cannot return ids from a bulk insert.
+        ids = dict(
+            User.objects.filter(email__in=[user.email for user in users]).values_list("email", "id")
+        )
+        for user in users:
+            user.pk = ids[user.email]
+    # bulk_create sends no post_save, so create what its receivers would.
+    UserVersion.objects.bulk_create(
+        [UserVersion(user=user) for user in users], batch_size=BATCH_SIZE
+    )
+    if tokens:
+        # Token.save() generates the key; bulk_create does not call it.
+        Token.objects.bulk_create(
+            [Token(key=Token.generate_key(), user=user) for user in users], batch_size=BATCH_SIZE
+        )
@@ -1,8 +1,10 @@
 """Serializers for user API view."""
 
-from django.contrib.auth import authenticate, get_user_model
-from django.utils.translation import gettext as _
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers
+from user import hashing
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -27,21 +29,51 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
-class AuthTokenSerializer(serializers.Serializer):
-    """Serializer for the user authentication object."""
+class AuthCredentialsSerializer(serializers.Serializer):
+    """Serializer for the credentials posted to the token endpoints."""
 
     email = serializers.EmailField()
     password = serializers.CharField(style={"input_type": "password"}, trim_whitespace=False)
 
+    default_error_messages = {
+        "authorization": _("Unable to authenticate with provided credentials"),
+    }
+
+
+class AuthTokenSerializer(AuthCredentialsSerializer):
+    """Serializer for the user authentication object."""
+
     def validate(self, attrs):
         """Validate and authenticate the user."""
         email = attrs.get("email")
         password = attrs.get("password")
 
-        user = authenticate(request=self.context.get("request"), username=email, password=password)
+        # Password hashing runs on the bounded pool in user.hashing.
+        user = hashing.authenticate(email, password)
         if not user:
-            msg = _("Unable to authenticate with provided credentials")
-            raise serializers.ValidationError(msg, code="authorization")
+            self.fail("authorization")
 
         attrs["user"] = user
         return attrs
+
+
+class UserBulkSerializer(serializers.Serializer):
+    """
+    Serializer for the envelope posted to the bulk user endpoint.
+
+    Items are validated and created by ``user.provisioning.provision_users``;
+    without ``partial`` any item error rejects the whole batch, and with
+    ``tokens`` every created user also gets an auth token.
+    """
+
+    users = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    partial = serializers.BooleanField(required=False, default=False)
+    tokens = serializers.BooleanField(required=False, default=False)
+
+    def validate_users(self, value):
+        max_items = getattr(settings, "USER_BULK_MAX_ITEMS", 5000)
+        if len(value) > max_items:
+            raise serializers.ValidationError(
+                f"A bulk request may contain at most {max_items} users, got {len(value)}."
+            )
+        return value
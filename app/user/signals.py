@@ -0,0 +1,20 @@
+"""Signal handlers keeping the token authentication cache coherent."""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from user.authentication import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """Drop a deleted token from the cache."""
+    token_cache.invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def evict_user_tokens(sender, instance, **kwargs):
+    """Drop cached tokens when a user changes (is_active, password, ...)."""
+    token_cache.invalidate_user(instance.pk)
@@ -0,0 +1,101 @@
+"""Tests for the cached token authentication."""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from user.authentication import TokenCache, token_cache
+
+ME_USER_URL = reverse("user:me")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are served from the per-worker cache."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123", name="Test Name"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def test_cache_hit_costs_no_queries(self):
+        """Test a repeated request authenticates without touching the DB."""
+        self.client.get(ME_USER_URL)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(ME_USER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        # The only query left is the ETag version lookup.
+        self.assertFalse([q for q in ctx.captured_queries if "authtoken_token" in q["sql"]])
+        self.assertFalse([q for q in ctx.captured_queries if '"core_user"' in q["sql"]])
+        self.assertEqual(token_cache.hits, 1)
+
+    def test_deleted_token_is_evicted(self):
+        """Test deleting a token invalidates the cached entry."""
+        self.client.get(ME_USER_URL)
+        self.token.delete()
+
+        res = self.client.get(ME_USER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_evicted(self):
+        """Test flipping is_active invalidates the cached entry."""
+        self.client.get(ME_USER_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_USER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_evicts_user(self):
+        """Test updating the password through the API drops the cached user."""
+        self.client.get(ME_USER_URL)
+
+        self.client.patch(ME_USER_URL, {"password": "newpassword123"})
+
+        self.assertEqual(len(token_cache), 0)
+
+
+class TokenCacheTests(TestCase):
+    """Test the bounded LRU behaviour of TokenCache."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com", password="testpass123"
+        )
+
+    def test_evicts_least_recently_used(self):
+        """Test the cache never grows past max_size."""
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set("a", self.user, None)
+        cache.set("b", self.user, None)
+        cache.get("a")
+        cache.set("c", self.user, None)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(len(cache), 2)
+
+    @patch("user.authentication.time.monotonic")
+    def test_entries_expire_after_ttl(self, patched_monotonic):
+        """Test entries are not served once their TTL has passed."""
+        cache = TokenCache(max_size=2, ttl=60)
+        patched_monotonic.return_value = 100
+        cache.set("a", self.user, None)
+
+        patched_monotonic.return_value = 161
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,48 @@
+"""Tests for password verification on the bounded hash pool."""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from user import hashing
+
+TOKEN_URL = reverse("user:token")
+TOKEN_ASYNC_URL = reverse("user:token-async")
+
+
+# Throttling is covered by core.test.test_ratelimit.
+@override_settings(SHARED_THROTTLE_RATES={})
+class TokenEndpointHashingTests(TestCase):
+    """Test the token endpoints verify passwords through the pool."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.payload = {"email": "test@example.com", "password": "testpass123"}
+        get_user_model().objects.create_user(**self.payload)
+
+    def test_token_endpoint_returns_503_when_overloaded(self):
+        """Test a full pool turns into a fast 503 with Retry-After."""
+        with patch.object(hashing.hash_pool, "submit", side_effect=hashing.LoginOverloaded):
+            res = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
+
+    def test_async_token_endpoint_success(self):
+        """Test the async endpoint issues a token for valid credentials."""
+        res = self.client.post(TOKEN_ASYNC_URL, self.payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("token", res.json())
+
+    def test_async_token_endpoint_bad_credentials(self):
+        """Test the async endpoint rejects a wrong password like the sync one."""
+        payload = {**self.payload, "password": "wrong"}
+        res = self.client.post(TOKEN_ASYNC_URL, payload, format="json")
+        sync_res = self.client.post(TOKEN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.json(), sync_res.json())
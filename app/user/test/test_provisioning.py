@@ -0,0 +1,180 @@
+"""Tests for bulk user provisioning."""
+
+import csv
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import serializers, status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from user.provisioning import provision_pool, provision_users
+
+BULK_URL = reverse("user:bulk")
+ME_URL = reverse("user:me")
+
+
+def user_item(i, **params):
+    """Return a provisioning item for user i."""
+    item = {"email": f"user{i}@example.com", "name": f"User {i}", "password": f"pass-{i}"}
+    item.update(params)
+    return item
+
+
+class ProvisionUsersTests(TestCase):
+    """Test provision_users()."""
+
+    def test_users_created_with_hashed_passwords(self):
+        """Test users are created with normalized emails and usable passwords."""
+        items = [user_item(1, email="Mixed@EXAMPLE.com"), user_item(2, password=None)]
+
+        result = provision_users(items)
+
+        self.assertEqual(
+            [user["email"] for user in result["created"]],
+            [
+                "mixed@example.com",
+                "user2@example.com",
+            ],
+        )
+        first = get_user_model().objects.get(email="mixed@example.com")
+        self.assertEqual(result["created"][0]["id"], first.pk)
+        self.assertTrue(first.check_password("pass-1"))
+        self.assertFalse(
+            get_user_model().objects.get(email="user2@example.com").has_usable_password()
+        )
+
+    def test_duplicates_rejected(self):
+        """Test duplicate and existing emails are errors of their items."""
+        get_user_model().objects.create_user(email="user1@example.com")
+        items = [user_item(1), user_item(2), user_item(2, email="USER2@example.com"), {"name": "x"}]
+
+        with self.assertRaises(serializers.ValidationError):
+            provision_users(items)
+        result = provision_users(items, partial=True)
+
+        self.assertEqual([user["index"] for user in result["created"]], [1])
+        self.assertEqual(sorted(result["errors"]), [0, 2, 3])
+        self.assertIn("email", result["errors"][3])
+        self.assertEqual(get_user_model().objects.count(), 2)
+
+    def test_concurrent_registration_reported_per_item(self):
+        """Test emails registered after the lookup are errors of their items."""
+        hash_all = provision_pool.hash_all
+
+        def register_then_hash(passwords):
+            # Another request registers user2 while the batch is being hashed.
+            get_user_model().objects.get_or_create(email="user2@example.com")
+            return hash_all(passwords)
+
+        items = [user_item(1), user_item(2), user_item(3)]
+        with mock.patch.object(provision_pool, "hash_all", side_effect=register_then_hash):
+            with self.assertRaises(serializers.ValidationError) as raised:
+                provision_users(items)
+            result = provision_users(items, partial=True)
+
+        self.assertEqual(list(raised.exception.detail["errors"]), [1])
+        self.assertEqual(
+            result["errors"], {1: {"email": ["A user with this email already exists."]}}
+        )
+        self.assertEqual([user["index"] for user in result["created"]], [0, 2])
+        self.assertEqual(
+            get_user_model().objects.get(email="user3@example.com").pk, result["created"][1]["id"]
+        )
+
+    def test_tokens_issued(self):
+        """Test created users get working auth tokens on request."""
+        result = provision_users([user_item(1), user_item(2)], tokens=True)
+
+        key = result["created"][1]["token"]
+        self.assertEqual(Token.objects.get(key=key).user.email, "user2@example.com")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {key}")
+        self.assertEqual(client.get(ME_URL).data["email"], "user2@example.com")
+
+
+class BulkUserApiTests(TestCase):
+    """Test the bulk user endpoint."""
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="pw"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_bulk_create(self):
+        """Test staff can provision users and receive per-user results."""
+        payload = {"users": [user_item(1), user_item(2)], "tokens": True}
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["created"]), 2)
+        self.assertIn("token", res.data["created"][0])
+        self.assertEqual(res.data["errors"], {})
+
+    def test_bulk_create_rejected_on_error(self):
+        """Test one bad item rejects the batch unless partial is set."""
+        payload = {"users": [user_item(1), user_item(2, email="invalid")]}
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(1, res.data["errors"])
+        self.assertFalse(get_user_model().objects.filter(email="user1@example.com").exists())
+
+    @override_settings(USER_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limit(self):
+        """Test batches above USER_BULK_MAX_ITEMS are rejected."""
+        payload = {"users": [user_item(i) for i in range(3)]}
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("users", res.data)
+
+    def test_bulk_create_requires_staff(self):
+        """Test regular users cannot provision users."""
+        user = get_user_model().objects.create_user(email="user@example.com", password="pw")
+        self.client.force_authenticate(user=user)
+
+        res = self.client.post(BULK_URL, {"users": [user_item(1)]}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ProvisionUsersCommandTests(TestCase):
+    """Test the provision_users command."""
+
+    def test_csv_import_writes_tokens(self):
+        """Test users are created from CSV and written out with their tokens."""
+        directory = tempfile.mkdtemp()
+        source = os.path.join(directory, "users.csv")
+        target = os.path.join(directory, "created.csv")
+        with open(source, "w", newline="") as handle:
+            writer = csv.DictWriter(handle, ["email", "name", "password"])
+            writer.writeheader()
+            writer.writerows([user_item(1), user_item(2, password=""), user_item(1)])
+        err = StringIO()
+
+        call_command(
+            "provision_users",
+            source,
+            "--tokens",
+            f"--output={target}",
+            "--batch-size=2",
+            stdout=StringIO(),
+            stderr=err,
+        )
+
+        with open(target, newline="") as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual([row["email"] for row in rows], ["user1@example.com", "user2@example.com"])
+        self.assertTrue(Token.objects.filter(key=rows[0]["token"]).exists())
+        self.assertIn("Row 3", err.getvalue())
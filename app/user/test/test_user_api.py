@@ -1,15 +1,19 @@
 """Test cases for the User API."""
 
+from core.versioning import bump_version
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
+from user.authentication import token_cache
 
 # The URL for creating a user in the API
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse("user:token")
 ME_USER_URL = reverse("user:me")
+ME_ASYNC_URL = reverse("user:me-async")
 
 
 def create_user(**params):
@@ -17,6 +21,8 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
+# Throttling is covered by core.test.test_ratelimit.
+@override_settings(SHARED_THROTTLE_RATES={})
 class PublicUserApiTests(TestCase):
     """
     TestCase for public user API endpoints.
@@ -142,6 +148,39 @@ class PrivateUserApiTests(TestCase):
         res = self.client.post(ME_USER_URL, {})
         self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def test_retrieve_profile_not_modified(self):
+        """Test an unchanged profile answers 304 to If-None-Match."""
+        etag = self.client.get(ME_USER_URL)["ETag"]
+
+        res = self.client.get(ME_USER_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_profile_read_fresh_behind_token_cache(self):
+        """Test /me serves the profile of its ETag's version, not the cached user's."""
+        self.client.force_authenticate(user=None)
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get(ME_USER_URL)
+        # Written by another worker: this worker's token cache keeps the old user.
+        get_user_model().objects.filter(pk=self.user.pk).update(name="Renamed")
+        bump_version(self.user.pk)
+
+        res = self.client.get(ME_USER_URL)
+
+        self.assertEqual(res.data["name"], "Renamed")
+
+    def test_profile_etag_changes_after_update(self):
+        """Test updating the profile invalidates the previous ETag."""
+        etag = self.client.get(ME_USER_URL)["ETag"]
+        self.client.patch(ME_USER_URL, {"name": "Updated Name"})
+
+        res = self.client.get(ME_USER_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
     # Test updating the user profile
     def test_update_user_profile(self):
         """Test updating the user profile for authenticated user."""
@@ -152,3 +191,27 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(self.user.name, payload["name"])
         self.assertTrue(self.user.check_password(payload["password"]))
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class AsyncUserApiTests(TransactionTestCase):
+    """Test the async (ASGI) variant of the profile endpoint."""
+
+    def setUp(self):
+        self.user = create_user(email="test@example.com", password="testpass123", name="Test Name")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_async_retrieve_profile(self):
+        """Test the async endpoint returns the same profile and ETag as the sync one."""
+        res = self.client.get(ME_ASYNC_URL)
+        sync_res = self.client.get(ME_USER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), {"name": self.user.name, "email": self.user.email})
+        self.assertEqual(res["ETag"], sync_res["ETag"])
+
+    def test_async_update_not_allowed(self):
+        """Test the async endpoint only serves reads."""
+        res = self.client.patch(ME_ASYNC_URL, {"name": "Updated Name"})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -6,6 +6,9 @@ from user import views
 app_name = "user"
 urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
+    path("bulk/", views.BulkCreateUserView.as_view(), name="bulk"),
     path("token/", views.CreateAuthTokenView.as_view(), name="token"),
+    path("token/async/", views.create_auth_token_async, name="token-async"),
     path("me/", views.ManageUserView.as_view(), name="me"),
+    path("me/async/", views.manage_user_async, name="me-async"),
 ]
@@ -1,15 +1,50 @@
 """Views for user API."""
 
-from rest_framework import authentication, generics, permissions
+import json
+
+from asgiref.sync import sync_to_async
+from core.async_views import async_view
+from core.etags import VersionETagMixin
+from core.ratelimit import SharedRateThrottle
+from django.contrib.auth import get_user_model
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework import exceptions, generics, permissions, status
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
-from user.serializers import AuthTokenSerializer, UserSerializer
+from user import hashing
+from user.authentication import CachedTokenAuthentication
+from user.provisioning import provision_users
+from user.serializers import (
+    AuthCredentialsSerializer,
+    AuthTokenSerializer,
+    UserBulkSerializer,
+    UserSerializer,
+)
 
 
 class CreateUserView(generics.CreateAPIView):
     """Create a new user."""
 
     serializer_class = UserSerializer
+    throttle_classes = [SharedRateThrottle]
+    throttle_scope = "signup"
+
+
+class BulkCreateUserView(generics.GenericAPIView):
+    """Create many users at once, optionally with their auth tokens."""
+
+    serializer_class = UserBulkSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = provision_users(data["users"], partial=data["partial"], tokens=data["tokens"])
+        return Response(result, status=status.HTTP_201_CREATED)
 
 
 class CreateAuthTokenView(ObtainAuthToken):
@@ -17,16 +52,80 @@ class CreateAuthTokenView(ObtainAuthToken):
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    # Checked before any password is hashed.
+    throttle_classes = [SharedRateThrottle]
+    throttle_scope = "login"
+
+
+async def create_auth_token_async(request):
+    """
+    Create a new auth token for the user without holding a thread.
+
+    Async (ASGI) counterpart of CreateAuthTokenView: the password hash is
+    awaited on the bounded pool, so a login storm costs pool slots rather
+    than server threads.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+
+    throttle = SharedRateThrottle()
+    if not throttle.allow_request(request, CreateAuthTokenView):
+        exc = exceptions.Throttled(throttle.wait())
+        response = JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+        response["Retry-After"] = str(exc.wait)
+        return response
 
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"detail": "JSON parse error."}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        data = request.POST
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+    serializer = AuthCredentialsSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        user = await hashing.aauthenticate(
+            serializer.validated_data["email"], serializer.validated_data["password"]
+        )
+    except hashing.LoginOverloaded as exc:
+        response = JsonResponse({"detail": str(exc.detail)}, status=exc.status_code)
+        response["Retry-After"] = str(exc.wait)
+        return response
+
+    if not user:
+        msg = serializer.error_messages["authorization"]
+        return JsonResponse(
+            {api_settings.NON_FIELD_ERRORS_KEY: [str(msg)]}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    token, _created = await sync_to_async(Token.objects.get_or_create)(user=user)
+    return JsonResponse({"token": token.key})
+
+
+# DRF views are CSRF exempt; Django 4.0's csrf_exempt cannot wrap coroutines.
+create_auth_token_async.csrf_exempt = True
+
+
+class ManageUserView(VersionETagMixin, generics.RetrieveUpdateAPIView):
     """Manage the authenticated user."""
 
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """Retrieve and return the authenticated user."""
+        user = self.request.user
+        # A user from this worker's token cache may predate a profile change
+        # made elsewhere; the body must be at least as new as the ETag.
+        if hasattr(user, "cached_version") and user.cached_version != self.get_data_version():
+            user = generics.get_object_or_404(get_user_model().objects, pk=user.pk)
+        return user
+
 
-        return self.request.user
+# Async (ASGI) variant of the /me GET: one thread hop per request.
+manage_user_async = async_view(ManageUserView.as_view(http_method_names=["get", "head", "options"]))